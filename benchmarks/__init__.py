@@ -0,0 +1,5 @@
+"""Benchmarks for the RCON transport and the console output paths
+
+Run from the repository root with "python -m benchmarks"; results are
+written as JSON so runs from different versions can be compared.
+"""
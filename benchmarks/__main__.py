@@ -0,0 +1,67 @@
+"""Run the benchmark suite and write the results as JSON
+
+    python -m benchmarks                  # everything, results/<timestamp>.json
+    python -m benchmarks --quick          # smaller counts for a smoke run
+    python -m benchmarks --only transport --output out.json
+"""
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+import time
+
+from benchmarks import transport, ui
+
+RESULTS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "results")
+
+
+def git_revision():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True,
+                              text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def main():
+    parser = argparse.ArgumentParser(description="RCON transport and console benchmarks")
+    parser.add_argument("--only", choices=("transport", "ui"), help="run one group only")
+    parser.add_argument("--quick", action="store_true", help="smaller counts for a quick smoke run")
+    parser.add_argument("--latency", type=float, default=0.0, help="mock server reply latency, in ms")
+    parser.add_argument("--output", help="result file (default: benchmarks/results/<timestamp>.json)")
+    args = parser.parse_args()
+
+    report = {
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "revision": git_revision(),
+        "python": sys.version.split()[0],
+        "platform": platform.platform(),
+        "results": {}
+    }
+
+    if args.only in (None, "transport"):
+        print("Running transport benchmarks...", file=sys.stderr)
+        if args.quick:
+            report["results"]["transport"] = transport.run(count=200, slow_count=20, large_size=100_000,
+                                                           large_count=5, latency=args.latency / 1000)
+        else:
+            report["results"]["transport"] = transport.run(latency=args.latency / 1000)
+    if args.only in (None, "ui"):
+        print("Running console benchmarks...", file=sys.stderr)
+        report["results"]["ui"] = ui.run(sizes=(1_000, 10_000) if args.quick else (10_000, 100_000))
+
+    output = args.output
+    if not output:
+        os.makedirs(RESULTS_DIR, exist_ok=True)
+        output = os.path.join(RESULTS_DIR, time.strftime("bench_%Y%m%d_%H%M%S.json"))
+    with open(output, "w") as f:
+        json.dump(report, f, indent=2)
+
+    print(json.dumps(report["results"], indent=2))
+    print(f"Results written to {output}", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,131 @@
+"""RCON transport benchmarks against the local mock server
+
+Compares the ways a command can reach the server:
+
+    mcrcon_subprocess   one mcrcon process per command (the original GUIs'
+                        path; skipped when mcrcon is not on PATH)
+    connect_per_command a fresh TCP connection and login per command, the
+                        same protocol work as mcrcon minus the process
+    persistent          one logged-in connection, commands sent serially
+    pipelined           one connection, RCONClient.batch()
+
+plus the throughput of large multi-packet responses.
+"""
+import shutil
+import subprocess
+import time
+
+from rcon_client import RCONClient
+from rcon_mock import MockRCONServer
+from rcon_stats import LatencyHistogram
+
+HOST = "127.0.0.1"
+PASSWORD = "bench"
+COMMAND = "list"
+
+
+def latency_summary(samples):
+    """p50/p95/p99 etc. in milliseconds for a list of durations in seconds"""
+    histogram = LatencyHistogram()
+    for seconds in samples:
+        histogram.record(seconds)
+    return histogram.summary()
+
+
+def _result(count, elapsed, samples):
+    return {
+        "commands": count,
+        "seconds": round(elapsed, 4),
+        "commands_per_s": round(count / elapsed, 1) if elapsed else None,
+        "latency": latency_summary(samples)
+    }
+
+
+def bench_mcrcon_subprocess(port, count):
+    mcrcon = shutil.which("mcrcon") or shutil.which("mcrcon.exe")
+    if not mcrcon:
+        return {"skipped": "mcrcon not found on PATH"}
+    samples = []
+    started = time.perf_counter()
+    for _ in range(count):
+        t = time.perf_counter()
+        subprocess.run([mcrcon, "-H", HOST, "-P", str(port), "-p", PASSWORD, COMMAND],
+                       capture_output=True, check=True)
+        samples.append(time.perf_counter() - t)
+    return _result(count, time.perf_counter() - started, samples)
+
+
+def bench_connect_per_command(port, count):
+    samples = []
+    started = time.perf_counter()
+    for _ in range(count):
+        t = time.perf_counter()
+        client = RCONClient(HOST, port, PASSWORD)
+        client.command(COMMAND)
+        client.close()
+        samples.append(time.perf_counter() - t)
+    return _result(count, time.perf_counter() - started, samples)
+
+
+def bench_persistent(port, count):
+    client = RCONClient(HOST, port, PASSWORD)
+    client.connect()
+    samples = []
+    started = time.perf_counter()
+    for _ in range(count):
+        t = time.perf_counter()
+        client.command(COMMAND)
+        samples.append(time.perf_counter() - t)
+    elapsed = time.perf_counter() - started
+    client.close()
+    return _result(count, elapsed, samples)
+
+
+def bench_pipelined(port, count):
+    client = RCONClient(HOST, port, PASSWORD)
+    client.connect()
+    started = time.perf_counter()
+    results = client.batch([COMMAND] * count)
+    elapsed = time.perf_counter() - started
+    client.close()
+    failed = sum(1 for ok, _, _ in results if not ok)
+    result = _result(count, elapsed, [seconds for _, _, seconds in results])
+    result["failed"] = failed
+    return result
+
+
+def bench_large_response(size, count):
+    """Throughput of a size-character response, whole and streamed"""
+    with MockRCONServer(password=PASSWORD, response_size=size) as server:
+        client = RCONClient(HOST, server.port, PASSWORD)
+        client.connect()
+        result = {"response_chars": size, "commands": count}
+        for name, run in (("command", client.command),
+                          ("command_iter", lambda c: "".join(client.command_iter(c)))):
+            samples = []
+            started = time.perf_counter()
+            for _ in range(count):
+                t = time.perf_counter()
+                text = run(COMMAND)
+                samples.append(time.perf_counter() - t)
+                assert len(text) == size
+            elapsed = time.perf_counter() - started
+            result[name] = {
+                "seconds": round(elapsed, 4),
+                "mb_per_s": round(size * count / elapsed / 1e6, 2),
+                "latency": latency_summary(samples)
+            }
+        client.close()
+    return result
+
+
+def run(count=2000, slow_count=200, large_size=1_000_000, large_count=20, latency=0.0):
+    """Run every transport benchmark; slow paths use slow_count commands"""
+    results = {}
+    with MockRCONServer(password=PASSWORD, latency=latency) as server:
+        results["mcrcon_subprocess"] = bench_mcrcon_subprocess(server.port, slow_count)
+        results["connect_per_command"] = bench_connect_per_command(server.port, slow_count)
+        results["persistent"] = bench_persistent(server.port, count)
+        results["pipelined"] = bench_pipelined(server.port, count)
+    results["large_response"] = bench_large_response(large_size, large_count)
+    return results
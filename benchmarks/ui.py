@@ -0,0 +1,81 @@
+"""Console output benchmarks for both GUIs
+
+tk_console drives the Tk GUI's ConsoleView on a hidden window (skipped
+without a display).  webview_console runs the WebView page's console code
+under Node with a stub DOM (skipped without node).
+"""
+import json
+import os
+import shutil
+import subprocess
+import tempfile
+import time
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+
+# Lines appended between flushes when streaming, about one frame's worth
+LINES_PER_FRAME = 100
+
+
+def tk_console(lines):
+    import tkinter as tk
+    from tkinter import scrolledtext
+
+    from rcon_console import ConsoleView
+
+    try:
+        root = tk.Tk()
+    except tk.TclError as e:
+        return {"skipped": f"Tk unavailable: {e}"}
+    root.withdraw()
+    try:
+        result = {"lines": lines}
+        for mode in ("burst", "streaming"):
+            widget = scrolledtext.ScrolledText(root)
+            console = ConsoleView(widget)
+            started = time.perf_counter()
+            for i in range(lines):
+                console.append(f"[Server] line {i} " + "x" * (i % 120), "info" if i % 7 else "success")
+                if mode == "streaming" and i % LINES_PER_FRAME == LINES_PER_FRAME - 1:
+                    console.flush()
+            console.flush()
+            root.update_idletasks()
+            elapsed = time.perf_counter() - started
+            result[mode] = {
+                "seconds": round(elapsed, 4),
+                "lines_per_s": round(lines / elapsed, 1),
+                "widget_lines": int(widget.index("end-1c").split(".")[0])
+            }
+            widget.destroy()
+        return result
+    finally:
+        root.destroy()
+
+
+def webview_console(lines):
+    node = shutil.which("node")
+    if not node:
+        return {"skipped": "node not found on PATH"}
+
+    from webviewmcrcongui import get_html
+
+    html = get_html()
+    script = html[html.index("<script>") + len("<script>"):html.rindex("</script>")]
+    with tempfile.NamedTemporaryFile("w", suffix=".js", delete=False, encoding="utf-8") as f:
+        f.write(script)
+        page_path = f.name
+    try:
+        output = subprocess.run([node, os.path.join(HERE, "webview_console.js"), page_path, str(lines)],
+                                capture_output=True, text=True, check=True)
+        return json.loads(output.stdout.strip().splitlines()[-1])
+    except subprocess.CalledProcessError as e:
+        return {"error": e.stderr.strip()[-500:]}
+    finally:
+        os.remove(page_path)
+
+
+def run(sizes=(10_000, 100_000)):
+    return {
+        "tk_console": {str(n): tk_console(n) for n in sizes},
+        "webview_console": {str(n): webview_console(n) for n in sizes}
+    }
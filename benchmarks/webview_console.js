@@ -0,0 +1,99 @@
+// Drives the WebView page's console code headlessly under Node.
+//
+// usage: node webview_console.js <page.js> <lines>
+//
+// A minimal DOM stub stands in for the browser: layout-dependent values
+// (viewport height, character width) are fixed, so the numbers measure the
+// console model and row recycling, not the browser's layout engine.
+const fs = require('fs');
+const vm = require('vm');
+
+const [pagePath, linesArg] = process.argv.slice(2);
+const LINES = parseInt(linesArg, 10);
+
+function element() {
+    return {
+        style: {},
+        children: [],
+        className: '',
+        textContent: '',
+        clientHeight: 600,
+        clientWidth: 800,
+        offsetTop: 0,
+        scrolled: 0,
+        // Clamped like a browser: the last screenful stays in view
+        get scrollTop() { return this.scrolled; },
+        set scrollTop(value) { this.scrolled = Math.max(0, Math.min(value, this.scrollHeight - this.clientHeight)); },
+        get scrollHeight() { return parseInt(spacer.style.height || 0, 10); },
+        appendChild(child) { this.children.push(child); return child; },
+        append(...children) { this.children.push(...children); },
+        replaceChildren(...children) { this.children = children; },
+        addEventListener() {},
+        classList: { add() {}, remove() {} }
+    };
+}
+
+const elements = {};
+const spacer = element();
+const frames = [];
+
+global.window = global;
+global.addEventListener = () => {};
+global.document = {
+    hidden: true,
+    getElementById: id => id === 'consoleSpacer' ? spacer : (elements[id] = elements[id] || element()),
+    createElement: () => element(),
+    createDocumentFragment: () => element(),
+    createRange: () => ({ selectNodeContents() {}, getBoundingClientRect: () => ({ width: 80 }) })
+};
+global.requestAnimationFrame = callback => frames.push(callback);
+global.ResizeObserver = class { observe() {} };
+global.setInterval = () => 0;
+
+function runFrames() {
+    while (frames.length) {
+        frames.shift()();
+    }
+}
+
+vm.runInThisContext(fs.readFileSync(pagePath, 'utf8'));
+vm.runInThisContext(`
+    consoleMaxLines = Math.max(consoleMaxLines, ${LINES});
+    globalThis.bench = {
+        append: (text, type) => addConsoleMessage(text, type),
+        render: () => renderConsole(),
+        live: () => consoleMessages.length - consoleStart,
+        pool: () => consoleRowPool.length
+    };
+`);
+const { bench } = global;
+runFrames();
+
+// Burst: every line appended before the next frame
+let started = performance.now();
+for (let i = 0; i < LINES; i++) {
+    bench.append(`[Server] line ${i} ` + 'x'.repeat(i % 120), i % 7 ? 'info' : 'success');
+}
+const appendMs = performance.now() - started;
+started = performance.now();
+runFrames();
+const firstRenderMs = performance.now() - started;
+
+// Steady state on a full console: one new line and one frame at a time
+const STEADY = 2000;
+started = performance.now();
+for (let i = 0; i < STEADY; i++) {
+    bench.append(`steady ${i}`, 'info');
+    bench.render();
+}
+const steadyMs = performance.now() - started;
+
+console.log(JSON.stringify({
+    lines: LINES,
+    append_ms: +appendMs.toFixed(3),
+    appends_per_s: Math.round(LINES / (appendMs / 1000)),
+    first_render_ms: +firstRenderMs.toFixed(3),
+    steady_append_render_ms: +(steadyMs / STEADY).toFixed(4),
+    live_messages: bench.live(),
+    row_pool: bench.pool()
+}));
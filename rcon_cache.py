@@ -0,0 +1,140 @@
+"""Short-lived cache for read-only command responses
+
+Operators spam-click buttons like "list", and every click used to cost a
+server round trip.  ResponseCache keeps the latest response to a small
+allowlist of read-only commands per server, each with its own TTL, and
+evicts the least recently used entries beyond a fixed size.
+
+RCONClient stores every allowlisted response it receives and drops a
+server's entries as soon as any other command (other than a few known
+chat-only ones) is sent to it, so a cached "whitelist list" never
+outlives a "whitelist add".
+
+Allowlist patterns match the whole command after whitespace is collapsed;
+a trailing " *" also matches any arguments, e.g. "time query *".
+"""
+import threading
+import time
+from collections import OrderedDict
+
+# Seconds each read-only command's response stays fresh
+DEFAULT_TTLS = {
+    "list": 5.0,
+    "list uuids": 5.0,
+    "seed": 3600.0,
+    "difficulty": 60.0,
+    "time query *": 1.0,
+    "whitelist list": 30.0,
+    "banlist": 30.0,
+    "banlist *": 30.0
+}
+
+DEFAULT_MAX_ENTRIES = 256
+
+# Commands that change nothing a cached response could show
+NON_MUTATING_VERBS = {"say", "tell", "msg", "w", "me", "tellraw", "teammsg", "tm", "title", "help"}
+
+
+def normalize_command(command):
+    return " ".join(command.strip().lstrip("/").split())
+
+
+class ResponseCache:
+    """Thread-safe TTL + LRU cache keyed by server and command"""
+
+    def __init__(self, ttls=None, max_entries=DEFAULT_MAX_ENTRIES):
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()
+        self.configure(ttls)
+
+    def configure(self, ttls=None):
+        """Apply TTL overrides on top of DEFAULT_TTLS; a TTL of 0 disables a pattern"""
+        merged = dict(DEFAULT_TTLS)
+        merged.update(ttls or {})
+        exact = {}
+        prefixes = []
+        for pattern, ttl in merged.items():
+            pattern = normalize_command(pattern)
+            if pattern.endswith(" *"):
+                prefixes.append((pattern[:-1], float(ttl)))
+            else:
+                exact[pattern] = float(ttl)
+        with self._lock:
+            self._exact = exact
+            self._prefixes = prefixes
+            self._entries.clear()
+
+    def ttl_for(self, command):
+        """Return the TTL for a command, or 0 when it must not be cached"""
+        ttl = self._match(command)
+        return ttl if ttl is not None else 0.0
+
+    def is_read_only(self, command):
+        """True for allowlisted commands, whatever their TTL"""
+        return self._match(command) is not None
+
+    def get(self, server, command):
+        """Return the fresh cached response, or None"""
+        key = (server, normalize_command(command))
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            expires, text = entry
+            if time.monotonic() >= expires:
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return text
+
+    def put(self, server, command, text):
+        ttl = self.ttl_for(command)
+        if ttl <= 0:
+            return
+        key = (server, normalize_command(command))
+        with self._lock:
+            self._entries[key] = (time.monotonic() + ttl, text)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def note_command(self, server, command):
+        """Invalidate a server's entries before a command that may change its state"""
+        # Allowlisted commands are read-only even when their TTL is 0
+        if self.is_read_only(command):
+            return
+        parts = normalize_command(command).split(" ", 1)
+        if parts[0].lower() in NON_MUTATING_VERBS:
+            return
+        self.invalidate(server)
+
+    def _match(self, command):
+        command = normalize_command(command)
+        ttl = self._exact.get(command)
+        if ttl is not None:
+            return ttl
+        for prefix, ttl in self._prefixes:
+            if command.startswith(prefix):
+                return ttl
+        return None
+
+    def invalidate(self, server=None):
+        """Drop every entry for a server, or all entries"""
+        with self._lock:
+            if server is None:
+                self._entries.clear()
+                return
+            for key in [k for k in self._entries if k[0] == server]:
+                del self._entries[key]
+
+    def __len__(self):
+        return len(self._entries)
+
+
+_cache = ResponseCache()
+
+
+def get_cache():
+    """Return the process-wide response cache shared by every client"""
+    return _cache
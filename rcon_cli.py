@@ -0,0 +1,361 @@
+"""Headless command line for cron jobs and shell scripts
+
+Runs on the same RCONApi as the WebView GUI, so it reads the same
+config.json, shares its persistent connection, response cache and latency
+stats, and needs no display (pywebview is only imported by the GUI):
+
+    python -m rcon_cli exec "time set day"     # one command, exit status 0/1
+    python -m rcon_cli exec --all "save-all"   # every configured server
+    python -m rcon_cli shell                   # interactive prompt
+    python -m rcon_cli pipe < commands.txt     # one command per line
+    python -m rcon_cli script reset.txt        # rate-limited script (rcon_script)
+    python -m rcon_cli search is:error         # search transcripts (rcon_search)
+
+pipe reads newline-delimited commands from stdin until EOF and writes one
+JSON object per command to stdout as soon as it completes, so it can also
+run as a long-lived daemon behind a FIFO or a coprocess.  Blank lines and
+lines starting with "#" are skipped.  With --batch N, commands already
+waiting on stdin are pipelined N at a time over the connection, while a
+writer that sends one line and waits still gets its answer at once.
+
+script prints progress to stderr and each failed line as JSON to stdout.
+
+shell shares the GUIs' per-server command history (rcon_history): Up
+recalls commands typed in either GUI, and Ctrl+R searches them where
+readline is available.  Tab completes from the server's cached command
+tree (rcon_complete).
+
+search prints matching transcript records newest first as each page
+arrives; it needs no server configuration.  Exit status is 1 when nothing
+matched, like grep.
+
+--host, --port and --password override config.json and replace its
+server list, so exec --all then runs on that one server.
+"""
+import argparse
+import codecs
+import json
+import os
+import sys
+import time
+
+from rcon_client import RCONError
+from rcon_complete import get_completer
+from rcon_history import get_history
+from rcon_roster import get_roster
+from rcon_search import PAGE_SIZE, SearchError, format_record, get_index
+from rcon_script import (DEFAULT_RATE, FAILURE_POLICIES, ScriptError, ScriptRunner, format_progress,
+                         parse_script, parse_variables)
+from webviewmcrcongui import RCONApi
+
+# Exit statuses
+EXIT_OK = 0
+EXIT_FAILED = 1
+EXIT_CONFIG = 2
+
+# Recent history entries handed to readline in the shell
+READLINE_HISTORY = 1000
+
+
+def emit(result, stream=sys.stdout):
+    """Write a result as one JSON line and flush it"""
+    stream.write(json.dumps(result, ensure_ascii=False) + "\n")
+    stream.flush()
+
+
+def run_command(api, command):
+    """Run one command through RCONApi; returns its result with timing"""
+    started = time.perf_counter()
+    result = api.execute_command(command)
+    return {
+        "command": command,
+        "success": result['success'],
+        "message": result['message'],
+        "elapsed_ms": round((time.perf_counter() - started) * 1000, 2),
+        "cached": result.get('cached', False)
+    }
+
+
+def cmd_exec(api, args):
+    command = " ".join(args.command).strip()
+    if not command:
+        print("No command given", file=sys.stderr)
+        return EXIT_CONFIG
+
+    if args.all:
+        summary = api.execute_fan_out(command)
+        if args.json:
+            for result in summary['results']:
+                emit(result)
+        else:
+            for result in summary['results']:
+                print(f"[{result['server']}] {result['message']}")
+            print(summary['message'], file=sys.stderr)
+        return EXIT_OK if summary['success'] else EXIT_FAILED
+
+    result = run_command(api, command)
+    if args.json:
+        emit(result)
+    elif result['success']:
+        print(result['message'])
+    else:
+        print(result['message'], file=sys.stderr)
+    return EXIT_OK if result['success'] else EXIT_FAILED
+
+
+def readline_completer(readline, engine):
+    """Adapt a CompletionEngine to readline's completer(text, state) protocol"""
+    matches = []
+
+    def complete(text, state):
+        if state == 0:
+            line = readline.get_line_buffer()[:readline.get_endidx()]
+            result = engine.complete(line)
+            # readline replaces the whole word, including a leading "/"
+            lead = line[readline.get_begidx():result['start']]
+            suffix = " " if len(result['matches']) == 1 else ""
+            matches[:] = [lead + match + suffix for match in result['matches']]
+        return matches[state] if state < len(matches) else None
+    return complete
+
+
+def cmd_shell(api, args):
+    history = get_history(api.server_host, api.server_port)
+    try:
+        # Line editing and history where available (not on Windows)
+        import readline
+    except ImportError:
+        readline = None
+
+    interactive = sys.stdin.isatty()
+    if interactive and readline is not None:
+        for command in history.tail(READLINE_HISTORY):
+            readline.add_history(command)
+        try:
+            engine = get_completer(api._client(), get_roster(api.server_host, api.server_port))
+        except RCONError:
+            engine = None
+        if engine is not None:
+            engine.load_async()
+            readline.set_completer_delims(" \t\n")
+            readline.set_completer(readline_completer(readline, engine))
+            readline.parse_and_bind("tab: complete")
+    if interactive and not args.json:
+        print(f"Connected to {api.server_host}:{api.server_port}; Ctrl+D or 'exit' to quit", file=sys.stderr)
+    failed = False
+    while True:
+        try:
+            line = input("rcon> " if interactive else "")
+        except EOFError:
+            break
+        except KeyboardInterrupt:
+            print(file=sys.stderr)
+            continue
+        command = line.strip()
+        if not command:
+            continue
+        if command in ("exit", "quit"):
+            break
+        if interactive:
+            history.add(command)
+
+        result = run_command(api, command)
+        failed = failed or not result['success']
+        if args.json:
+            emit(result)
+        elif result['success']:
+            print(result['message'])
+        else:
+            print(f"✗ {result['message']}")
+    return EXIT_FAILED if failed else EXIT_OK
+
+
+def read_available(fd, size=65536):
+    """Yield lists of the complete lines readable from fd without waiting
+
+    os.read() returns as soon as any input is available, so a list holds
+    everything the writer has sent so far: one line from an interactive
+    writer, thousands from a file.
+    """
+    decoder = codecs.getincrementaldecoder("utf-8")(errors="replace")
+    pending = ""
+    while True:
+        data = os.read(fd, size)
+        if not data:
+            tail = pending + decoder.decode(b"", final=True)
+            if tail:
+                yield [tail]
+            return
+        pending += decoder.decode(data)
+        lines = pending.split("\n")
+        pending = lines.pop()
+        if lines:
+            yield lines
+
+
+def cmd_pipe(api, args):
+    failed = 0
+    total = 0
+    number = 0
+    window_size = max(1, args.batch)
+
+    for lines in read_available(sys.stdin.fileno()):
+        commands = []
+        for line in lines:
+            number += 1
+            command = line.strip()
+            if command and not command.startswith("#"):
+                commands.append((number, command))
+
+        for start in range(0, len(commands), window_size):
+            window = commands[start:start + window_size]
+            if len(window) == 1:
+                line_number, command = window[0]
+                results = [run_command(api, command)]
+            else:
+                summary = api.execute_batch([command for _, command in window])
+                results = summary['results'] or [
+                    {"command": command, "success": False, "message": summary['message'], "elapsed_ms": 0.0}
+                    for _, command in window
+                ]
+            for (line_number, _), result in zip(window, results):
+                result.setdefault('cached', False)
+                result['line'] = line_number
+                emit(result)
+                total += 1
+                failed += not result['success']
+
+    if args.summary:
+        print(f"{total - failed}/{total} commands succeeded", file=sys.stderr)
+    return EXIT_FAILED if failed else EXIT_OK
+
+
+def cmd_script(api, args):
+    try:
+        with open(args.file, 'r', encoding='utf-8') as f:
+            text = f.read()
+        commands = parse_script(text, parse_variables("\n".join(args.var)))
+    except (OSError, ScriptError, ValueError) as e:
+        print(str(e), file=sys.stderr)
+        return EXIT_CONFIG
+
+    interactive = sys.stderr.isatty()
+
+    def on_progress(progress):
+        # Redraw one status line on a terminal; otherwise log the final line only
+        if interactive:
+            sys.stderr.write("\r" + format_progress(progress).ljust(72))
+            sys.stderr.flush()
+        elif progress['state'] in ("done", "aborted"):
+            print(format_progress(progress), file=sys.stderr)
+
+    try:
+        runner = ScriptRunner(api._client(), commands, rate=args.rate, failure_policy=args.on_failure,
+                              on_progress=on_progress, on_failure=emit)
+    except (RCONError, ValueError) as e:
+        print(str(e), file=sys.stderr)
+        return EXIT_CONFIG
+    runner.start()
+    try:
+        while not runner.finished:
+            runner.join(0.2)
+    except KeyboardInterrupt:
+        runner.abort()
+        runner.join()
+    if interactive:
+        sys.stderr.write("\n")
+    return EXIT_OK if runner.state == "done" and not runner.failed else EXIT_FAILED
+
+
+def cmd_search(api, args):
+    query = " ".join(args.query)
+    found = 0
+    try:
+        for record in get_index().iter_results(query, limit=args.limit or None, page_size=PAGE_SIZE,
+                                               update=True):
+            found += 1
+            if args.json:
+                emit(record)
+            else:
+                print(format_record(record), flush=True)
+    except SearchError as e:
+        print(str(e), file=sys.stderr)
+        return EXIT_CONFIG
+    return EXIT_OK if found else EXIT_FAILED
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(prog="python -m rcon_cli", description="Headless Minecraft RCON client")
+    parser.add_argument("--config", default="config.json", help="config file (default: config.json)")
+    parser.add_argument("--host", help="server address, overrides the config file")
+    parser.add_argument("--port", help="RCON port, overrides the config file")
+    parser.add_argument("--password", help="RCON password, overrides the config file")
+    sub = parser.add_subparsers(dest="mode", required=True)
+
+    exec_parser = sub.add_parser("exec", help="run one command and exit")
+    exec_parser.add_argument("command", nargs="+", help="the command, e.g. time set day")
+    exec_parser.add_argument("--all", action="store_true", help="run on every configured server")
+    exec_parser.add_argument("--json", action="store_true", help="print the result as JSON")
+
+    shell_parser = sub.add_parser("shell", help="interactive prompt")
+    shell_parser.add_argument("--json", action="store_true", help="print results as JSON lines")
+
+    pipe_parser = sub.add_parser("pipe", help="run commands from stdin, one JSON line per result")
+    pipe_parser.add_argument("--batch", type=int, default=1,
+                             help="pipeline up to this many buffered commands at a time")
+    pipe_parser.add_argument("--summary", action="store_true", help="print a summary to stderr at EOF")
+
+    script_parser = sub.add_parser("script", help="run a script file at a limited rate")
+    script_parser.add_argument("file", help="script with one command per line")
+    script_parser.add_argument("--var", action="append", default=[], metavar="NAME=VALUE",
+                               help="define a variable (repeatable)")
+    script_parser.add_argument("--rate", type=float, default=DEFAULT_RATE, help="commands per second")
+    # Nobody is there to resume a paused run
+    script_parser.add_argument("--on-failure", choices=[p for p in FAILURE_POLICIES if p != "pause"],
+                               default="continue", help="what to do when a command fails")
+
+    search_parser = sub.add_parser("search", help="search recorded commands and responses")
+    search_parser.add_argument("query", nargs="*",
+                               help='words, "phrases" and filters such as is:error server:NAME on:yesterday since:2h')
+    search_parser.add_argument("--limit", type=int, default=PAGE_SIZE,
+                               help=f"most results to print, 0 for all (default: {PAGE_SIZE})")
+    search_parser.add_argument("--json", action="store_true", help="print results as JSON lines")
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    api = RCONApi(args.config)
+    if args.host:
+        api.server_host = args.host
+    if args.port:
+        api.server_port = args.port
+    if args.password is not None:
+        api.rcon_password = args.password
+    if args.host and args.port and args.password is not None:
+        api.config_loaded = True
+    if args.host or args.port or args.password is not None:
+        # The overridden server is the only one --all reaches
+        api.servers = [{
+            "name": f"{api.server_host}:{api.server_port}",
+            "server_ip": api.server_host,
+            "port": str(api.server_port),
+            "password": api.rcon_password
+        }]
+    # Searching the transcripts needs no server
+    if not api.config_loaded and args.mode != "search":
+        print(f"No configuration: create {args.config} or pass --host, --port and --password", file=sys.stderr)
+        return EXIT_CONFIG
+
+    modes = {"exec": cmd_exec, "shell": cmd_shell, "pipe": cmd_pipe, "script": cmd_script, "search": cmd_search}
+    try:
+        return modes[args.mode](api, args)
+    except KeyboardInterrupt:
+        return EXIT_FAILED
+    except BrokenPipeError:
+        # Reader went away (e.g. piped into head)
+        return EXIT_OK
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,726 @@
+"""Native RCON client shared by both GUIs
+
+Speaks the Source RCON protocol used by Minecraft servers directly over a
+TCP socket instead of spawning mcrcon for every command.  Each packet is
+length-prefixed and little-endian:
+
+    int32 length | int32 request id | int32 type | body | 0x00 0x00
+
+The client logs in once, keeps the authenticated socket open and
+transparently reconnects when the server has dropped it.  Each command's
+phases (connect, auth, send, first byte, complete) are recorded in the
+shared rcon_stats histograms, and responses to read-only commands are kept
+in the shared rcon_cache for cached_response().  "list" responses also
+update the server's rcon_roster player roster, and every command's
+outcome goes to the rcon_transcript on disk, except for the client's own
+bookkeeping run inside unrecorded().  Identical read-only commands issued
+while one is already in flight share its response instead of queueing
+another request; such shared answers and cache hits are transcribed too,
+flagged "coalesced" or "cached".  With a scheduler, every command and
+batch window first waits for a slot on the server in the calling thread's
+rcon_scheduler priority class, so interactive commands overtake bulk work.
+
+Minecraft splits long responses into 4096-character packets without
+marking the last one.  A shorter packet always ends the response; after a
+full-sized one the client sends an empty sentinel packet, and since the
+server answers requests in order, the reply to the sentinel marks the end
+of the command's response.  Sending the sentinel only when needed avoids
+a Nagle/delayed-ACK stall on every small response.
+"""
+import codecs
+import re
+import socket
+import struct
+import threading
+import time
+from contextlib import contextmanager
+
+from rcon_cache import get_cache, normalize_command
+from rcon_roster import get_roster, is_list_command
+from rcon_scheduler import get_scheduler
+from rcon_stats import get_stats
+from rcon_transcript import MAX_RESPONSE_CHARS, get_transcript
+
+# Packet types
+SERVERDATA_AUTH = 3
+SERVERDATA_AUTH_RESPONSE = 2
+SERVERDATA_EXECCOMMAND = 2
+SERVERDATA_RESPONSE_VALUE = 0
+
+# Minecraft drops the connection for request bodies larger than this
+MAX_COMMAND_LENGTH = 1446
+
+# Minecraft splits responses into chunks of this many characters
+FRAGMENT_SIZE = 4096
+
+# Largest response packet Minecraft sends: 4096 body bytes plus framing
+MAX_PACKET_SIZE = FRAGMENT_SIZE + 14
+
+# Fragments are cut by characters, so one can take up to four UTF-8 bytes
+# per character; a longer length means a broken or hostile server
+MAX_PACKET_LENGTH = 4 * FRAGMENT_SIZE + 14
+
+# Response bytes kept for the transcript alone: enough for MAX_RESPONSE_CHARS
+# characters of UTF-8
+TRANSCRIPT_BYTES = MAX_RESPONSE_CHARS * 4
+
+# Commands written back-to-back before waiting for their responses; keeps
+# the unread request bytes well inside the kernel socket buffers
+BATCH_WINDOW = 64
+
+_HEADER = struct.Struct("<iii")
+_LENGTH = struct.Struct("<i")
+_QUICKACK = getattr(socket, "TCP_QUICKACK", None)
+_COLOR_CODE = re.compile("§[0-9a-fk-orA-FK-OR]")
+
+_context = threading.local()
+
+
+class RCONError(Exception):
+    """Base class for RCON failures"""
+
+
+class RCONAuthError(RCONError):
+    """Raised when the server rejects the RCON password"""
+
+
+class RCONTimeoutError(RCONError):
+    """Raised when the server does not answer in time"""
+
+
+class _ConnectionLost(RCONError):
+    """Raised when the server closes the socket under us"""
+
+
+@contextmanager
+def unrecorded():
+    """Keep the enclosed commands on this thread out of the stats and transcript
+
+    For requests the tools make on their own, such as fetching the command
+    tree for completion, which the user never typed.
+    """
+    previous = getattr(_context, 'unrecorded', False)
+    _context.unrecorded = True
+    try:
+        yield
+    finally:
+        _context.unrecorded = previous
+
+
+def strip_colors(text):
+    """Remove Minecraft section-sign formatting codes from text"""
+    return _COLOR_CODE.sub("", text)
+
+
+def iter_lines(chunks, max_length=FRAGMENT_SIZE):
+    """Yield the lines of a chunked response as they complete, colors stripped
+
+    Packet boundaries fall anywhere, so the unfinished last line of a chunk
+    is carried over to the next and flushed when the response ends.  Only
+    each new chunk is searched for line breaks.  A line that grows past
+    max_length characters is yielded in pieces of that size, so output
+    without line breaks (vanilla "help", "data get") still streams.
+    """
+    parts = []
+    size = 0
+    # Part of the current line was already yielded
+    split = False
+    for chunk in chunks:
+        start = 0
+        end = chunk.find("\n")
+        while end >= 0:
+            parts.append(chunk[start:end])
+            line = "".join(parts).rstrip("\r")
+            if line or not split:
+                yield strip_colors(line)
+            parts = []
+            size = 0
+            split = False
+            start = end + 1
+            end = chunk.find("\n", start)
+        if start < len(chunk):
+            parts.append(chunk[start:])
+            size += len(chunk) - start
+            if size >= max_length:
+                text = "".join(parts)
+                # Hold back what may begin a "\r\n" or a color code
+                keep = 1 if text[-1] in "\r§" else 0
+                yield strip_colors(text[:len(text) - keep])
+                parts = [text[len(text) - keep:]] if keep else []
+                size = keep
+                split = True
+    if parts:
+        line = "".join(parts).rstrip("\r")
+        if line or not split:
+            yield strip_colors(line)
+
+
+class _Abandoned(RCONError):
+    """The leading caller stopped reading before the response completed"""
+
+
+class _Flight:
+    """An in-flight read-only command that identical callers wait on"""
+    __slots__ = ("done", "result", "error")
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+    def wait(self):
+        self.done.wait()
+        if self.error is not None:
+            # A fresh exception per waiter; tracebacks are not shared
+            if isinstance(self.error, RCONError):
+                raise type(self.error)(str(self.error))
+            raise RCONError(str(self.error))
+        return self.result
+
+
+class RCONClient:
+    """Persistent, thread-safe RCON connection to a single server"""
+
+    def __init__(self, host, port, password, timeout=5.0, stats=None, cache=None, roster=None,
+                 scheduler=None, transcript=None):
+        try:
+            self.port = int(port)
+        except (TypeError, ValueError):
+            raise RCONError(f"Invalid RCON port: {port}")
+        self.host = host
+        self.password = password
+        self.timeout = timeout
+        self.stats = stats
+        self.cache = cache
+        self.roster = roster
+        self.scheduler = scheduler
+        self.transcript = transcript
+        self.server = f"{host}:{self.port}"
+        self._sock = None
+        self._lock = threading.RLock()
+        self._request_id = 0
+        self._open_phases = None
+        # Read-only commands in flight, by normalized text
+        self._flights = {}
+        self._flights_lock = threading.Lock()
+        # Receive buffer reused for every packet on this connection
+        self._buf = bytearray(MAX_PACKET_SIZE)
+
+    @property
+    def connected(self):
+        return self._sock is not None
+
+    def connect(self):
+        """Open the socket and authenticate; no-op when already connected"""
+        with self._lock:
+            if self._sock is not None:
+                return
+            started = time.perf_counter()
+            try:
+                sock = socket.create_connection((self.host, self.port), timeout=self.timeout)
+            except socket.timeout:
+                raise RCONTimeoutError("Connection timeout")
+            except ConnectionRefusedError:
+                raise RCONError("Connection refused")
+            except OSError as e:
+                raise RCONError(f"Connection failed: {e}")
+
+            sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+            self._sock = sock
+            connected = time.perf_counter()
+            try:
+                self._login()
+            except socket.timeout:
+                self.close()
+                raise RCONTimeoutError("Connection timeout")
+            except OSError as e:
+                self.close()
+                raise RCONError(f"Connection failed: {e}")
+            except RCONError:
+                self.close()
+                raise
+            # Picked up by the command that triggered the connect
+            self._open_phases = {"connect": connected - started, "auth": time.perf_counter() - connected}
+
+    def _drop_if_closed(self):
+        """Close an idle socket the server has already closed
+
+        A non-blocking peek sees the server's FIN before anything is sent,
+        so the command goes out on a fresh connection instead of failing.
+        Returns True when the socket was dropped.
+        """
+        if self._sock is None:
+            return False
+        try:
+            self._sock.setblocking(False)
+            try:
+                alive = self._sock.recv(1, socket.MSG_PEEK) != b""
+            finally:
+                self._sock.settimeout(self.timeout)
+        except BlockingIOError:
+            return False
+        except OSError:
+            alive = False
+        if not alive:
+            self.close()
+        return not alive
+
+    def _may_repeat(self, command):
+        """True for read-only commands, which are safe to send twice"""
+        return self.cache is not None and self.cache.is_read_only(command)
+
+    def reconnect(self):
+        """Drop the current socket and log in again"""
+        with self._lock:
+            self.close()
+            self.connect()
+
+    def close(self):
+        """Close the socket; the next command reconnects"""
+        with self._lock:
+            if self._sock is not None:
+                try:
+                    self._sock.close()
+                except OSError:
+                    pass
+                self._sock = None
+
+    def _recorders(self):
+        """(stats, transcript) for the calling thread's commands; None inside unrecorded()"""
+        if getattr(_context, 'unrecorded', False):
+            return None, None
+        return self.stats, self.transcript
+
+    def cached_response(self, command):
+        """Return a fresh cached response to a read-only command, or None
+
+        A hit answers the command, so it is transcribed, flagged "cached".
+        """
+        if self.cache is None:
+            return None
+        text = self.cache.get(self.server, command)
+        _, transcript = self._recorders()
+        if text is not None and transcript is not None:
+            transcript.record(self.server, command, text, True, cached=True)
+        return text
+
+    def command(self, command):
+        """Run a command and return the server's full response text"""
+        flight, leader = self._join_flight(command)
+        if not leader:
+            try:
+                return self._follow(command, flight)
+            except _Abandoned:
+                return self.command(command)
+        try:
+            data = bytearray()
+            for chunk in self._stream(command):
+                data += chunk
+            text = data.decode("utf-8", errors="replace")
+        except Exception as e:
+            self._land(command, flight, error=e)
+            raise
+        self._land(command, flight, result=text)
+        return text
+
+    def command_iter(self, command):
+        """Run a command, yielding response text chunks as packets arrive
+
+        The connection stays locked until the generator is exhausted; a
+        consumer that stops early causes the connection to be reset.  A
+        caller that joins an identical in-flight command gets its whole
+        response as one chunk.
+        """
+        flight, leader = self._join_flight(command)
+        if not leader:
+            try:
+                text = self._follow(command, flight)
+            except _Abandoned:
+                text = self.command(command)
+            yield text
+            return
+        parts = [] if flight is not None else None
+        landed = False
+        try:
+            decoder = codecs.getincrementaldecoder("utf-8")(errors="replace")
+            for chunk in self._stream(command):
+                text = decoder.decode(chunk)
+                if text:
+                    if parts is not None:
+                        parts.append(text)
+                    yield text
+            tail = decoder.decode(b"", final=True)
+            if tail:
+                if parts is not None:
+                    parts.append(tail)
+                yield tail
+            self._land(command, flight, result="".join(parts) if parts is not None else None)
+            landed = True
+        except Exception as e:
+            self._land(command, flight, error=e)
+            landed = True
+            raise
+        finally:
+            if not landed:
+                # Consumer stopped early; waiters must not hang
+                self._land(command, flight, error=_Abandoned("Request abandoned"))
+
+    def _join_flight(self, command):
+        """Return (flight, leader) for a read-only command
+
+        The first caller leads and runs the command; identical callers
+        arriving before it finishes follow and wait for its result.
+        Commands that may change server state are never coalesced and get
+        (None, True).
+        """
+        if self.cache is None or not self.cache.is_read_only(command):
+            return None, True
+        key = normalize_command(command)
+        with self._flights_lock:
+            flight = self._flights.get(key)
+            if flight is None:
+                flight = self._flights[key] = _Flight()
+                return flight, True
+        stats, _ = self._recorders()
+        if stats:
+            stats.record_coalesced(self.server, command)
+        return flight, False
+
+    def _follow(self, command, flight):
+        """Wait for the leading caller's response and transcribe it for this one"""
+        _, transcript = self._recorders()
+        started = time.perf_counter()
+        try:
+            text = flight.wait()
+        except _Abandoned:
+            raise
+        except RCONError as e:
+            if transcript is not None:
+                transcript.record(self.server, command, str(e), False, coalesced=True)
+            raise
+        if transcript is not None:
+            transcript.record(self.server, command, text, True, time.perf_counter() - started, coalesced=True)
+        return text
+
+    def _land(self, command, flight, result=None, error=None):
+        if flight is None:
+            return
+        with self._flights_lock:
+            self._flights.pop(normalize_command(command), None)
+        flight.result = result
+        flight.error = error
+        flight.done.set()
+
+    @contextmanager
+    def _slot(self):
+        """Hold this server's scheduler slot; yields the seconds waited, or None"""
+        if self.scheduler is None:
+            yield None
+            return
+        with self.scheduler.slot(self.server) as waited:
+            yield waited
+
+    def _stream(self, command):
+        """Yield the raw payload of each response packet for a command
+
+        Payloads are views into the shared receive buffer and are only
+        valid until the next packet is read.
+        """
+        body = command.encode("utf-8")
+        if len(body) > MAX_COMMAND_LENGTH:
+            raise RCONError(f"Command too long ({len(body)} bytes, max {MAX_COMMAND_LENGTH})")
+
+        stats, transcript = self._recorders()
+        with self._slot() as queued, self._lock:
+            command_started = time.perf_counter()
+            phases = {}
+            if queued is not None:
+                phases["queue"] = queued
+            finished = False
+            # Keep the full text of cacheable responses and player lists;
+            # other commands invalidate what is cached for this server.  The
+            # transcript alone needs no more than TRANSCRIPT_BYTES
+            keep_all = False
+            if self.cache is not None:
+                self.cache.note_command(self.server, command)
+                keep_all = self.cache.ttl_for(command) > 0
+            if self.roster is not None and is_list_command(command):
+                keep_all = True
+            response = bytearray() if keep_all or transcript is not None else None
+            truncated = False
+            try:
+                for attempt in range(2):
+                    self._drop_if_closed()
+                    reused = self._sock is not None
+                    self._open_phases = None
+                    self.connect()
+                    if self._open_phases:
+                        phases.update(self._open_phases)
+                    started = False
+                    finished = False
+                    delivered = False
+                    try:
+                        request_id, packet = self._packet(SERVERDATA_EXECCOMMAND, body)
+                        sent = time.perf_counter()
+                        self._sock.sendall(packet)
+                        delivered = True
+                        phases["send"] = time.perf_counter() - sent
+                        sentinel_id = None
+                        while True:
+                            packet_id, _, payload = self._read_packet()
+                            if packet_id == sentinel_id:
+                                finished = True
+                                return
+                            if packet_id != request_id:
+                                continue
+                            if not started:
+                                phases["first_byte"] = time.perf_counter() - sent
+                                started = True
+                            more = len(payload) >= FRAGMENT_SIZE
+                            if response is not None and not truncated:
+                                if keep_all or len(response) + len(payload) <= TRANSCRIPT_BYTES:
+                                    response += payload
+                                else:
+                                    response += payload[:TRANSCRIPT_BYTES - len(response)]
+                                    truncated = True
+                            yield payload
+                            if sentinel_id is None:
+                                if not more:
+                                    finished = True
+                                    return
+                                sentinel_id, sentinel = self._packet(SERVERDATA_RESPONSE_VALUE, b"")
+                                self._sock.sendall(sentinel)
+                    except socket.timeout:
+                        raise RCONTimeoutError("Connection timeout")
+                    except (OSError, _ConnectionLost) as e:
+                        self.close()
+                        # An idle socket the server already dropped: retry once,
+                        # but a command the server may have run only if it
+                        # is read-only
+                        if reused and attempt == 0 and not started and (
+                                not delivered or self._may_repeat(command)):
+                            continue
+                        raise RCONError(f"Connection error: {e}")
+                    finally:
+                        # Anything but a clean end leaves unread packets behind
+                        if not finished:
+                            self.close()
+            except RCONError as e:
+                if stats:
+                    stats.record_error(self.server, command)
+                if transcript is not None:
+                    transcript.record(self.server, command, str(e), False)
+                raise
+            finally:
+                elapsed = time.perf_counter() - command_started
+                if finished and stats:
+                    phases["complete"] = elapsed
+                    stats.record(self.server, command, phases)
+                if finished and response is not None:
+                    text = response.decode("utf-8", errors="replace")
+                    if keep_all and self.cache is not None:
+                        self.cache.put(self.server, command, text)
+                    if keep_all and self.roster is not None:
+                        self.roster.observe(command, text)
+                    if transcript is not None:
+                        transcript.record(self.server, command, text, True, elapsed, truncated=truncated)
+
+    def batch(self, commands, window=BATCH_WINDOW):
+        """Pipeline several commands over the connection
+
+        Commands are written back-to-back in windows and responses are
+        matched to commands by request ID.  Each window takes its own
+        scheduler slot, so more urgent commands can run between windows.
+        Returns a list of (success, text, seconds) tuples in command order,
+        where seconds runs from the window's send to the command's last
+        response packet.  A dropped connection fails the commands it left
+        unanswered and every later one; commands already answered keep
+        their results and are never sent again.
+        """
+        results = [None] * len(commands)
+        pending = []
+        for index, command in enumerate(commands):
+            body = command.encode("utf-8")
+            if len(body) > MAX_COMMAND_LENGTH:
+                results[index] = (False, f"Command too long ({len(body)} bytes, max {MAX_COMMAND_LENGTH})", 0.0)
+            else:
+                pending.append((index, body))
+
+        _, transcript = self._recorders()
+        if self.cache is not None:
+            for _, body in pending:
+                self.cache.note_command(self.server, body.decode("utf-8"))
+        for start in range(0, len(pending), window):
+            chunk = pending[start:start + window]
+            try:
+                with self._slot() as queued, self._lock:
+                    self._batch_window(chunk, results, retry=True, queued=queued)
+            except RCONError as e:
+                for index, body in pending[start:]:
+                    if results[index] is None:
+                        results[index] = (False, str(e), 0.0)
+                        if transcript is not None:
+                            transcript.record(self.server, body.decode("utf-8"), str(e), False)
+                break
+        return results
+
+    def _batch_window(self, chunk, results, retry, queued=None):
+        stats, transcript = self._recorders()
+        self._drop_if_closed()
+        reused = self._sock is not None
+        self.connect()
+        finished = False
+        error = None
+        # Per command, in send order: [index, body, response, seconds]
+        entries = []
+        positions = {}
+        # Commands before this position have their whole response
+        complete = 0
+        answered = False
+        delivered = False
+        try:
+            packets = []
+            for index, body in chunk:
+                request_id, packet = self._packet(SERVERDATA_EXECCOMMAND, body)
+                positions[request_id] = len(entries)
+                entries.append([index, body, bytearray(), 0.0])
+                packets.append(packet)
+            last_id = request_id
+            sentinel_id = None
+
+            started = time.perf_counter()
+            self._sock.sendall(b"".join(packets))
+            delivered = True
+            while True:
+                packet_id, _, payload = self._read_packet()
+                if packet_id == sentinel_id:
+                    complete = len(entries)
+                    finished = True
+                    break
+                position = positions.get(packet_id)
+                if position is None:
+                    continue
+                answered = True
+                entry = entries[position]
+                entry[2] += payload
+                entry[3] = time.perf_counter() - started
+                # Responses come back in order: a reply to this command ends
+                # every earlier one, and a short packet ends this one
+                complete = max(complete, position + (len(payload) < FRAGMENT_SIZE))
+                # The last command's final packet completes the whole window
+                if packet_id == last_id and sentinel_id is None:
+                    if len(payload) < FRAGMENT_SIZE:
+                        finished = True
+                        break
+                    sentinel_id, sentinel = self._packet(SERVERDATA_RESPONSE_VALUE, b"")
+                    self._sock.sendall(sentinel)
+        except socket.timeout:
+            error = RCONTimeoutError("Connection timeout")
+        except (OSError, _ConnectionLost) as e:
+            self.close()
+            # An idle socket the server already dropped: retry once, but
+            # never once a reply shows the server has run some of the
+            # window, and after sending only when every command is read-only
+            if retry and reused and not answered and (
+                    not delivered or all(self._may_repeat(body.decode("utf-8")) for _, body in chunk)):
+                return self._batch_window(chunk, results, retry=False, queued=queued)
+            error = RCONError(f"Connection error: {e}")
+        finally:
+            if not finished:
+                self.close()
+
+        # Commands answered in full keep their results even when the
+        # connection dropped later in the window
+        for index, body, data, seconds in entries[:complete]:
+            command = body.decode("utf-8")
+            text = data.decode("utf-8", errors="replace")
+            results[index] = (True, text, seconds)
+            if self.roster is not None:
+                self.roster.observe(command, text)
+            if stats:
+                # Pipelined commands share the send, so only completion is recorded
+                phases = {"complete": seconds}
+                if queued is not None:
+                    phases["queue"] = queued
+                stats.record(self.server, command, phases)
+            if transcript is not None:
+                transcript.record(self.server, command, text, True, seconds)
+        if error is not None:
+            raise error
+
+    def _login(self):
+        request_id, packet = self._packet(SERVERDATA_AUTH, self.password.encode("utf-8"))
+        self._sock.sendall(packet)
+        while True:
+            packet_id, packet_type, _ = self._read_packet()
+            if packet_type != SERVERDATA_AUTH_RESPONSE:
+                # Some servers send an empty RESPONSE_VALUE ahead of the auth reply
+                continue
+            if packet_id == -1:
+                raise RCONAuthError("Authentication failed: incorrect RCON password")
+            if packet_id == request_id:
+                return
+
+    def _packet(self, packet_type, body):
+        self._request_id = self._request_id % 0x7FFFFFFF + 1
+        header = _HEADER.pack(len(body) + 10, self._request_id, packet_type)
+        return self._request_id, header + body + b"\x00\x00"
+
+    def _read_packet(self):
+        if _QUICKACK:
+            # Acknowledge immediately so the server's Nagle buffer flushes
+            self._sock.setsockopt(socket.IPPROTO_TCP, _QUICKACK, 1)
+        self._recv_into(4)
+        (length,) = _LENGTH.unpack_from(self._buf)
+        if length < 10 or length > MAX_PACKET_LENGTH:
+            raise RCONError(f"Malformed RCON packet (length {length})")
+        if length > len(self._buf):
+            self._buf = bytearray(length)
+        self._recv_into(length)
+        packet_id, packet_type = struct.unpack_from("<ii", self._buf)
+        return packet_id, packet_type, memoryview(self._buf)[8:length - 2]
+
+    def _recv_into(self, size):
+        view = memoryview(self._buf)
+        received = 0
+        while received < size:
+            n = self._sock.recv_into(view[received:size])
+            if not n:
+                raise _ConnectionLost("Connection closed by server")
+            received += n
+
+
+_clients = {}
+_clients_lock = threading.Lock()
+
+
+def get_client(host, port, password, timeout=5.0):
+    """Return the shared persistent client for a server, creating it on demand
+
+    Clients are keyed by address and password, so a configuration change
+    produces a fresh login while the previous connection is closed.  Shared
+    clients record their timings in rcon_stats.get_stats(), cache
+    read-only responses in rcon_cache.get_cache(), feed "list" output to
+    rcon_roster.get_roster(), take their slots from
+    rcon_scheduler.get_scheduler() and write to
+    rcon_transcript.get_transcript().
+    """
+    key = (host, str(port), password)
+    with _clients_lock:
+        client = _clients.get(key)
+        if client is None:
+            for old_key in [k for k in _clients if k[:2] == key[:2]]:
+                _clients.pop(old_key).close()
+            client = RCONClient(host, port, password, timeout, stats=get_stats(), cache=get_cache(),
+                                roster=get_roster(host, port), scheduler=get_scheduler(),
+                                transcript=get_transcript())
+            _clients[key] = client
+        return client
+
+
+def close_all():
+    """Close every shared client"""
+    with _clients_lock:
+        for client in _clients.values():
+            client.close()
+        _clients.clear()
@@ -0,0 +1,417 @@
+"""Tab completion from the server's own command tree
+
+The server describes its commands in "help" output, one usage line per
+command:
+
+    /gamemode <gamemode> [<target>]
+    /time (add|query|set) ...
+
+The first Tab press makes CompletionEngine fetch "help" once, then
+"help <command>" for every command it lists (pipelined in a few windows,
+in the scheduled priority class and kept out of the stats and transcript),
+which gives the full usage of each subcommand:
+
+    /execute as <targets> -> execute
+    /time set (day|night|noon|midnight)
+    /time set <time>
+
+Every usage line is expanded into token paths ("(a|b)" alternatives and
+"[...]" optional parts) and merged into a tree of nested dicts, where keys
+are literals, "<argument>" placeholders or "->" for a redirect back to
+another command (so "execute as @a" continues with execute's own
+subcommands, and "execute run" with any command).  The tree is saved as JSON under completions/, named by the
+server version the health check reports through set_version(), so later
+sessions and other servers running the same version skip the fetch; a
+new version is loaded at the next Tab press after the server reports it.  Without a known version the
+tree is keyed by a hash of the plain "help" output instead.
+
+complete() walks the tree locally: no RCON traffic per keystroke.  Player
+arguments are completed with target selectors and the names from the
+server's rcon_roster, which "list" output and health checks keep current.
+
+Bukkit-style paginated help ("Help: Index (1/9)") is followed page by
+page; its usage lines carry less grammar, so completion there is mostly
+command names.
+"""
+import hashlib
+import json
+import os
+import re
+import threading
+import time
+
+from rcon_client import RCONError, strip_colors, unrecorded
+from rcon_scheduler import SCHEDULED, priority
+
+DEFAULT_COMPLETION_DIR = "completions"
+
+# Bump when the tree format changes so stale files are refetched
+TREE_FORMAT = 1
+
+SELECTORS = ("@a", "@e", "@p", "@r", "@s")
+
+# Arguments that take a player name or selector
+_PLAYER_ARGUMENT = re.compile(r"target|player|victim|entit", re.IGNORECASE)
+
+# Arguments spanning several words, by placeholder name
+ARGUMENT_WIDTHS = {
+    "pos": 3, "location": 3, "destination": 3, "targetPos": 3, "sourcePos": 3,
+    "from": 3, "to": 3, "begin": 3, "end": 3, "center": 3,
+    "rotation": 2, "pos2d": 2
+}
+
+# Caps on the expansion of one usage line and on the states of a walk
+MAX_PATHS = 256
+MAX_STATES = 64
+
+MAX_MATCHES = 50
+
+# Seconds before a failed fetch is tried again
+RETRY_SECONDS = 30.0
+
+# "/name rest" anywhere in the text: RCON joins vanilla help lines without newlines
+_USAGE = re.compile(r"/([a-z0-9_.:-]+)((?:[^/\n]|/(?![a-z]))*)", re.IGNORECASE)
+_PAGE_HEADER = re.compile(r"Help: Index \((\d+)/(\d+)\)", re.IGNORECASE)
+_UNSAFE = re.compile(r"[^\w.-]")
+
+
+def parse_help(text):
+    """Return the usage lines in help output as [(command, usage after it)]"""
+    usages = []
+    for match in _USAGE.finditer(strip_colors(text)):
+        name, rest = match.group(1), match.group(2).strip()
+        if name.endswith(":"):
+            # "/ban: Bans a player" (Bukkit index): a description, not usage
+            name, rest = name[:-1], ""
+        if name:
+            usages.append((name.lower(), rest))
+    return usages
+
+
+def _split_top(text, separator):
+    """Split on separator outside (), [] and <>"""
+    parts = []
+    depth = 0
+    current = []
+    for char in text:
+        if char in "([<":
+            depth += 1
+        elif char in ")]>":
+            depth = max(0, depth - 1)
+        if depth == 0 and (char == separator or (separator == " " and char.isspace())):
+            parts.append("".join(current))
+            current = []
+        else:
+            current.append(char)
+    parts.append("".join(current))
+    return [part for part in parts if part.strip()] if separator == " " else parts
+
+
+def _alternatives(text):
+    paths = []
+    for alternative in _split_top(text, "|"):
+        paths.extend(_sequence(alternative))
+    return paths[:MAX_PATHS]
+
+
+def _sequence(text):
+    paths = [[]]
+    for token in _split_top(text.strip(), " "):
+        if token.startswith("(") and token.endswith(")"):
+            options = _alternatives(token[1:-1])
+        elif token.startswith("[") and token.endswith("]"):
+            options = [[]] + _alternatives(token[1:-1])
+        elif set(token) <= set("-.") and token != "...":
+            # Separator rules carry no grammar
+            options = [[]]
+        else:
+            options = [[token]]
+        paths = [path + option for path in paths for option in options][:MAX_PATHS]
+    return paths
+
+
+def usage_paths(usage):
+    """Expand one usage line into token paths"""
+    return _sequence(usage)
+
+
+class CommandTree:
+    """Nested dicts of literals, "<argument>" placeholders and "->" redirects"""
+
+    def __init__(self, root=None):
+        self.root = root if root is not None else {}
+
+    def add_usage(self, command, usage):
+        for path in usage_paths(usage):
+            node = self.root.setdefault(command, {})
+            tokens = iter(path)
+            previous = None
+            for token in tokens:
+                if token == "->":
+                    target = next(tokens, None)
+                    if target:
+                        node["->"] = target.lstrip("/")
+                    break
+                if token == "...":
+                    # "execute run ..." takes any command; elsewhere "..."
+                    # stands for usage shown by "help <command>"
+                    if previous == "run":
+                        node["->"] = ""
+                    break
+                node = node.setdefault(token, {})
+                previous = token
+
+    def __len__(self):
+        return len(self.root)
+
+    def _children(self, node):
+        yield from ((key, child) for key, child in node.items() if key != "->")
+        target = node.get("->")
+        if target == "":
+            yield from self.root.items()
+        elif target is not None and target in self.root:
+            yield from self.root[target].items()
+
+    def complete(self, text, players=()):
+        """Return {"start", "matches", "hints"} for the last word of text
+
+        start is the offset where the last word begins; each match can
+        replace text from there.  hints are the "<argument>" placeholders
+        that may come next.
+        """
+        words = _split_words(text)
+        if words and not text[-1:].isspace():
+            start, partial = words.pop()
+        else:
+            start, partial = len(text), ""
+        if not words and partial.startswith("/"):
+            start, partial = start + 1, partial[1:]
+
+        # Each state is (node, words still owed to a multi-word argument)
+        states = [(self.root, 0)]
+        for index, (_, word) in enumerate(words):
+            if index == 0:
+                word = word.lstrip("/")
+            advanced = []
+            for node, owed in states:
+                if owed:
+                    advanced.append((node, owed - 1))
+                    continue
+                for key, child in self._children(node):
+                    if key.startswith("<"):
+                        advanced.append((child, ARGUMENT_WIDTHS.get(key[1:-1], 1) - 1))
+                    elif key == word:
+                        advanced.append((child, 0))
+            states = advanced[:MAX_STATES]
+
+        matches = set()
+        hints = []
+        for node, owed in states:
+            if owed:
+                continue
+            for key, _ in self._children(node):
+                if key.startswith("<"):
+                    if key not in hints:
+                        hints.append(key)
+                    if _PLAYER_ARGUMENT.search(key):
+                        matches.update(name for name in players if name.lower().startswith(partial.lower()))
+                        matches.update(s for s in SELECTORS if s.startswith(partial))
+                elif key.startswith(partial):
+                    matches.add(key)
+        return {"start": start, "matches": sorted(matches, key=str.lower)[:MAX_MATCHES], "hints": hints}
+
+
+def _split_words(text):
+    """Return [(offset, word)] for the words of text, keeping {...}, [...] and "..." whole"""
+    words = []
+    depth = 0
+    quote = False
+    start = None
+    for offset, char in enumerate(text):
+        if start is None:
+            if char.isspace():
+                continue
+            start = offset
+        if quote:
+            if char == '"':
+                quote = False
+        elif char == '"':
+            quote = True
+        elif char in "{[":
+            depth += 1
+        elif char in "}]":
+            depth = max(0, depth - 1)
+        elif char.isspace() and depth == 0:
+            words.append((start, text[start:offset]))
+            start = None
+    if start is not None:
+        words.append((start, text[start:]))
+    return words
+
+
+def fetch_help(client):
+    """Return the full "help" index, following Bukkit-style pages"""
+    text = client.command("help")
+    pages = _PAGE_HEADER.search(strip_colors(text))
+    if pages:
+        extra = [f"help {page}" for page in range(int(pages.group(1)) + 1, int(pages.group(2)) + 1)]
+        for ok, page_text, _ in client.batch(extra):
+            if ok:
+                text += "\n" + page_text
+    return text
+
+
+def build_tree(client, text):
+    """Build a CommandTree from the help index and each command's own help"""
+    tree = CommandTree()
+    usages = parse_help(text)
+    for command, usage in usages:
+        tree.add_usage(command, usage)
+
+    # "help <command>" lists every subcommand's usage
+    commands = sorted(tree.root)
+    for command, (ok, detail, _) in zip(commands, client.batch([f"help {c}" for c in commands])):
+        if not ok:
+            continue
+        for name, usage in parse_help(detail):
+            if name == command:
+                tree.add_usage(name, usage)
+    return tree
+
+
+class CompletionEngine:
+    """Command completion for one server, from a tree cached on disk by version"""
+
+    def __init__(self, server, client=None, roster=None, directory=DEFAULT_COMPLETION_DIR):
+        self.server = server
+        self.client = client
+        self.roster = roster
+        self.directory = directory
+        self.version = None
+        # Version from the latest health check, loaded when completion is used
+        self.server_version = None
+        self.tree = None
+        self.error = None
+        self._lock = threading.Lock()
+        self._loading = False
+        self._failed_at = None
+
+    @property
+    def ready(self):
+        return self.tree is not None
+
+    def load(self, version=None):
+        """Load the tree from the disk cache, or fetch it over RCON and cache it
+
+        Raises RCONError when the fetch fails.
+        """
+        version = version or None
+        tree = self._read(version) if version else None
+        if tree is None:
+            with priority(SCHEDULED), unrecorded():
+                text = fetch_help(self.client)
+                key = version or "help-" + hashlib.sha1(text.encode("utf-8")).hexdigest()[:12]
+                tree = None if version else self._read(key)
+                if tree is None:
+                    tree = build_tree(self.client, text)
+                    if not len(tree):
+                        raise RCONError("The server's help output lists no commands")
+                    self._write(key, tree)
+        with self._lock:
+            self.tree = tree
+            self.version = version
+            self.error = None
+        return tree
+
+    def set_version(self, version):
+        """Note the server version reported by a health check; fetches nothing"""
+        self.server_version = version or None
+
+    def load_async(self, version=None):
+        """Load on a background thread unless this version is loaded or loading
+
+        Without a version, the one from set_version() is used.
+        """
+        version = version or self.server_version
+        with self._lock:
+            if self._loading or (self.tree is not None and (not version or version == self.version)):
+                return
+            if self._failed_at is not None and time.monotonic() - self._failed_at < RETRY_SECONDS:
+                return
+            self._loading = True
+        threading.Thread(target=self._load_in_background, args=(version,), name="rcon-complete",
+                         daemon=True).start()
+
+    def _load_in_background(self, version):
+        try:
+            self.load(version)
+            self._failed_at = None
+        except RCONError as e:
+            self.error = str(e)
+            self._failed_at = time.monotonic()
+        finally:
+            with self._lock:
+                self._loading = False
+
+    def complete(self, text):
+        """Completions for the last word of text; see CommandTree.complete()
+
+        Starts loading the tree when there is none yet, or when the server
+        now reports another version than the tree was loaded for.
+        """
+        tree = self.tree
+        if tree is None or (self.server_version and self.version and self.server_version != self.version):
+            self.load_async()
+        if tree is None:
+            return {"start": len(text), "matches": [], "hints": [], "ready": False}
+        players = self.roster.names() if self.roster is not None else ()
+        result = tree.complete(text, players)
+        result['ready'] = True
+        return result
+
+    def _path(self, key):
+        return os.path.join(self.directory, _UNSAFE.sub("_", key) + ".json")
+
+    def _read(self, key):
+        try:
+            with open(self._path(key), 'r', encoding='utf-8') as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return None
+        if data.get('format') != TREE_FORMAT:
+            return None
+        return CommandTree(data['tree'])
+
+    def _write(self, key, tree):
+        path = self._path(key)
+        temp = path + ".tmp"
+        try:
+            os.makedirs(self.directory, exist_ok=True)
+            with open(temp, 'w', encoding='utf-8') as f:
+                json.dump({"format": TREE_FORMAT, "key": key, "fetched": time.time(), "tree": tree.root}, f)
+            os.replace(temp, path)
+        except OSError:
+            # Completion still works for this session
+            pass
+
+
+def common_prefix(matches):
+    """Longest prefix shared by every match, for partial Tab completion"""
+    return os.path.commonprefix(matches) if matches else ""
+
+
+_engines = {}
+_engines_lock = threading.Lock()
+
+
+def get_completer(client, roster=None):
+    """Return the shared completion engine for a client's server"""
+    with _engines_lock:
+        engine = _engines.get(client.server)
+        if engine is None:
+            engine = _engines[client.server] = CompletionEngine(client.server, client, roster)
+        # The client changes with the password
+        engine.client = client
+        if roster is not None:
+            engine.roster = roster
+        return engine
@@ -0,0 +1,142 @@
+"""Batched, size-capped console writer for the Tk GUI
+
+Appends are collected in a ring buffer and flushed to the Text widget at
+most once per frame as a single insert, with the colour tags registered
+once up front.  The widget is trimmed in bulk when it grows past its cap,
+so append cost stays constant and memory stays bounded however long the
+window is left open.
+
+Jobs that print while they run write to a stream opened when they are
+submitted.  Streams on one channel show their lines in the order they were
+opened: the oldest open stream writes straight through, and later ones
+collect their lines in their own queue until the streams before them
+close.
+"""
+import tkinter as tk
+from collections import deque
+from datetime import datetime
+
+# Tag colours shared by every console line
+TAG_COLORS = {
+    "timestamp": "#6e7681",
+    "info": "#58a6ff",
+    "success": "#3fb950",
+    "error": "#f85149",
+    "warning": "#d29922"
+}
+
+# Small label after a line, e.g. "cached"
+BADGE_STYLE = {"foreground": "#8b949e", "background": "#21262d", "font": ("Consolas", 8)}
+
+DEFAULT_MAX_LINES = 5000
+
+# Roughly one frame at 60 Hz
+FLUSH_INTERVAL_MS = 16
+
+
+class _Stream:
+    __slots__ = ("channel", "lines", "closed")
+
+    def __init__(self, channel, max_lines):
+        self.channel = channel
+        self.lines = deque(maxlen=max_lines)
+        self.closed = False
+
+
+class ConsoleView:
+    """Ring-buffered writer for a read-only Tk Text console"""
+
+    def __init__(self, widget, max_lines=DEFAULT_MAX_LINES, flush_ms=FLUSH_INTERVAL_MS):
+        self.widget = widget
+        self.max_lines = max_lines
+        self.flush_ms = flush_ms
+        # Trim in chunks so the delete cost is paid rarely
+        self.trim_slack = max(100, max_lines // 10)
+        # Lines waiting for the next flush; a flood keeps only the newest
+        self._pending = deque(maxlen=max_lines)
+        self._flush_scheduled = False
+        # Open streams per channel, oldest first
+        self._streams = {}
+
+        for tag, color in TAG_COLORS.items():
+            self.widget.tag_config(tag, foreground=color)
+        self.widget.tag_config("badge", **BADGE_STYLE)
+
+    def append(self, text, msg_type="info", badge=None):
+        """Queue a timestamped line; it appears on the next flush"""
+        self._queue(_line(text, msg_type, badge))
+
+    def open_stream(self, channel=None):
+        """Reserve the next place on a channel for one job's output"""
+        stream = _Stream(channel, self.max_lines)
+        self._streams.setdefault(channel, deque()).append(stream)
+        return stream
+
+    def write(self, stream, text, msg_type="info", badge=None):
+        """Add a line to a stream; it waits while earlier streams are open"""
+        line = _line(text, msg_type, badge)
+        if self._streams[stream.channel][0] is stream:
+            self._queue(line)
+        else:
+            stream.lines.append(line)
+
+    def close_stream(self, stream):
+        """End a stream, letting the next one on its channel through"""
+        stream.closed = True
+        streams = self._streams[stream.channel]
+        while streams and streams[0].closed:
+            streams.popleft()
+            if streams:
+                for line in streams[0].lines:
+                    self._queue(line)
+                streams[0].lines.clear()
+
+    def _queue(self, line):
+        self._pending.append(line)
+        if not self._flush_scheduled:
+            self._flush_scheduled = True
+            self.widget.after(self.flush_ms, self.flush)
+
+    def flush(self):
+        """Write all pending lines with one insert and trim old lines"""
+        self._flush_scheduled = False
+        if not self._pending:
+            return
+
+        args = []
+        for timestamp, text, msg_type, badge in self._pending:
+            args.extend((timestamp, "timestamp", text, msg_type))
+            if badge:
+                args.extend((" ", msg_type, f" {badge} ", "badge"))
+            args.extend(("\n", msg_type))
+        self._pending.clear()
+
+        # Only follow new output when the view is already at the bottom
+        at_bottom = self.widget.yview()[1] >= 0.999
+
+        self.widget.config(state=tk.NORMAL)
+        self.widget.insert(tk.END, *args)
+
+        line_count = int(self.widget.index("end-1c").split(".")[0])
+        if line_count > self.max_lines + self.trim_slack:
+            excess = line_count - self.max_lines
+            self.widget.delete("1.0", f"{excess + 1}.0")
+
+        self.widget.config(state=tk.DISABLED)
+        if at_bottom:
+            self.widget.see(tk.END)
+
+    def clear(self):
+        """Drop everything shown and pending"""
+        self._pending.clear()
+        for streams in self._streams.values():
+            for stream in streams:
+                stream.lines.clear()
+        self.widget.config(state=tk.NORMAL)
+        self.widget.delete("1.0", tk.END)
+        self.widget.config(state=tk.DISABLED)
+
+
+def _line(text, msg_type, badge):
+    timestamp = datetime.now().strftime("%H:%M:%S")
+    return (f"[{timestamp}] ", text, msg_type, badge)
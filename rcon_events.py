@@ -0,0 +1,93 @@
+"""Push channel from Python to the WebView page
+
+pywebview only lets the page pull data by awaiting pywebview.api calls.
+EventStream lets the backend push instead: events are queued from any
+thread and a background thread flushes them to the page as one
+evaluate_js call per frame.  The backlog is bounded; when the page falls
+behind, the oldest events are dropped and the page is told how many.
+"""
+import json
+import threading
+import time
+from collections import deque
+
+DEFAULT_MAX_BACKLOG = 5000
+
+# One flush per animation frame at 60 Hz
+FRAME_INTERVAL = 1 / 60
+
+# Page-side function receiving each batch (defined in get_html())
+JS_HANDLER = "window.rconEvents"
+
+
+class EventStream:
+    """Batched, bounded Python-to-page event queue"""
+
+    def __init__(self, max_backlog=DEFAULT_MAX_BACKLOG, interval=FRAME_INTERVAL):
+        self.interval = interval
+        self._backlog = deque(maxlen=max_backlog)
+        self._dropped = 0
+        self._cond = threading.Condition()
+        self._evaluate = None
+        self._closed = False
+        self._thread = None
+
+    def attach(self, window):
+        """Start delivering to a pywebview window once its page has loaded"""
+        # run_js (pywebview 5+) does not wait for the page to answer
+        evaluate = getattr(window, 'run_js', None) or window.evaluate_js
+        with self._cond:
+            self._evaluate = evaluate
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="rcon-events", daemon=True)
+                self._thread.start()
+            self._cond.notify()
+
+    def push(self, event_type, **data):
+        """Queue an event from any thread"""
+        data['type'] = event_type
+        with self._cond:
+            if len(self._backlog) == self._backlog.maxlen:
+                self._dropped += 1
+            self._backlog.append(data)
+            self._cond.notify()
+
+    def console(self, text, level="info", badge=None):
+        """Queue a console line for the page"""
+        if badge:
+            self.push("console", text=text, level=level, badge=badge)
+        else:
+            self.push("console", text=text, level=level)
+
+    def close(self):
+        with self._cond:
+            self._closed = True
+            self._cond.notify()
+
+    def _run(self):
+        last_flush = 0.0
+        while True:
+            with self._cond:
+                while not self._closed and not self._backlog:
+                    self._cond.wait()
+                if self._closed:
+                    return
+
+            # Let events arriving within the same frame join this batch
+            wait = self.interval - (time.monotonic() - last_flush)
+            if wait > 0:
+                time.sleep(wait)
+
+            with self._cond:
+                batch = list(self._backlog)
+                self._backlog.clear()
+                if self._dropped:
+                    batch.insert(0, {"type": "dropped", "count": self._dropped})
+                    self._dropped = 0
+                evaluate = self._evaluate
+
+            last_flush = time.monotonic()
+            try:
+                evaluate(f"{JS_HANDLER} && {JS_HANDLER}({json.dumps(batch)})")
+            except Exception as e:
+                print(f"Error delivering events: {e}")
@@ -0,0 +1,208 @@
+"""Bounded command execution for the GUIs
+
+A fixed pool of worker threads drains a bounded submission queue, so a
+storm of button clicks or scripted input never creates more threads or
+connections than the pool size.  When the queue is full, submit() refuses
+the job instead of blocking, and callers surface that as backpressure.
+
+Each job has an rcon_scheduler priority class.  Workers take interactive
+jobs before scheduled ones and scheduled before bulk, and bulk jobs never
+occupy the last worker, so an operator's command starts at once even
+while batches fill the pool.  The job runs in its class, which carries on
+to the server slots its commands wait for.
+
+Completion callbacks go through a caller-provided deliver function (e.g.
+Tk's root.after) so they run on the UI thread, always after the
+executor's lock is released, so a callback may submit or cancel jobs.
+With ordered=True they are delivered in submission order within a class,
+even when a later job finishes first, for callers that print results in
+sequence; otherwise each is delivered as soon as its job finishes.  Jobs
+still waiting in the queue can be cancelled.
+"""
+import threading
+from collections import deque
+from concurrent.futures import CancelledError
+
+from rcon_scheduler import BULK, INTERACTIVE, PRIORITY_NAMES, priority, priority_level
+
+DEFAULT_WORKERS = 4
+DEFAULT_MAX_QUEUE = 64
+
+
+# Job states
+QUEUED = "queued"
+RUNNING = "running"
+DONE = "done"
+CANCELLED = "cancelled"
+
+
+class Job:
+    """A unit of work queued on a CommandExecutor"""
+    __slots__ = ("seq", "level", "fn", "args", "on_done", "result", "error", "state")
+
+    def __init__(self, seq, level, fn, args, on_done):
+        self.seq = seq
+        self.level = level
+        self.fn = fn
+        self.args = args
+        self.on_done = on_done
+        self.result = None
+        self.error = None
+        self.state = QUEUED
+
+
+class CommandExecutor:
+    """Fixed-size worker pool with bounded priority queues and optionally ordered completion"""
+
+    def __init__(self, workers=DEFAULT_WORKERS, max_queue=DEFAULT_MAX_QUEUE,
+                 deliver=None, on_depth=None, ordered=False):
+        self.max_queue = max_queue
+        self.ordered = ordered
+        # One worker is kept free of bulk jobs
+        self.max_bulk = max(1, workers - 1)
+        self._deliver = deliver or (lambda fn: fn())
+        self._on_depth = on_depth
+        self._lock = threading.Lock()
+        self._ready = threading.Condition(self._lock)
+        self._queues = [deque() for _ in PRIORITY_NAMES]
+        self._queued = 0
+        self._running_bulk = 0
+        self._stopping = False
+        # Sequence numbers and out-of-order finished jobs, per class
+        self._next_seq = [0] * len(PRIORITY_NAMES)
+        self._next_delivery = [0] * len(PRIORITY_NAMES)
+        self._finished = [{} for _ in PRIORITY_NAMES]
+        # Finished jobs awaiting delivery, drained by one thread at a time
+        self._outbox = deque()
+        self._delivering = threading.Lock()
+        self._pending = 0
+        self._threads = []
+        for i in range(workers):
+            thread = threading.Thread(target=self._worker, name=f"rcon-worker-{i}", daemon=True)
+            thread.start()
+            self._threads.append(thread)
+
+    @property
+    def depth(self):
+        """Number of jobs queued or running"""
+        return self._pending
+
+    def submit(self, fn, *args, on_done=None, level=INTERACTIVE):
+        """Queue fn(*args) in a priority class; returns the Job, or None when the queue is full
+
+        on_done(result, error) is delivered once the job has finished and,
+        for an ordered executor, every job submitted before it in the same
+        class too.
+        """
+        level = priority_level(level)
+        with self._lock:
+            if self._queued >= self.max_queue:
+                return None
+            job = Job(self._next_seq[level], level, fn, args, on_done)
+            self._queues[level].append(job)
+            self._queued += 1
+            self._next_seq[level] += 1
+            self._pending += 1
+            depth = self._pending
+            self._ready.notify()
+        self._notify_depth(depth)
+        return job
+
+    def cancel(self, job):
+        """Cancel a job that has not started; returns True on success
+
+        A cancelled job still completes in order, with a CancelledError.
+        """
+        with self._lock:
+            if job.state != QUEUED:
+                return False
+            job.state = CANCELLED
+            job.error = CancelledError()
+            return True
+
+    def shutdown(self):
+        """Stop the workers once the jobs already queued have run"""
+        with self._lock:
+            self._stopping = True
+            self._ready.notify_all()
+
+    def _next_job(self):
+        """Wait for the most urgent job a worker may take, or None to stop"""
+        with self._lock:
+            while True:
+                for level, jobs in enumerate(self._queues):
+                    if jobs and (level != BULK or self._running_bulk < self.max_bulk):
+                        job = jobs.popleft()
+                        self._queued -= 1
+                        if job.state == QUEUED:
+                            job.state = RUNNING
+                        if level == BULK:
+                            self._running_bulk += 1
+                        return job
+                if self._stopping and not self._queued:
+                    return None
+                self._ready.wait()
+
+    def _worker(self):
+        while True:
+            job = self._next_job()
+            if job is None:
+                return
+            if job.state != CANCELLED:
+                try:
+                    with priority(job.level):
+                        job.result = job.fn(*job.args)
+                except Exception as e:
+                    job.error = e
+            self._complete(job)
+
+    def _complete(self, job):
+        with self._lock:
+            if job.state == RUNNING:
+                job.state = DONE
+            if job.level == BULK:
+                self._running_bulk -= 1
+                # A bulk job may be waiting for the freed share of the pool
+                self._ready.notify()
+            self._pending -= 1
+            depth = self._pending
+            if self.ordered:
+                finished = self._finished[job.level]
+                finished[job.seq] = job
+                while self._next_delivery[job.level] in finished:
+                    self._outbox.append(finished.pop(self._next_delivery[job.level]))
+                    self._next_delivery[job.level] += 1
+            else:
+                self._outbox.append(job)
+        self._flush_outbox()
+        self._notify_depth(depth)
+
+    def _flush_outbox(self):
+        """Hand finished jobs to deliver() in outbox order, outside the lock
+
+        Whichever thread holds _delivering drains the outbox; others leave
+        their jobs to it rather than wait, and the outbox is checked again
+        after _delivering is released so no job is stranded.
+        """
+        while self._outbox:
+            if not self._delivering.acquire(blocking=False):
+                return
+            try:
+                while True:
+                    with self._lock:
+                        if not self._outbox:
+                            break
+                        jobs = list(self._outbox)
+                        self._outbox.clear()
+                    self._deliver(lambda jobs=jobs: self._run_callbacks(jobs))
+            finally:
+                self._delivering.release()
+
+    def _run_callbacks(self, jobs):
+        for job in jobs:
+            if job.on_done:
+                job.on_done(job.result, job.error)
+
+    def _notify_depth(self, depth):
+        if self._on_depth:
+            self._on_depth(depth)
@@ -1,12 +1,28 @@
 import tkinter as tk
-from tkinter import scrolledtext, messagebox, Menu
-import subprocess
-import sys
-import threading
-from datetime import datetime
+from tkinter import scrolledtext, messagebox, filedialog, Menu
 import os
 import webbrowser
 import json
+import threading
+import time
+from bisect import bisect_left
+
+from rcon_cache import get_cache
+from rcon_client import RCONError, RCONTimeoutError, get_client, iter_lines, strip_colors
+from rcon_complete import common_prefix, get_completer
+from rcon_console import ConsoleView
+from rcon_executor import CommandExecutor
+from rcon_health import DEFAULT_GAME_PORT, HealthMonitor, server_list_ping
+from rcon_history import HistoryCursor, get_history
+from rcon_query import query_status
+from rcon_roster import format_duration, get_roster
+from rcon_scheduler import BULK, INTERACTIVE
+from rcon_search import SearchError, format_record, get_index
+from rcon_script import (DEFAULT_RATE, FAILURE_POLICIES, ScriptError, ScriptRunner, format_progress,
+                         parse_script, parse_variables)
+from rcon_servers import fan_out, load_servers
+from rcon_stats import PHASES, get_stats
+from rcon_watch import ConfigWatcher
 
 class ConfigDialog(tk.Toplevel):
     """Configuration dialog window"""
@@ -152,12 +168,20 @@ class ConfigDialog(tk.Toplevel):
             messagebox.showerror("Error", "Please fill in all required fields!")
             return
         
-        # Save to config.json
-        config_content = {
+        # Save to config.json, keeping extra keys such as the server list
+        config_content = {}
+        try:
+            if os.path.exists("config.json"):
+                with open("config.json", 'r') as f:
+                    config_content = json.load(f)
+        except Exception:
+            config_content = {}
+        
+        config_content.update({
             "server_ip": server_ip,
             "port": port,
             "password": password
-        }
+        })
         
         try:
             with open("config.json", 'w') as f:
@@ -169,7 +193,832 @@ class ConfigDialog(tk.Toplevel):
         except Exception as e:
             messagebox.showerror("Error", f"Failed to save configuration:\n{str(e)}")
 
+class BatchDialog(tk.Toplevel):
+    """Dialog for entering a batch of commands, one per line"""
+    def __init__(self, parent):
+        super().__init__(parent)
+        self.parent = parent
+        self.result = None
+        
+        self.title("Run Batch")
+        self.geometry("600x450")
+        self.configure(bg="#0d1117")
+        
+        # Make it modal
+        self.transient(parent)
+        self.grab_set()
+        
+        self.create_widgets()
+        
+        # Center the dialog
+        self.center_window()
+    
+    def center_window(self):
+        self.update_idletasks()
+        x = (self.winfo_screenwidth() // 2) - (self.winfo_width() // 2)
+        y = (self.winfo_screenheight() // 2) - (self.winfo_height() // 2)
+        self.geometry(f"+{x}+{y}")
+    
+    def create_widgets(self):
+        # Title
+        title_frame = tk.Frame(self, bg="#0969da", height=60)
+        title_frame.pack(fill=tk.X)
+        title_frame.pack_propagate(False)
+        
+        title_label = tk.Label(
+            title_frame,
+            text="📜 Run Batch",
+            font=("Segoe UI", 16, "bold"),
+            bg="#0969da",
+            fg="white"
+        )
+        title_label.place(relx=0.5, rely=0.5, anchor=tk.CENTER)
+        
+        # Main content
+        content_frame = tk.Frame(self, bg="#0d1117")
+        content_frame.pack(fill=tk.BOTH, expand=True, padx=30, pady=20)
+        
+        hint_label = tk.Label(
+            content_frame,
+            text="One command per line. Commands are pipelined over a single connection.",
+            font=("Segoe UI", 9),
+            bg="#0d1117",
+            fg="#8b949e",
+            anchor="w"
+        )
+        hint_label.pack(fill=tk.X, pady=(0, 8))
+        
+        self.commands_text = scrolledtext.ScrolledText(
+            content_frame,
+            height=12,
+            font=("Consolas", 10),
+            bg="#010409",
+            fg="#c9d1d9",
+            relief=tk.FLAT,
+            insertbackground="#58a6ff",
+            selectbackground="#1f6feb",
+            padx=10,
+            pady=8
+        )
+        self.commands_text.pack(fill=tk.BOTH, expand=True)
+        self.commands_text.focus_set()
+        
+        # Buttons
+        button_frame = tk.Frame(content_frame, bg="#0d1117")
+        button_frame.pack(pady=(15, 0))
+        
+        run_btn = tk.Button(
+            button_frame,
+            text="▶ Run Batch",
+            command=self.run_batch,
+            bg="#238636",
+            fg="white",
+            font=("Segoe UI", 10, "bold"),
+            cursor="hand2",
+            relief=tk.FLAT,
+            padx=20,
+            pady=10,
+            bd=0
+        )
+        run_btn.pack(side=tk.LEFT, padx=(0, 10))
+        
+        cancel_btn = tk.Button(
+            button_frame,
+            text="Cancel",
+            command=self.destroy,
+            bg="#21262d",
+            fg="#c9d1d9",
+            font=("Segoe UI", 10, "bold"),
+            cursor="hand2",
+            relief=tk.FLAT,
+            padx=20,
+            pady=10,
+            bd=0
+        )
+        cancel_btn.pack(side=tk.LEFT)
+    
+    def run_batch(self):
+        commands = [line.strip() for line in self.commands_text.get("1.0", tk.END).splitlines()]
+        commands = [c for c in commands if c]
+        
+        if not commands:
+            messagebox.showerror("Error", "Please enter at least one command!", parent=self)
+            return
+        
+        self.result = commands
+        self.destroy()
+
+class StatsDialog(tk.Toplevel):
+    """Live per-server, per-command latency percentiles"""
+    REFRESH_MS = 2000
+    
+    def __init__(self, parent):
+        super().__init__(parent)
+        self.parent = parent
+        
+        self.title("Latency Stats")
+        self.geometry("900x480")
+        self.configure(bg="#0d1117")
+        self.transient(parent)
+        
+        self.phase_var = tk.StringVar(value="complete")
+        self.create_widgets()
+        self.center_window()
+        self.refresh()
+    
+    def center_window(self):
+        self.update_idletasks()
+        x = (self.winfo_screenwidth() // 2) - (self.winfo_width() // 2)
+        y = (self.winfo_screenheight() // 2) - (self.winfo_height() // 2)
+        self.geometry(f"+{x}+{y}")
+    
+    def create_widgets(self):
+        # Title
+        title_frame = tk.Frame(self, bg="#0969da", height=60)
+        title_frame.pack(fill=tk.X)
+        title_frame.pack_propagate(False)
+        
+        title_label = tk.Label(
+            title_frame,
+            text="📊 Latency Stats",
+            font=("Segoe UI", 16, "bold"),
+            bg="#0969da",
+            fg="white"
+        )
+        title_label.place(relx=0.5, rely=0.5, anchor=tk.CENTER)
+        
+        # Main content
+        content_frame = tk.Frame(self, bg="#0d1117")
+        content_frame.pack(fill=tk.BOTH, expand=True, padx=30, pady=20)
+        
+        phase_frame = tk.Frame(content_frame, bg="#0d1117")
+        phase_frame.pack(fill=tk.X, pady=(0, 8))
+        
+        phase_label = tk.Label(
+            phase_frame,
+            text="Phase:",
+            font=("Segoe UI", 9, "bold"),
+            bg="#0d1117",
+            fg="#8b949e"
+        )
+        phase_label.pack(side=tk.LEFT, padx=(0, 8))
+        
+        phase_menu = tk.OptionMenu(phase_frame, self.phase_var, *PHASES, command=lambda _: self.refresh(reschedule=False))
+        phase_menu.config(bg="#21262d", fg="#c9d1d9", activebackground="#30363d",
+                          activeforeground="#c9d1d9", relief=tk.FLAT, bd=0, highlightthickness=0)
+        phase_menu.pack(side=tk.LEFT)
+        
+        self.stats_text = scrolledtext.ScrolledText(
+            content_frame,
+            height=14,
+            font=("Consolas", 10),
+            bg="#010409",
+            fg="#c9d1d9",
+            relief=tk.FLAT,
+            padx=10,
+            pady=8,
+            wrap=tk.NONE,
+            state=tk.DISABLED
+        )
+        self.stats_text.pack(fill=tk.BOTH, expand=True)
+        
+        # Buttons
+        button_frame = tk.Frame(content_frame, bg="#0d1117")
+        button_frame.pack(pady=(15, 0))
+        
+        buttons = [
+            ("💾 Export JSON", self.export, "#238636", "white"),
+            ("Reset", self.reset, "#21262d", "#c9d1d9"),
+            ("Close", self.destroy, "#21262d", "#c9d1d9")
+        ]
+        for text, command, bg, fg in buttons:
+            btn = tk.Button(
+                button_frame,
+                text=text,
+                command=command,
+                bg=bg,
+                fg=fg,
+                font=("Segoe UI", 10, "bold"),
+                cursor="hand2",
+                relief=tk.FLAT,
+                padx=20,
+                pady=10,
+                bd=0
+            )
+            btn.pack(side=tk.LEFT, padx=(0, 10))
+    
+    def refresh(self, reschedule=True):
+        """Redraw the table for the selected phase"""
+        if not self.winfo_exists():
+            return
+        phase = self.phase_var.get()
+        lines = [f"{'Server':<24}{'Command':<16}{'Count':>8}{'Errors':>8}{'Shared':>8}"
+                 f"{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}{'Max ms':>10}"]
+        for row in get_stats().snapshot():
+            summary = row['phases'].get(phase)
+            if summary is None and not row['errors'] and not row['coalesced']:
+                continue
+            summary = summary or {"count": 0, "p50_ms": 0, "p95_ms": 0, "p99_ms": 0, "max_ms": 0}
+            lines.append(
+                f"{row['server'][:23]:<24}{row['command'][:15]:<16}{summary['count']:>8}{row['errors']:>8}{row['coalesced']:>8}"
+                f"{summary['p50_ms']:>10.2f}{summary['p95_ms']:>10.2f}{summary['p99_ms']:>10.2f}{summary['max_ms']:>10.2f}"
+            )
+        lines.append("")
+        lines.append("Shared: requests answered by an identical command already in flight")
+        if len(lines) == 1:
+            lines.append("No commands timed yet")
+        
+        self.stats_text.config(state=tk.NORMAL)
+        self.stats_text.delete("1.0", tk.END)
+        self.stats_text.insert(tk.END, "\n".join(lines))
+        self.stats_text.config(state=tk.DISABLED)
+        if reschedule:
+            self.after(self.REFRESH_MS, self.refresh)
+    
+    def export(self):
+        path = filedialog.asksaveasfilename(
+            parent=self,
+            title="Export Latency Stats",
+            defaultextension=".json",
+            initialfile=time.strftime("rcon_stats_%Y%m%d_%H%M%S.json"),
+            filetypes=[("JSON", "*.json")]
+        )
+        if not path:
+            return
+        try:
+            get_stats().export(path)
+            messagebox.showinfo("Export", f"Stats exported to:\n{path}", parent=self)
+        except OSError as e:
+            messagebox.showerror("Error", f"Failed to export stats:\n{str(e)}", parent=self)
+    
+    def reset(self):
+        get_stats().reset()
+        self.refresh(reschedule=False)
+
+class ScriptDialog(tk.Toplevel):
+    """Load a command script and run it at a limited rate with live progress"""
+    
+    def __init__(self, parent, app):
+        super().__init__(parent)
+        self.parent = parent
+        self.app = app
+        self.runner = None
+        
+        self.title("Script Runner")
+        self.geometry("720x620")
+        self.configure(bg="#0d1117")
+        self.transient(parent)
+        self.protocol("WM_DELETE_WINDOW", self.close)
+        
+        self.rate_var = tk.StringVar(value=f"{DEFAULT_RATE:g}")
+        self.policy_var = tk.StringVar(value=FAILURE_POLICIES[0])
+        self.create_widgets()
+        self.center_window()
+    
+    def center_window(self):
+        self.update_idletasks()
+        x = (self.winfo_screenwidth() // 2) - (self.winfo_width() // 2)
+        y = (self.winfo_screenheight() // 2) - (self.winfo_height() // 2)
+        self.geometry(f"+{x}+{y}")
+    
+    def create_widgets(self):
+        # Title
+        title_frame = tk.Frame(self, bg="#0969da", height=60)
+        title_frame.pack(fill=tk.X)
+        title_frame.pack_propagate(False)
+        
+        title_label = tk.Label(
+            title_frame,
+            text="🧾 Script Runner",
+            font=("Segoe UI", 16, "bold"),
+            bg="#0969da",
+            fg="white"
+        )
+        title_label.place(relx=0.5, rely=0.5, anchor=tk.CENTER)
+        
+        # Main content
+        content_frame = tk.Frame(self, bg="#0d1117")
+        content_frame.pack(fill=tk.BOTH, expand=True, padx=30, pady=20)
+        
+        hint_label = tk.Label(
+            content_frame,
+            text="One command per line. # starts a comment, @set name = value defines ${name}.",
+            font=("Segoe UI", 9),
+            bg="#0d1117",
+            fg="#8b949e",
+            anchor="w"
+        )
+        hint_label.pack(fill=tk.X, pady=(0, 8))
+        
+        self.script_text = scrolledtext.ScrolledText(
+            content_frame,
+            height=12,
+            font=("Consolas", 10),
+            bg="#010409",
+            fg="#c9d1d9",
+            relief=tk.FLAT,
+            insertbackground="#58a6ff",
+            selectbackground="#1f6feb",
+            padx=10,
+            pady=8
+        )
+        self.script_text.pack(fill=tk.BOTH, expand=True)
+        self.script_text.focus_set()
+        
+        # Options: variables, rate and failure policy
+        options_frame = tk.Frame(content_frame, bg="#0d1117")
+        options_frame.pack(fill=tk.X, pady=(12, 0))
+        
+        label_style = {"font": ("Segoe UI", 9, "bold"), "bg": "#0d1117", "fg": "#8b949e"}
+        entry_style = {"font": ("Consolas", 10), "bg": "#010409", "fg": "#c9d1d9", "relief": tk.FLAT,
+                       "insertbackground": "#58a6ff"}
+        
+        tk.Label(options_frame, text="Variables:", **label_style).pack(side=tk.LEFT, padx=(0, 6))
+        self.variables_entry = tk.Entry(options_frame, width=24, **entry_style)
+        self.variables_entry.pack(side=tk.LEFT, padx=(0, 14), ipady=4)
+        
+        tk.Label(options_frame, text="Commands/s:", **label_style).pack(side=tk.LEFT, padx=(0, 6))
+        tk.Entry(options_frame, textvariable=self.rate_var, width=7, **entry_style).pack(side=tk.LEFT, padx=(0, 14), ipady=4)
+        
+        tk.Label(options_frame, text="On failure:", **label_style).pack(side=tk.LEFT, padx=(0, 6))
+        policy_menu = tk.OptionMenu(options_frame, self.policy_var, *FAILURE_POLICIES)
+        policy_menu.config(bg="#21262d", fg="#c9d1d9", activebackground="#30363d",
+                           activeforeground="#c9d1d9", relief=tk.FLAT, bd=0, highlightthickness=0)
+        policy_menu.pack(side=tk.LEFT)
+        
+        # Progress bar and status line
+        self.progress_canvas = tk.Canvas(content_frame, height=8, bg="#21262d", highlightthickness=0)
+        self.progress_canvas.pack(fill=tk.X, pady=(14, 0))
+        self.progress_bar = self.progress_canvas.create_rectangle(0, 0, 0, 8, fill="#3fb950", width=0)
+        
+        self.status_label = tk.Label(
+            content_frame,
+            text="",
+            font=("Consolas", 9),
+            bg="#0d1117",
+            fg="#8b949e",
+            anchor="w"
+        )
+        self.status_label.pack(fill=tk.X, pady=(6, 0))
+        
+        # Buttons
+        button_frame = tk.Frame(content_frame, bg="#0d1117")
+        button_frame.pack(pady=(15, 0))
+        
+        buttons = [
+            ("open_btn", "📂 Open...", self.open_file, "#21262d", "#c9d1d9"),
+            ("start_btn", "▶ Run Script", self.start, "#238636", "white"),
+            ("pause_btn", "⏸ Pause", self.toggle_pause, "#21262d", "#c9d1d9"),
+            ("abort_btn", "⏹ Abort", self.abort, "#da3633", "white"),
+            ("close_btn", "Close", self.close, "#21262d", "#c9d1d9")
+        ]
+        for name, text, command, bg, fg in buttons:
+            btn = tk.Button(
+                button_frame,
+                text=text,
+                command=command,
+                bg=bg,
+                fg=fg,
+                font=("Segoe UI", 10, "bold"),
+                cursor="hand2",
+                relief=tk.FLAT,
+                padx=16,
+                pady=10,
+                bd=0
+            )
+            btn.pack(side=tk.LEFT, padx=(0, 10))
+            setattr(self, name, btn)
+        self.pause_btn.config(state=tk.DISABLED)
+        self.abort_btn.config(state=tk.DISABLED)
+    
+    def open_file(self):
+        path = filedialog.askopenfilename(
+            parent=self,
+            title="Open Script",
+            filetypes=[("Scripts", "*.txt *.mcfunction *.rcon"), ("All files", "*.*")]
+        )
+        if not path:
+            return
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                text = f.read()
+        except OSError as e:
+            messagebox.showerror("Error", f"Failed to open script:\n{str(e)}", parent=self)
+            return
+        self.script_text.delete("1.0", tk.END)
+        self.script_text.insert("1.0", text)
+        self.title(f"Script Runner - {os.path.basename(path)}")
+    
+    def start(self):
+        if not getattr(self.app, 'server_host', ''):
+            messagebox.showerror("Error", "Please configure RCON settings first!", parent=self)
+            return
+        try:
+            commands = parse_script(self.script_text.get("1.0", tk.END),
+                                    parse_variables(self.variables_entry.get()))
+            rate = float(self.rate_var.get())
+            client = self.app.get_client()
+            self.runner = ScriptRunner(
+                client, commands, rate=rate, failure_policy=self.policy_var.get(),
+                on_progress=lambda progress: self.app.root.after(0, lambda: self.show_progress(progress)),
+                on_failure=self.on_failure
+            )
+        except (ScriptError, ValueError, RCONError) as e:
+            messagebox.showerror("Error", str(e), parent=self)
+            return
+        if not commands:
+            messagebox.showerror("Error", "The script has no commands!", parent=self)
+            return
+        
+        self.app.add_output(f"→ Script: {len(commands)} commands at up to {rate:g}/s", "info")
+        self.runner.start()
+        self.show_progress(self.runner.progress())
+    
+    def on_failure(self, failure):
+        """Report a failed line in the main console; called from the runner thread"""
+        line = f"✗ [line {failure['line']}] {failure['command']} → {failure['message']}"
+        self.app.root.after(0, lambda: self.app.add_output(line, "error"))
+    
+    def toggle_pause(self):
+        if self.runner is None:
+            return
+        if self.runner.state == "paused":
+            self.runner.resume()
+        else:
+            self.runner.pause()
+    
+    def abort(self):
+        if self.runner is not None:
+            self.runner.abort()
+    
+    def show_progress(self, progress):
+        if progress['state'] in ("done", "aborted"):
+            ok = progress['state'] == "done" and not progress['failed']
+            self.app.add_output(f"{'✓' if ok else '⚠'} Script: {format_progress(progress)}",
+                                "success" if ok else "warning")
+        if not self.winfo_exists():
+            return
+        width = self.progress_canvas.winfo_width()
+        self.progress_canvas.coords(self.progress_bar, 0, 0, width * progress['percent'] / 100, 8)
+        self.status_label.config(text=format_progress(progress))
+        
+        active = progress['state'] in ("running", "paused")
+        self.start_btn.config(state=tk.DISABLED if active else tk.NORMAL)
+        self.pause_btn.config(state=tk.NORMAL if active else tk.DISABLED,
+                              text="▶ Resume" if progress['state'] == "paused" else "⏸ Pause")
+        self.abort_btn.config(state=tk.NORMAL if active else tk.DISABLED)
+    
+    def close(self):
+        if self.runner is not None and not self.runner.finished:
+            if not messagebox.askyesno("Script Runner", "A script is still running. Abort it?", parent=self):
+                return
+            self.runner.abort()
+        self.destroy()
+
+class HistorySearchDialog(tk.Toplevel):
+    """Ctrl+R search through the command history, most recent match first"""
+    
+    RESULT_LIMIT = 50
+    
+    def __init__(self, parent, history, on_pick, initial=""):
+        super().__init__(parent)
+        self.history = history
+        self.on_pick = on_pick
+        self.matches = []
+        
+        self.title("Search History")
+        self.geometry("560x360")
+        self.configure(bg="#0d1117")
+        self.transient(parent)
+        self.protocol("WM_DELETE_WINDOW", self.destroy)
+        
+        content_frame = tk.Frame(self, bg="#0d1117")
+        content_frame.pack(fill=tk.BOTH, expand=True, padx=16, pady=16)
+        
+        self.query_var = tk.StringVar(value=initial)
+        self.query_entry = tk.Entry(
+            content_frame,
+            textvariable=self.query_var,
+            font=("Consolas", 11),
+            bg="#010409",
+            fg="#c9d1d9",
+            relief=tk.FLAT,
+            insertbackground="#58a6ff"
+        )
+        self.query_entry.pack(fill=tk.X, ipady=6)
+        self.query_entry.focus_set()
+        self.query_entry.icursor(tk.END)
+        
+        self.result_list = tk.Listbox(
+            content_frame,
+            font=("Consolas", 10),
+            bg="#010409",
+            fg="#c9d1d9",
+            selectbackground="#1f6feb",
+            selectforeground="white",
+            relief=tk.FLAT,
+            highlightthickness=0,
+            activestyle="none"
+        )
+        self.result_list.pack(fill=tk.BOTH, expand=True, pady=(10, 0))
+        
+        self.status_label = tk.Label(
+            content_frame,
+            text="Enter recalls the selected command · Esc closes",
+            font=("Segoe UI", 9),
+            bg="#0d1117",
+            fg="#8b949e",
+            anchor="w"
+        )
+        self.status_label.pack(fill=tk.X, pady=(6, 0))
+        
+        self.query_var.trace_add("write", lambda *_: self.refresh())
+        self.query_entry.bind("<Up>", lambda e: self.move(-1))
+        self.query_entry.bind("<Down>", lambda e: self.move(1))
+        # Ctrl+R again steps to the next older match, as in a shell
+        self.query_entry.bind("<Control-r>", lambda e: self.move(1))
+        self.query_entry.bind("<Return>", lambda e: self.pick())
+        self.result_list.bind("<Double-Button-1>", lambda e: self.pick())
+        self.bind("<Escape>", lambda e: self.destroy())
+        self.refresh()
+    
+    def refresh(self):
+        self.matches = self.history.search(self.query_var.get(), self.RESULT_LIMIT)
+        self.result_list.delete(0, tk.END)
+        for command in self.matches:
+            self.result_list.insert(tk.END, command)
+        if self.matches:
+            self.result_list.selection_set(0)
+    
+    def move(self, step):
+        if not self.matches:
+            return "break"
+        selection = self.result_list.curselection()
+        index = min(max((selection[0] if selection else -1) + step, 0), len(self.matches) - 1)
+        self.result_list.selection_clear(0, tk.END)
+        self.result_list.selection_set(index)
+        self.result_list.see(index)
+        return "break"
+    
+    def pick(self):
+        selection = self.result_list.curselection()
+        if selection:
+            self.on_pick(self.matches[selection[0]])
+        self.destroy()
+
+class TranscriptSearchDialog(tk.Toplevel):
+    """Search every recorded command and response, newest first, a page at a time"""
+    
+    def __init__(self, parent, index):
+        super().__init__(parent)
+        self.parent = parent
+        self.index = index
+        self.records = []
+        self.query = ""
+        self.cursor = None
+        # Pages from superseded searches are ignored
+        self.generation = 0
+        
+        self.title("Search Transcripts")
+        self.geometry("960x600")
+        self.configure(bg="#0d1117")
+        self.transient(parent)
+        
+        content_frame = tk.Frame(self, bg="#0d1117")
+        content_frame.pack(fill=tk.BOTH, expand=True, padx=16, pady=16)
+        
+        self.query_var = tk.StringVar()
+        self.query_entry = tk.Entry(
+            content_frame,
+            textvariable=self.query_var,
+            font=("Consolas", 11),
+            bg="#010409",
+            fg="#c9d1d9",
+            relief=tk.FLAT,
+            insertbackground="#58a6ff"
+        )
+        self.query_entry.pack(fill=tk.X, ipady=6)
+        self.query_entry.focus_set()
+        
+        hint_label = tk.Label(
+            content_frame,
+            text='Words, "exact phrase", whitel*, command:word, server:name, is:error, on:yesterday, since:2h',
+            font=("Segoe UI", 9),
+            bg="#0d1117",
+            fg="#8b949e",
+            anchor="w"
+        )
+        hint_label.pack(fill=tk.X, pady=(4, 0))
+        
+        self.result_list = tk.Listbox(
+            content_frame,
+            font=("Consolas", 10),
+            bg="#010409",
+            fg="#c9d1d9",
+            selectbackground="#1f6feb",
+            selectforeground="white",
+            relief=tk.FLAT,
+            highlightthickness=0,
+            activestyle="none"
+        )
+        self.result_list.pack(fill=tk.BOTH, expand=True, pady=(10, 0))
+        
+        self.detail_text = scrolledtext.ScrolledText(
+            content_frame,
+            height=8,
+            font=("Consolas", 10),
+            bg="#010409",
+            fg="#c9d1d9",
+            relief=tk.FLAT,
+            padx=10,
+            pady=8,
+            wrap=tk.WORD,
+            state=tk.DISABLED
+        )
+        self.detail_text.pack(fill=tk.X, pady=(10, 0))
+        
+        bottom_frame = tk.Frame(content_frame, bg="#0d1117")
+        bottom_frame.pack(fill=tk.X, pady=(10, 0))
+        
+        self.status_label = tk.Label(
+            bottom_frame,
+            text="",
+            font=("Segoe UI", 9),
+            bg="#0d1117",
+            fg="#8b949e",
+            anchor="w"
+        )
+        self.status_label.pack(side=tk.LEFT, fill=tk.X, expand=True)
+        
+        self.more_button = tk.Button(
+            bottom_frame,
+            text="Load More",
+            command=lambda: self.search(more=True),
+            bg="#21262d",
+            fg="#c9d1d9",
+            font=("Segoe UI", 10, "bold"),
+            cursor="hand2",
+            relief=tk.FLAT,
+            padx=16,
+            pady=6,
+            bd=0,
+            state=tk.DISABLED
+        )
+        self.more_button.pack(side=tk.RIGHT)
+        
+        self.query_entry.bind("<Return>", lambda e: self.search())
+        self.result_list.bind("<<ListboxSelect>>", lambda e: self.show_detail())
+        self.bind("<Escape>", lambda e: self.destroy())
+        # Start with the newest records
+        self.search()
+    
+    def search(self, more=False):
+        """Run the query off the UI thread; more=True fetches the next page"""
+        if not more:
+            self.query = self.query_var.get()
+            self.cursor = None
+        self.generation += 1
+        self.status_label.config(text="Searching...")
+        self.more_button.config(state=tk.DISABLED)
+        threading.Thread(
+            target=self._search_job,
+            args=(self.query, self.cursor, self.generation, more),
+            name="rcon-search",
+            daemon=True
+        ).start()
+    
+    def _search_job(self, query, cursor, generation, more):
+        try:
+            page = self.index.search(query, cursor)
+        except SearchError as e:
+            page = {"success": False, "message": str(e), "results": [], "cursor": None}
+        self.parent.after(0, lambda: self.show_page(page, generation, more))
+    
+    def show_page(self, page, generation, more):
+        if generation != self.generation or not self.winfo_exists():
+            return
+        if not more:
+            self.records = []
+            self.result_list.delete(0, tk.END)
+            self.show_detail()
+        if not page['success']:
+            self.status_label.config(text=f"✗ {page['message']}")
+            return
+        for record in page['results']:
+            self.records.append(record)
+            self.result_list.insert(tk.END, format_record(record))
+            if not record['ok']:
+                self.result_list.itemconfig(tk.END, fg="#f85149")
+        self.cursor = page['cursor']
+        more_available = self.cursor is not None
+        self.more_button.config(state=tk.NORMAL if more_available else tk.DISABLED)
+        if self.records:
+            status = f"{len(self.records)}{'+' if more_available else ''} results · {page['elapsed_ms']:.1f} ms"
+        else:
+            status = "No matching commands"
+        self.status_label.config(text=status)
+    
+    def show_detail(self):
+        selection = self.result_list.curselection()
+        text = ""
+        if selection:
+            record = self.records[selection[0]]
+            when = time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(record['time']))
+            status = "OK" if record['ok'] else "Failed"
+            latency = f", {record['ms']:.1f} ms" if record['ms'] is not None else ""
+            text = f"{when}  {record['server']}  {status}{latency}\n> {record['command']}\n{record['response']}"
+        self.detail_text.config(state=tk.NORMAL)
+        self.detail_text.delete("1.0", tk.END)
+        self.detail_text.insert(tk.END, text)
+        self.detail_text.config(state=tk.DISABLED)
+
+class PlayerListView:
+    """Player rows in a read-only Tk Text widget, updated from roster diffs
+
+    One line per player, sorted by name, with the session length after a
+    tab.  A diff inserts or deletes only the lines that changed, and
+    refresh_durations() only rewrites lines whose text is different.
+    """
+    
+    def __init__(self, widget):
+        self.widget = widget
+        # (lowercase name, name) per line, in line order
+        self._keys = []
+        # name -> [since, exact, shown duration]
+        self._rows = {}
+        self._message = None
+        self.widget.tag_config("name", foreground="#c9d1d9")
+        self.widget.tag_config("duration", foreground="#8b949e")
+        self.widget.tag_config("message", foreground="#8b949e")
+    
+    def apply(self, diff):
+        """Apply a roster diff; an initial diff replaces every row"""
+        self.widget.config(state=tk.NORMAL)
+        if diff['initial']:
+            self.widget.delete("1.0", tk.END)
+            self._keys = []
+            self._rows = {}
+            self._message = None
+        elif self._message is not None and diff['joined']:
+            self.widget.delete("1.0", tk.END)
+            self._message = None
+        
+        for entry in diff['left']:
+            key = (entry['name'].lower(), entry['name'])
+            index = bisect_left(self._keys, key)
+            if index < len(self._keys) and self._keys[index] == key:
+                self.widget.delete(f"{index + 1}.0", f"{index + 2}.0")
+                del self._keys[index]
+                del self._rows[entry['name']]
+        
+        for entry in diff['joined']:
+            name = entry['name']
+            if name in self._rows:
+                continue
+            key = (name.lower(), name)
+            index = bisect_left(self._keys, key)
+            duration = self._duration(entry['since'], entry['exact'], diff['time'])
+            self.widget.insert(f"{index + 1}.0", name, "name", "\t", (), duration, "duration", "\n", ())
+            self._keys.insert(index, key)
+            self._rows[name] = [entry['since'], entry['exact'], duration]
+        self.widget.config(state=tk.DISABLED)
+    
+    def show_message(self, text):
+        """Show a single grey line, e.g. "Server offline", in place of the rows"""
+        self.widget.config(state=tk.NORMAL)
+        self.widget.delete("1.0", tk.END)
+        self.widget.insert("1.0", text, "message")
+        self.widget.config(state=tk.DISABLED)
+        self._keys = []
+        self._rows = {}
+        self._message = text
+    
+    def refresh_durations(self, now=None):
+        """Rewrite the session lengths that changed since the last refresh"""
+        now = time.time() if now is None else now
+        self.widget.config(state=tk.NORMAL)
+        for line, (_, name) in enumerate(self._keys, 1):
+            row = self._rows[name]
+            duration = self._duration(row[0], row[1], now)
+            if duration != row[2]:
+                self.widget.delete(f"{line}.{len(name) + 1}", f"{line}.end")
+                self.widget.insert(f"{line}.{len(name) + 1}", duration, "duration")
+                row[2] = duration
+        self.widget.config(state=tk.DISABLED)
+    
+    def __len__(self):
+        return len(self._keys)
+    
+    @staticmethod
+    def _duration(since, exact, now):
+        # Players online before the first poll: at least this long
+        text = format_duration(now - since)
+        return text if exact else f"{text}+"
+
 class RCONGui:
+    # Session lengths are shown to the minute; refresh a few times per minute
+    DURATION_REFRESH_MS = 15000
+    
     def __init__(self, root):
         self.root = root
         self.root.title("Minecraft RCON Control Panel")
@@ -192,6 +1041,15 @@ class RCONGui:
         self.config_loaded = self.load_config()
         self.connection_status = False
         
+        # All RCON work runs on a fixed pool; the console keeps each job's
+        # output in submission order
+        self.queue_depth = 0
+        self._queue_depth_scheduled = False
+        self.executor = CommandExecutor(
+            deliver=lambda fn: self.root.after(0, fn),
+            on_depth=self._on_queue_depth
+        )
+        
         # Auto-prompt for config if not loaded
         if not self.config_loaded:
             self.root.after(100, self.auto_prompt_config)
@@ -267,22 +1125,53 @@ class RCONGui:
         # Quick Commands Section
         self.create_quick_commands(content_frame)
         
+        # Players Section
+        self.create_players_section(content_frame)
+        
         # Output Section (expandable)
         self.create_output_section(content_frame)
         
         # Footer (always visible at bottom)
         self.create_footer()
         
+        # Commands typed into the command box, kept per server on disk
+        self.history = None
+        self.history_cursor = None
+        self.attach_history()
+        
+        # Tab completion from the server's help output, cached on disk
+        self.completer = None
+        self.attach_completer()
+        
+        # Players from "list" output and health checks, diffed into the panel
+        self.roster = None
+        self.attach_roster()
+        self.root.after(self.DURATION_REFRESH_MS, self.refresh_player_durations)
+        
+        # Keep the search index current in the background; searches only read it
+        get_index().start()
+        
+        # Liveness via Server List Ping or UDP Query; RCON stays free for commands
+        health_port, health_probe = self.health_target()
+        self.health_monitor = HealthMonitor(
+            self.server_host,
+            health_port,
+            on_update=lambda result: self.root.after(0, lambda: self.update_health(result)),
+            probe=health_probe
+        )
+        self.health_monitor.start()
+        
         # Initial message
         if self.config_loaded:
             self.add_output("✓ RCON GUI initialized successfully", "success")
             self.add_output(f"✓ Configuration loaded from config.json", "success")
             self.test_connection()
-            # Start monitoring for config changes
-            self.start_config_monitor()
         else:
             self.add_output("⚠ Configuration not found", "warning")
             self.add_output("⚠ Please set up your RCON configuration", "warning")
+        
+        # Watch for config.json being created or edited outside the app
+        self.start_config_monitor()
     
     def auto_prompt_config(self):
         """Automatically prompt for configuration if not exists"""
@@ -347,6 +1236,15 @@ class RCONGui:
         file_menu.add_separator()
         file_menu.add_command(label="Exit", command=self.root.quit)
         
+        # Tools menu
+        tools_menu = Menu(menubar, tearoff=0, bg="#161b22", fg="#c9d1d9",
+                         activebackground="#0969da", activeforeground="white")
+        menubar.add_cascade(label="Tools", menu=tools_menu)
+        tools_menu.add_command(label="Run Batch...", command=self.open_batch_dialog)
+        tools_menu.add_command(label="Run Script...", command=self.open_script_dialog)
+        tools_menu.add_command(label="Latency Stats...", command=self.open_stats_dialog)
+        tools_menu.add_command(label="Search Transcripts...", command=self.open_transcript_search)
+        
         # Help menu
         help_menu = Menu(menubar, tearoff=0, bg="#161b22", fg="#c9d1d9",
                         activebackground="#0969da", activeforeground="white")
@@ -365,11 +1263,44 @@ class RCONGui:
         self.root.wait_window(dialog)
         
         if dialog.result:
+            # Our own save is not an external edit
+            if hasattr(self, 'config_watcher'):
+                self.config_watcher.refresh()
+            
             # Reload configuration
             self.load_config()
             self.update_server_info()
             self.test_connection()
     
+    def open_batch_dialog(self):
+        """Open the batch dialog and run the entered commands"""
+        dialog = BatchDialog(self.root)
+        self.root.wait_window(dialog)
+        
+        if dialog.result:
+            self.execute_batch(dialog.result)
+    
+    def open_script_dialog(self):
+        """Show the script runner, reusing it when already open"""
+        if getattr(self, 'script_dialog', None) and self.script_dialog.winfo_exists():
+            self.script_dialog.lift()
+            return
+        self.script_dialog = ScriptDialog(self.root, self)
+    
+    def open_stats_dialog(self):
+        """Show the latency stats window, reusing it when already open"""
+        if getattr(self, 'stats_dialog', None) and self.stats_dialog.winfo_exists():
+            self.stats_dialog.lift()
+            return
+        self.stats_dialog = StatsDialog(self.root)
+    
+    def open_transcript_search(self):
+        """Show the transcript search window, reusing it when already open"""
+        if getattr(self, 'transcript_dialog', None) and self.transcript_dialog.winfo_exists():
+            self.transcript_dialog.lift()
+            return
+        self.transcript_dialog = TranscriptSearchDialog(self.root, get_index())
+    
     def show_about(self):
         """Show about dialog"""
         about_text = """Minecraft RCON Control Panel
@@ -382,8 +1313,52 @@ https://h190k.com"""
         
         messagebox.showinfo("About", about_text)
     
+    def update_fan_out_toggle(self):
+        """Enable the all-servers toggle only when several servers are configured"""
+        if not hasattr(self, 'fan_out_check'):
+            return
+        count = len(getattr(self, 'servers', []))
+        self.fan_out_check.config(text=f"🌐 All servers ({count})")
+        if count > 1:
+            self.fan_out_check.config(state=tk.NORMAL)
+        else:
+            self.fan_out_var.set(False)
+            self.fan_out_check.config(state=tk.DISABLED)
+    
+    def health_target(self):
+        """Return (port, probe): UDP Query when enabled, else Server List Ping"""
+        if self.use_query:
+            return self.query_port, query_status
+        return self.game_port, server_list_ping
+    
+    def update_health(self, result):
+        """Show the latest health check in the header and player panel"""
+        if self.roster is not None:
+            self.roster.apply_status(result)
+        if result['online'] and self.completer is not None:
+            # The version names the cached command tree, fetched on first Tab
+            self.completer.set_version(result['version'])
+        if not hasattr(self, 'health_label'):
+            return
+        if result['online']:
+            text = f"· {result['players_online']}/{result['players_max']} players"
+            if result['version']:
+                text += f" · {result['version']}"
+            text += f" · {result['rtt_ms']:.0f} ms"
+            self.health_label.config(text=text, fg="#3fb950")
+        else:
+            self.health_label.config(text="· offline", fg="#f85149")
+            if self.connection_status:
+                self.update_status(False)
+    
     def update_server_info(self):
         """Update server info in header after config change"""
+        self.update_fan_out_toggle()
+        self.attach_history()
+        self.attach_completer()
+        self.attach_roster()
+        if hasattr(self, 'health_monitor'):
+            self.health_monitor.set_target(self.server_host, *self.health_target())
         if hasattr(self, 'server_info_label'):
             self.server_info_label.config(text=f"{self.server_host}:{self.server_port}")
         else:
@@ -493,6 +1468,16 @@ https://h190k.com"""
         )
         self.status_label.pack(side=tk.LEFT)
         
+        # Pending RCON jobs; empty while the queue is idle
+        self.queue_label = tk.Label(
+            status_frame,
+            text="",
+            font=("Segoe UI", 9, "bold"),
+            bg="#0969da",
+            fg="#c9d1d9"
+        )
+        self.queue_label.pack(side=tk.LEFT, padx=(10, 0))
+        
         # Server info container placed just below status frame to avoid overlap
         if hasattr(self, 'server_host') and hasattr(self, 'server_port'):
             server_info_frame = tk.Frame(header_frame, bg="#161b22", relief=tk.FLAT, bd=0)
@@ -519,6 +1504,16 @@ https://h190k.com"""
             )
             self.server_info_label.pack(side=tk.LEFT)
             
+            # Player count, version and ping from the health monitor
+            self.health_label = tk.Label(
+                server_info_frame,
+                text="",
+                font=("Consolas", 9),
+                bg="#161b22",
+                fg="#8b949e"
+            )
+            self.health_label.pack(side=tk.LEFT, padx=(6, 0))
+            
             # Add subtle hover effect
             def on_server_hover(e):
                 server_icon.config(fg="#79c0ff")
@@ -538,11 +1533,9 @@ https://h190k.com"""
         # Animated pulse effect
         self.animate_status()
     
-    def _subprocess_no_window(self):
-        """Return kwargs to prevent console window on Windows when using subprocess"""
-        if sys.platform.startswith("win"):
-            return {"creationflags": subprocess.CREATE_NO_WINDOW}
-        return {}
+    def get_client(self):
+        """Return the persistent RCON client for the current configuration"""
+        return get_client(self.server_host, self.server_port, self.rcon_password)
 
     def create_footer(self):
         """Create footer with designer credit - always visible"""
@@ -640,9 +1633,8 @@ https://h190k.com"""
             refresh_btn.config(bg="#1a7a2e", fg="#ffffff")
             animate_rotation()
         
-        thread = threading.Thread(target=self._test_connection_thread)
-        thread.daemon = True
-        thread.start()
+        self.health_monitor.check_now()
+        self.submit_job(self._test_connection_job, True)
     
     def test_connection(self):
         """Test connection to RCON server"""
@@ -651,63 +1643,43 @@ https://h190k.com"""
             return
             
         self.add_output("🔄 Testing connection...", "info")
-        thread = threading.Thread(target=self._test_connection_thread)
-        thread.daemon = True
-        thread.start()
+        self.submit_job(self._test_connection_job)
     
-    def _test_connection_thread(self):
-        """Test connection in background thread with reconnection logic"""
+    def _test_connection_job(self, reconnect=False):
+        """Check the RCON login on a worker thread; returns (connected, output lines)
+
+        Only logs in (no command is run), and reuses an open connection
+        unless reconnect is set.
+        """
         try:
-            # mcrcon is always in same directory
-            mcrcon_path = "./mcrcon.exe"
-            
-            if not os.path.exists(mcrcon_path):
-                self.root.after(0, lambda: self.update_status(False))
-                self.root.after(0, lambda: self.add_output(
-                    f"✗ mcrcon.exe not found in application directory", "error"
-                ))
-                return
-            
-            full_command = [
-                mcrcon_path,
-                "-H", self.server_host,
-                "-P", self.server_port,
-                "-p", self.rcon_password,
-                "list"
+            if reconnect:
+                self.get_client().reconnect()
+            else:
+                self.get_client().connect()
+            return True, [("✓ Connected to server successfully", "success")]
+        
+        except RCONTimeoutError:
+            return False, [
+                ("✗ Connection timeout", "error"),
+                ("💡 Tip: Check if server is online and RCON port is open", "info")
             ]
+        except RCONError as e:
+            error_msg = str(e) or "Connection failed"
+            lines = [(f"✗ {error_msg}", "error")]
             
-            result = subprocess.run(
-                full_command,
-                capture_output=True,
-                text=True,
-                timeout=5,
-                **self._subprocess_no_window()
-            )
-            
-            if result.returncode == 0:
-                self.root.after(0, lambda: self.update_status(True))
-                self.root.after(0, lambda: self.add_output("✓ Connected to server successfully", "success"))
+            # If connection failed, provide helpful suggestions
+            if "connection refused" in error_msg.lower():
+                lines.append(("💡 Tip: Check if RCON is enabled in server.properties", "info"))
+            elif "authentication" in error_msg.lower() or "password" in error_msg.lower():
+                lines.append(("💡 Tip: Verify RCON password is correct", "info"))
             else:
-                self.root.after(0, lambda: self.update_status(False))
-                error_msg = result.stderr.strip() if result.stderr.strip() else "Connection failed"
-                self.root.after(0, lambda: self.add_output(f"✗ {error_msg}", "error"))
-                
-                # If connection failed, provide helpful suggestions
-                if "connection refused" in error_msg.lower():
-                    self.root.after(0, lambda: self.add_output("💡 Tip: Check if RCON is enabled in server.properties", "info"))
-                elif "timeout" in error_msg.lower():
-                    self.root.after(0, lambda: self.add_output("💡 Tip: Check server IP and port settings", "info"))
-                elif "authentication" in error_msg.lower() or "password" in error_msg.lower():
-                    self.root.after(0, lambda: self.add_output("💡 Tip: Verify RCON password is correct", "info"))
-        
-        except subprocess.TimeoutExpired:
-            self.root.after(0, lambda: self.update_status(False))
-            self.root.after(0, lambda: self.add_output("✗ Connection timeout", "error"))
-            self.root.after(0, lambda: self.add_output("💡 Tip: Check if server is online and RCON port is open", "info"))
+                lines.append(("💡 Tip: Check server IP and port settings", "info"))
+            return False, lines
         except Exception as e:
-            self.root.after(0, lambda: self.update_status(False))
-            self.root.after(0, lambda: self.add_output(f"✗ Connection error: {str(e)}", "error"))
-            self.root.after(0, lambda: self.add_output("💡 Tip: Check server configuration and network connectivity", "info"))
+            return False, [
+                (f"✗ Connection error: {str(e)}", "error"),
+                ("💡 Tip: Check server configuration and network connectivity", "info")
+            ]
     
     def load_config(self):
         """Load configuration from config.json file"""
@@ -721,12 +1693,21 @@ https://h190k.com"""
                 self.server_host = config_data.get('server_ip', '')
                 self.server_port = config_data.get('port', '')
                 self.rcon_password = config_data.get('password', '')
+                self.game_port = str(config_data.get('game_port', DEFAULT_GAME_PORT))
+                self.use_query = bool(config_data.get('use_query', False))
+                self.query_port = str(config_data.get('query_port', self.game_port))
+                self.servers = load_servers(config_data)
+                get_cache().configure(config_data.get('cache_ttls'))
                 return True
             else:
                 # No config file found
                 self.server_host = ""
                 self.server_port = ""
                 self.rcon_password = ""
+                self.game_port = str(DEFAULT_GAME_PORT)
+                self.use_query = False
+                self.query_port = self.game_port
+                self.servers = []
                 return False
         
         except Exception as e:
@@ -734,38 +1715,38 @@ https://h190k.com"""
             self.server_host = ""
             self.server_port = ""
             self.rcon_password = ""
+            self.game_port = str(DEFAULT_GAME_PORT)
+            self.use_query = False
+            self.query_port = self.game_port
+            self.servers = []
             return False
     
     def start_config_monitor(self):
-        """Start monitoring config.json for changes"""
-        self.config_last_modified = os.path.getmtime("config.json") if os.path.exists("config.json") else 0
-        self.check_config_changes()
+        """Start watching config.json for changes on a background thread"""
+        self.config_watcher = ConfigWatcher(
+            "config.json",
+            on_change=lambda: self.root.after(0, self.on_config_changed)
+        )
+        self.config_watcher.start()
     
-    def check_config_changes(self):
-        """Check if config.json has been modified and reload if needed"""
+    def on_config_changed(self):
+        """Reload config.json after an external edit"""
         try:
-            if os.path.exists("config.json"):
-                current_modified = os.path.getmtime("config.json")
-                if current_modified > self.config_last_modified:
-                    self.config_last_modified = current_modified
-                    old_host = getattr(self, 'server_host', '')
-                    old_port = getattr(self, 'server_port', '')
-                    old_password = getattr(self, 'rcon_password', '')
-                    
-                    if self.load_config():
-                        self.update_server_info()
-                        self.add_output("🔄 Configuration updated from config.json", "success")
-                        
-                        # Test connection if server details changed
-                        if (old_host != self.server_host or 
-                            old_port != self.server_port or 
-                            old_password != self.rcon_password):
-                            self.test_connection()
+            old_host = getattr(self, 'server_host', '')
+            old_port = getattr(self, 'server_port', '')
+            old_password = getattr(self, 'rcon_password', '')
+            
+            if self.load_config():
+                self.update_server_info()
+                self.add_output("🔄 Configuration updated from config.json", "success")
+                
+                # Test connection if server details changed
+                if (old_host != self.server_host or 
+                    old_port != self.server_port or 
+                    old_password != self.rcon_password):
+                    self.test_connection()
         except Exception as e:
-            print(f"Error checking config changes: {e}")
-        
-        # Schedule next check in 2 seconds
-        self.root.after(2000, self.check_config_changes)
+            print(f"Error reloading config: {e}")
     
     def create_modern_section(self, parent, title, placeholder, command, button_text, row, button_color):
         """Create a modern styled input section with rounded corners"""
@@ -859,6 +1840,22 @@ https://h190k.com"""
             self.command_entry = entry
             self.command_button = button
             self.command_placeholder = placeholder
+            self.bind_history_keys(entry)
+            
+            # Tab completion candidates and argument hints
+            self.completion_label = tk.Label(
+                input_container,
+                text="",
+                font=("Consolas", 9),
+                bg="#0d1117",
+                fg="#8b949e",
+                anchor="w",
+                justify=tk.LEFT,
+                wraplength=640
+            )
+            self.completion_label.grid(row=1, column=0, columnspan=2, sticky="ew", pady=(8, 0))
+            self.completion_label.grid_remove()
+            entry.bind("<Tab>", lambda e: self.complete_command())
     
     def create_quick_commands(self, parent):
         """Create quick command buttons with rounded style"""
@@ -869,15 +1866,37 @@ https://h190k.com"""
         quick_frame = tk.Frame(quick_outer, bg="#0d1117", relief=tk.FLAT)
         quick_frame.pack(fill=tk.BOTH, expand=True, padx=1, pady=1)
         
+        quick_header = tk.Frame(quick_frame, bg="#0d1117")
+        quick_header.pack(fill=tk.X, padx=20, pady=(18, 12))
+        
         title_label = tk.Label(
-            quick_frame,
+            quick_header,
             text="⚡ Quick Commands",
             font=("Segoe UI", 12, "bold"),
             bg="#0d1117",
             fg="#c9d1d9",
             anchor="w"
         )
-        title_label.pack(anchor="w", padx=20, pady=(18, 12))
+        title_label.pack(side=tk.LEFT)
+        
+        # Fan-out toggle: send every command to all configured servers
+        self.fan_out_var = tk.BooleanVar(value=False)
+        self.fan_out_check = tk.Checkbutton(
+            quick_header,
+            text="🌐 All servers",
+            variable=self.fan_out_var,
+            font=("Segoe UI", 9, "bold"),
+            bg="#0d1117",
+            fg="#c9d1d9",
+            selectcolor="#010409",
+            activebackground="#0d1117",
+            activeforeground="#c9d1d9",
+            cursor="hand2",
+            bd=0,
+            highlightthickness=0
+        )
+        self.fan_out_check.pack(side=tk.RIGHT)
+        self.update_fan_out_toggle()
         
         button_container = tk.Frame(quick_frame, bg="#0d1117")
         button_container.pack(fill=tk.X, padx=20, pady=(0, 18))
@@ -908,6 +1927,207 @@ https://h190k.com"""
             )
             btn.pack(side=tk.LEFT, padx=(0, 10))
     
+    def create_players_section(self, parent):
+        """Create the player panel fed by the server's roster"""
+        players_outer = tk.Frame(parent, bg="#161b22", highlightthickness=1,
+                                highlightbackground="#30363d", relief=tk.FLAT)
+        players_outer.grid(row=5, column=0, columnspan=2, sticky="ew", pady=(0, 18))
+        
+        players_frame = tk.Frame(players_outer, bg="#0d1117", relief=tk.FLAT)
+        players_frame.pack(fill=tk.BOTH, expand=True, padx=1, pady=1)
+        
+        players_header = tk.Frame(players_frame, bg="#0d1117")
+        players_header.pack(fill=tk.X, padx=20, pady=(18, 8))
+        
+        title_label = tk.Label(
+            players_header,
+            text="👥 Players",
+            font=("Segoe UI", 12, "bold"),
+            bg="#0d1117",
+            fg="#c9d1d9",
+            anchor="w"
+        )
+        title_label.pack(side=tk.LEFT)
+        
+        self.player_source_label = tk.Label(
+            players_header,
+            text="",
+            font=("Segoe UI", 9),
+            bg="#0d1117",
+            fg="#8b949e"
+        )
+        self.player_source_label.pack(side=tk.RIGHT)
+        
+        players_text = scrolledtext.ScrolledText(
+            players_frame,
+            height=6,
+            font=("Consolas", 10),
+            bg="#0d1117",
+            fg="#c9d1d9",
+            wrap=tk.NONE,
+            state=tk.DISABLED,
+            relief=tk.FLAT,
+            borderwidth=0,
+            highlightthickness=0,
+            selectbackground="#1f6feb",
+            tabs=("220",)
+        )
+        players_text.pack(fill=tk.X, padx=20, pady=(0, 18))
+        self.player_view = PlayerListView(players_text)
+        self.player_view.show_message("Waiting for first check...")
+    
+    def attach_history(self):
+        """Recall commands from the configured server's history"""
+        history = get_history(self.server_host, self.server_port) if self.server_host else None
+        if history is self.history:
+            return
+        self.history = history
+        self.history_cursor = HistoryCursor(history) if history is not None else None
+        if history is not None:
+            history.preload()
+    
+    def bind_history_keys(self, entry):
+        """Up/Down recall and Ctrl+R search on the command entry"""
+        def recall(older):
+            if self.history_cursor is None:
+                return "break"
+            text = entry.get()
+            if text == self.command_placeholder:
+                text = ""
+            command = self.history_cursor.older(text) if older else self.history_cursor.newer()
+            if command is not None:
+                entry.delete(0, tk.END)
+                entry.insert(0, command)
+                entry.config(fg="#c9d1d9")
+            return "break"
+        
+        def search(event):
+            if self.history is not None:
+                text = entry.get()
+                HistorySearchDialog(self.root, self.history, self.recall_command,
+                                    "" if text == self.command_placeholder else text)
+            return "break"
+        
+        def edited(event):
+            # Recall restarts from whatever is typed next
+            if event.keysym not in ("Up", "Down", "Tab") and event.char:
+                if self.history_cursor is not None:
+                    self.history_cursor.reset()
+                self.show_completions("")
+        
+        entry.bind("<Up>", lambda e: recall(True))
+        entry.bind("<Down>", lambda e: recall(False))
+        entry.bind("<Control-r>", search)
+        entry.bind("<KeyPress>", edited, add="+")
+    
+    def attach_completer(self):
+        """Complete commands from the configured server's command tree"""
+        self.completer = None
+        if self.server_host:
+            try:
+                self.completer = get_completer(self.get_client(), get_roster(self.server_host, self.server_port))
+            except RCONError:
+                pass
+    
+    def complete_command(self):
+        """Tab: complete the last word of the command entry from the cached tree"""
+        entry = self.command_entry
+        text = entry.get()
+        if text == self.command_placeholder or self.completer is None:
+            return "break"
+        result = self.completer.complete(text)
+        if not result['ready']:
+            self.show_completions(self.completer.error or "Loading the server's command list...")
+            return "break"
+        
+        matches = result['matches']
+        if len(matches) == 1:
+            completed = text[:result['start']] + matches[0] + " "
+        else:
+            completed = text[:result['start']] + common_prefix(matches) if matches else text
+        if completed != text:
+            entry.delete(0, tk.END)
+            entry.insert(0, completed)
+            entry.icursor(tk.END)
+        
+        shown = matches if len(matches) > 1 else []
+        self.show_completions("  ".join(shown[:20] + result['hints']))
+        return "break"
+    
+    def show_completions(self, text):
+        if not hasattr(self, 'completion_label'):
+            return
+        if text:
+            self.completion_label.config(text=text)
+            self.completion_label.grid()
+        else:
+            self.completion_label.grid_remove()
+    
+    def recall_command(self, command):
+        """Put a command from the history into the command entry"""
+        entry = self.command_entry
+        entry.delete(0, tk.END)
+        entry.insert(0, command)
+        entry.config(fg="#c9d1d9")
+        entry.focus_set()
+        entry.icursor(tk.END)
+        if self.history_cursor is not None:
+            self.history_cursor.reset()
+    
+    def attach_roster(self):
+        """Follow the roster of the configured server"""
+        if not hasattr(self, 'player_view'):
+            return
+        roster = get_roster(self.server_host, self.server_port) if self.server_host else None
+        if roster is self.roster:
+            return
+        if self.roster is not None:
+            self.roster.unsubscribe(self._on_roster_diff)
+        self.roster = roster
+        if roster is None:
+            self.player_view.show_message("Waiting for first check...")
+            self.player_source_label.config(text="")
+            return
+        roster.subscribe(self._on_roster_diff)
+        self.update_players(roster.snapshot())
+    
+    def _on_roster_diff(self, diff):
+        """Roster listener; called from whichever thread updated it"""
+        self.root.after(0, lambda: self.update_players(diff))
+    
+    def update_players(self, diff):
+        """Apply a roster diff to the player panel"""
+        if self.roster is None or diff['server'] != self.roster.server:
+            return
+        if diff['source'] == "offline":
+            self.player_view.show_message("Server offline")
+            self.player_source_label.config(text="")
+            return
+        if diff['updated'] is None:
+            self.player_view.show_message("Waiting for first check...")
+            self.player_source_label.config(text="")
+            return
+        
+        self.player_view.apply(diff)
+        if not len(self.player_view):
+            self.player_view.show_message("No players online" if not diff['players_online']
+                                          else f"{diff['players_online']} online (run list for names)")
+        
+        sources = {"query": "via Query", "list": "via list", "ping": "via ping"}
+        source = sources.get(diff['source'], "")
+        online = diff['players_online']
+        if online > len(self.player_view) and len(self.player_view):
+            text = f"{len(self.player_view)} of {online} shown"
+        else:
+            text = f"{online}/{diff['players_max']}"
+        if source:
+            text += f" · {source}"
+        self.player_source_label.config(text=text)
+    
+    def refresh_player_durations(self):
+        self.player_view.refresh_durations()
+        self.root.after(self.DURATION_REFRESH_MS, self.refresh_player_durations)
+    
     def create_output_section(self, parent):
         """Create output section with rounded corners"""
         output_outer = tk.Frame(parent, bg="#161b22", highlightthickness=1,
@@ -974,6 +2194,9 @@ https://h190k.com"""
             pady=10
         )
         self.output_text.grid(row=0, column=0, sticky="nsew")
+        
+        # Batched, size-capped writer in front of the text widget
+        self.console = ConsoleView(self.output_text)
     
     def quick_command(self, command):
         """Execute a quick command"""
@@ -1007,6 +2230,10 @@ https://h190k.com"""
             self.add_output("⚠ Please enter a command", "error")
             return
         
+        if self.history is not None:
+            self.history.add(command)
+            self.history_cursor.reset()
+        self.show_completions("")
         self.execute_rcon(command, f"Command: {command}", button, "Execute Command")
         
         entry.delete(0, tk.END)
@@ -1020,78 +2247,153 @@ https://h190k.com"""
         if button:
             button.config(state=tk.DISABLED, text="⏳ Sending...")
         
-        self.add_output(f"→ {description}", "info")
-        
-        thread = threading.Thread(
-            target=self._execute_rcon_thread,
-            args=(command, button, button_text)
+        if self.fan_out_var.get() and len(self.servers) > 1:
+            self.add_output(f"→ {description} (all {len(self.servers)} servers)", "info")
+            self.submit_job(self._fan_out_job, command, button=button, button_text=button_text, stream=True)
+        else:
+            self.add_output(f"→ {description}", "info")
+            self.submit_job(self._execute_rcon_job, command, button=button, button_text=button_text, stream=True)
+    
+    def submit_job(self, fn, *args, button=None, button_text=None, level=INTERACTIVE, stream=False):
+        """Queue fn(*args) on the command executor in a priority class
+
+        fn runs on a worker thread and returns (connected, output lines).
+        With stream=True it is also passed an emit(text, msg_type, badge)
+        function for lines to show while it runs.  A job's output appears
+        after that of every earlier job in its class.  Returns False when
+        the queue is full.
+        """
+        output = self.console.open_stream(level)
+        if stream:
+            args += (lambda text, msg_type="info", badge=None:
+                     self.root.after(0, lambda: self.console.write(output, text, msg_type, badge)),)
+        job = self.executor.submit(
+            fn, *args,
+            on_done=lambda result, error: self._job_done(result, error, output, button, button_text),
+            level=level
         )
-        thread.daemon = True
-        thread.start()
+        if job is None:
+            self.console.close_stream(output)
+            self.add_output(f"⚠ Command queue is full ({self.executor.max_queue} pending), please wait", "warning")
+            if button:
+                button.config(state=tk.NORMAL, text=button_text)
+            return False
+        return True
+    
+    def _job_done(self, result, error, output, button=None, button_text=None):
+        """Show a finished job's output on the main thread"""
+        if error is not None:
+            self.console.write(output, f"✗ Error: {str(error)}", "error")
+            self.update_status(False)
+        else:
+            connected, lines = result
+            for line in lines:
+                self.console.write(output, *line)
+            if connected is not None:
+                self.update_status(connected)
+        self.console.close_stream(output)
+        
+        if button:
+            button.config(state=tk.NORMAL, text=button_text)
+    
+    def _on_queue_depth(self, depth):
+        """Record executor queue depth; called from any thread"""
+        self.queue_depth = depth
+        # Coalesce bursts of depth changes into one label update
+        if not self._queue_depth_scheduled:
+            self._queue_depth_scheduled = True
+            self.root.after(0, self._update_queue_label)
+    
+    def _update_queue_label(self):
+        self._queue_depth_scheduled = False
+        if not hasattr(self, 'queue_label'):
+            return
+        if self.queue_depth:
+            self.queue_label.config(text=f"⏳ {self.queue_depth}/{self.executor.max_queue} queued")
+        else:
+            self.queue_label.config(text="")
     
-    def _execute_rcon_thread(self, command, button=None, button_text=None):
+    def _execute_rcon_job(self, command, emit):
         try:
-            # mcrcon is always in same directory
-            mcrcon_path = "./mcrcon.exe"
+            client = self.get_client()
+            cached = client.cached_response(command)
+            if cached is not None:
+                text = strip_colors(cached).strip()
+                return True, [(f"✓ {text or 'Command executed'}", "success", "cached")]
             
-            if not os.path.exists(mcrcon_path):
-                self.root.after(0, lambda: self.add_output(
-                    f"✗ mcrcon.exe not found in application directory", "error"
-                ))
-                if button:
-                    self.root.after(0, lambda: button.config(state=tk.NORMAL, text=button_text))
-                return
+            # Long responses arrive in several packets; each line is shown as
+            # soon as it is complete.  Blank lines are held back until more
+            # text follows, so none lead or trail the output
+            emitted = False
+            blanks = 0
+            for line in iter_lines(client.command_iter(command)):
+                if not line.strip():
+                    blanks += emitted
+                    continue
+                for _ in range(blanks):
+                    emit("  ", "success")
+                blanks = 0
+                emit(f"{'  ' if emitted else '✓ '}{line}", "success")
+                emitted = True
             
-            full_command = [
-                mcrcon_path,
-                "-H", self.server_host,
-                "-P", self.server_port,
-                "-p", self.rcon_password,
-                command
-            ]
-            
-            result = subprocess.run(full_command, capture_output=True, text=True, check=False, **self._subprocess_no_window())
-            
-            if result.returncode == 0:
-                output = result.stdout.strip() if result.stdout else "Command executed"
-                self.root.after(0, lambda: self.add_output(f"✓ {output}", "success"))
-                self.root.after(0, lambda: self.update_status(True))
-            else:
-                error = result.stderr.strip() if result.stderr else "Unknown error"
-                self.root.after(0, lambda: self.add_output(f"✗ {error}", "error"))
-                self.root.after(0, lambda: self.update_status(False))
-        
-        except subprocess.TimeoutExpired:
-            self.root.after(0, lambda: self.add_output("✗ Connection timeout", "error"))
-            self.root.after(0, lambda: self.update_status(False))
+            if not emitted:
+                return True, [("✓ Command executed", "success")]
+            return True, []
+        
+        except RCONTimeoutError:
+            return False, [("✗ Connection timeout", "error")]
+        except RCONError as e:
+            return False, [(f"✗ {str(e) or 'Unknown error'}", "error")]
         except Exception as e:
-            self.root.after(0, lambda: self.add_output(f"✗ Error: {str(e)}", "error"))
-            self.root.after(0, lambda: self.update_status(False))
-        finally:
-            if button:
-                self.root.after(0, lambda: button.config(state=tk.NORMAL, text=button_text))
+            return False, [(f"✗ Error: {str(e)}", "error")]
     
-    def add_output(self, text, msg_type="info"):
-        timestamp = datetime.now().strftime("%H:%M:%S")
-        
-        self.output_text.config(state=tk.NORMAL)
-        
-        self.output_text.insert(tk.END, f"[{timestamp}] ", "timestamp")
-        self.output_text.insert(tk.END, f"{text}\n", msg_type)
+    def _fan_out_job(self, command, emit):
+        def on_result(result):
+            line = f"[{result['server']}] {result['message']} ({result['latency_ms']:.1f} ms)"
+            if result['success']:
+                emit(f"✓ {line}", "success", "cached" if result.get('cached') else None)
+            else:
+                emit(f"✗ {line}", "error")
         
-        self.output_text.tag_config("timestamp", foreground="#6e7681")
-        self.output_text.tag_config("info", foreground="#58a6ff")
-        self.output_text.tag_config("success", foreground="#3fb950")
-        self.output_text.tag_config("error", foreground="#f85149")
-        self.output_text.tag_config("warning", foreground="#d29922")
+        summary = fan_out(self.servers, command, on_result=on_result)
+        icon = "✓" if summary['success'] else "✗"
+        msg_type = "success" if summary['success'] else "error"
+        connected = any(r['success'] for r in summary['results'])
+        return connected, [(f"{icon} {summary['message']}", msg_type)]
+    
+    def execute_batch(self, commands):
+        """Pipeline a list of RCON commands over one connection"""
+        if not hasattr(self, 'server_host') or not self.server_host:
+            self.add_output("⚠ Please configure RCON settings first", "error")
+            return
         
-        self.output_text.config(state=tk.DISABLED)
-        self.output_text.see(tk.END)
+        self.add_output(f"→ Batch: {len(commands)} commands", "info")
+        self.submit_job(self._execute_batch_job, commands, level=BULK)
+    
+    def _execute_batch_job(self, commands):
+        try:
+            started = time.perf_counter()
+            results = self.get_client().batch(commands)
+            elapsed_ms = (time.perf_counter() - started) * 1000
+        except RCONError as e:
+            return False, [(f"✗ {str(e) or 'Unknown error'}", "error")]
+        
+        lines = []
+        for i, (command, (ok, text, seconds)) in enumerate(zip(commands, results), 1):
+            text = strip_colors(text).strip() or "Command executed"
+            line = f"[{i}] {command} → {text} ({seconds * 1000:.1f} ms)"
+            lines.append((f"✓ {line}", "success") if ok else (f"✗ {line}", "error"))
+        
+        succeeded = sum(1 for ok, _, _ in results if ok)
+        summary = f"Batch finished: {succeeded}/{len(results)} succeeded in {elapsed_ms:.1f} ms"
+        lines.append((f"✓ {summary}", "success") if succeeded == len(results) else (f"✗ {summary}", "error"))
+        return succeeded > 0, lines
+    
+    def add_output(self, text, msg_type="info", badge=None):
+        self.console.append(text, msg_type, badge)
     
     def clear_output(self):
-        self.output_text.config(state=tk.NORMAL)
-        self.output_text.delete(1.0, tk.END)
-        self.output_text.config(state=tk.DISABLED)
+        self.console.clear()
         self.add_output("Console cleared", "info")
 
 def main():
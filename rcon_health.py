@@ -0,0 +1,208 @@
+"""Server health checks using the Minecraft Server List Ping protocol
+
+Liveness is checked the way the multiplayer screen does it: a handshake
+followed by a status request on the game port, which returns player
+counts and the server version as JSON, then a ping/pong for the round-trip
+time.  This needs no RCON login and leaves nothing in the RCON log.
+
+HealthMonitor runs the check on an adaptive schedule: the interval grows
+while the server stays up and snaps back to the minimum after a failure.
+The probe is pluggable, e.g. rcon_query.query_status for servers with
+enable-query, which also lists every player.
+"""
+import json
+import random
+import socket
+import struct
+import threading
+import time
+
+DEFAULT_GAME_PORT = 25565
+DEFAULT_TIMEOUT = 3.0
+
+# Protocol version -1 asks the server to answer whatever its version is
+_STATUS_PROTOCOL = -1
+
+# What a malformed or truncated status reply can raise
+_MALFORMED_REPLY = (ValueError, IndexError, KeyError, TypeError, AttributeError, struct.error)
+
+MIN_INTERVAL = 5.0
+MAX_INTERVAL = 60.0
+BACKOFF_FACTOR = 1.5
+
+
+def _varint(value):
+    value &= 0xFFFFFFFF
+    out = bytearray()
+    while True:
+        byte = value & 0x7F
+        value >>= 7
+        if value:
+            out.append(byte | 0x80)
+        else:
+            out.append(byte)
+            return bytes(out)
+
+
+def _frame(payload):
+    return _varint(len(payload)) + payload
+
+
+def _read_exact(stream, size):
+    data = stream.read(size)
+    if len(data) != size:
+        raise ConnectionError("Connection closed by server")
+    return data
+
+
+def _read_varint(stream):
+    result = 0
+    for shift in range(0, 35, 7):
+        byte = _read_exact(stream, 1)[0]
+        result |= (byte & 0x7F) << shift
+        if not byte & 0x80:
+            return result
+    raise ValueError("VarInt too long")
+
+
+def _decode_varint(data, offset):
+    result = 0
+    for shift in range(0, 35, 7):
+        byte = data[offset]
+        offset += 1
+        result |= (byte & 0x7F) << shift
+        if not byte & 0x80:
+            return result, offset
+    raise ValueError("VarInt too long")
+
+
+def _flatten_motd(description):
+    """Return the plain text of a chat component"""
+    if isinstance(description, str):
+        return description
+    if isinstance(description, dict):
+        text = description.get('text', '')
+        return text + "".join(_flatten_motd(part) for part in description.get('extra', []))
+    if isinstance(description, list):
+        return "".join(_flatten_motd(part) for part in description)
+    return ""
+
+
+def server_list_ping(host, port=DEFAULT_GAME_PORT, timeout=DEFAULT_TIMEOUT):
+    """Query a server's status
+
+    Raises OSError when the server cannot be reached; a malformed reply can
+    raise ValueError, IndexError, struct.error or, for status JSON of the
+    wrong shape, AttributeError, KeyError or TypeError.
+    """
+    port = int(port)
+    started = time.perf_counter()
+    with socket.create_connection((host, port), timeout=timeout) as sock:
+        sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        stream = sock.makefile('rb')
+
+        host_bytes = host.encode("utf-8")
+        handshake = (b"\x00" + _varint(_STATUS_PROTOCOL) + _varint(len(host_bytes)) + host_bytes
+                     + struct.pack(">H", port) + _varint(1))
+        sock.sendall(_frame(handshake) + _frame(b"\x00"))
+
+        packet = _read_exact(stream, _read_varint(stream))
+        packet_id, offset = _decode_varint(packet, 0)
+        if packet_id != 0x00:
+            raise ValueError(f"Unexpected status packet 0x{packet_id:02x}")
+        length, offset = _decode_varint(packet, offset)
+        status = json.loads(packet[offset:offset + length].decode("utf-8"))
+        rtt = time.perf_counter() - started
+
+        # Ping/pong gives a cleaner round-trip time; some servers skip it
+        try:
+            token = random.getrandbits(63)
+            ping_started = time.perf_counter()
+            sock.sendall(_frame(b"\x01" + struct.pack(">q", token)))
+            pong = _read_exact(stream, _read_varint(stream))
+            if pong[:1] == b"\x01" and struct.unpack(">q", pong[1:9])[0] == token:
+                rtt = time.perf_counter() - ping_started
+        except (OSError, ValueError, struct.error):
+            pass
+
+    players = status.get('players') or {}
+    version = status.get('version') or {}
+    return {
+        "online": True,
+        "players_online": players.get('online', 0),
+        "players_max": players.get('max', 0),
+        "players_sample": [p.get('name', '') for p in players.get('sample') or []],
+        "version": version.get('name', ''),
+        "motd": _flatten_motd(status.get('description', '')),
+        "rtt_ms": round(rtt * 1000, 1)
+    }
+
+
+class HealthMonitor:
+    """Background Server List Ping on an adaptive schedule"""
+
+    def __init__(self, host, port, on_update, min_interval=MIN_INTERVAL, max_interval=MAX_INTERVAL,
+                 probe=server_list_ping):
+        self.host = host
+        self.port = port
+        self.on_update = on_update
+        self.probe = probe
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+        self.interval = min_interval
+        self.last = None
+        self._wake = threading.Event()
+        self._stop = False
+        self._thread = None
+
+    def start(self):
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name="health-monitor", daemon=True)
+            self._thread.start()
+
+    def stop(self):
+        self._stop = True
+        self._wake.set()
+
+    def set_target(self, host, port, probe=None):
+        """Point the monitor at another server and check it right away"""
+        self.host = host
+        self.port = port
+        if probe is not None:
+            self.probe = probe
+        self.check_now()
+
+    def check_now(self):
+        """Run the next check immediately"""
+        self.interval = self.min_interval
+        self._wake.set()
+
+    def check(self):
+        """Run one check, update the schedule and return the result"""
+        try:
+            result = self.probe(self.host, self.port)
+            # Stable server: back off
+            self.interval = min(self.max_interval, self.interval * BACKOFF_FACTOR)
+        except OSError as e:
+            result = {"online": False, "error": str(e) or "Server unreachable"}
+            # Failing server: check again soon
+            self.interval = self.min_interval
+        except _MALFORMED_REPLY as e:
+            result = {"online": False, "error": f"Invalid status reply: {e}"}
+            # Failing server: check again soon
+            self.interval = self.min_interval
+        result['checked_at'] = time.time()
+        result['next_check_s'] = round(self.interval, 1)
+        self.last = result
+        return result
+
+    def _run(self):
+        while not self._stop:
+            if self.host:
+                result = self.check()
+                try:
+                    self.on_update(result)
+                except Exception as e:
+                    print(f"Error handling health update: {e}")
+            self._wake.wait(self.interval)
+            self._wake.clear()
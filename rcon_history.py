@@ -0,0 +1,372 @@
+"""Persistent per-server command history with indexed lookup
+
+Every command typed into a GUI's command box or the CLI shell is appended
+to a plain-text log, one command per line, under history/ (one file per
+server).  Nothing is read at startup: the log is loaded on first use by
+reading blocks back from its end until max_entries lines are found, and a
+log that has grown to more than twice that is rewritten with just the
+tail.
+
+In memory the history keeps:
+
+    entries   every command in order, without consecutive repeats
+    recent    each distinct command, ordered by its last use
+    sorted    the distinct commands in sorted order, for prefix ranges
+
+prefix() finds a prefix's range in the sorted array with two bisections
+and returns the most recently used matches, in well under a millisecond
+with 100k entries.  HistoryCursor implements Up/Down recall on top of it.
+
+add() never waits for the disk or for a load in progress: the command
+joins a pending list that the next lookup folds into the index, and a
+writer thread appends it to the log.
+search() (Ctrl+R) scans one newest-first string of all distinct commands
+with str.find, about a millisecond per megabyte of distinct commands, and
+falls back to a fuzzy in-order character match when nothing contains the
+text.
+"""
+import atexit
+import heapq
+import os
+import queue
+import re
+import threading
+from bisect import bisect_left, bisect_right, insort
+
+DEFAULT_HISTORY_DIR = "history"
+DEFAULT_MAX_ENTRIES = 100000
+
+# Bytes read per step when loading the tail of a log
+TAIL_BLOCK = 64 * 1024
+
+SEARCH_LIMIT = 20
+
+# Prefix ranges up to this size are ranked directly; larger ones are
+# matched newest-first, where results turn up within a few hundred steps
+RANK_LIMIT = 512
+
+# Matches fetched at a time while recalling with Up
+CURSOR_PAGE = 50
+
+_UNSAFE = re.compile(r"[^\w.-]")
+
+
+def history_path(host, port, directory=DEFAULT_HISTORY_DIR):
+    return os.path.join(directory, _UNSAFE.sub("_", f"{host}_{port}") + ".log")
+
+
+class CommandHistory:
+    """Append-only command log for one server, indexed for recall and search"""
+
+    def __init__(self, path, max_entries=DEFAULT_MAX_ENTRIES):
+        self.path = path
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._loaded = False
+        # Added commands not yet in the index, as (sequence, command)
+        self._pending_lock = threading.Lock()
+        self._pending = []
+        self._last = None
+        self._sequence = 0
+        # Log writer thread; _written is the sequence of the last command in the file
+        self._file_lock = threading.Lock()
+        self._unwritten = queue.Queue()
+        self._writer = None
+        self._written = 0
+        self._loaded_through = 0
+        self._entries = []
+        # Distinct command -> position of its last use, least recent first
+        self._recent = {}
+        self._sorted = []
+        self._position = 0
+        # Newest-first distinct commands for search(), built on demand
+        self._blob = None
+        self._blob_commands = None
+        self._blob_starts = None
+
+    def add(self, command):
+        """Record a command and queue it for the log; never waits for the disk
+
+        Repeats of the last command are skipped.
+        """
+        command = " ".join(command.strip().splitlines())
+        if not command:
+            return
+        self._start_writer()
+        with self._pending_lock:
+            if command == self._last:
+                return
+            self._last = command
+            self._sequence += 1
+            self._pending.append((self._sequence, command))
+            self._unwritten.put((self._sequence, command))
+
+    def flush(self, timeout=5.0):
+        """Wait until every added command is in the log file"""
+        if self._writer is None:
+            return True
+        done = threading.Event()
+        self._unwritten.put(done)
+        return done.wait(timeout)
+
+    def preload(self):
+        """Load the log on a background thread so the first recall is instant"""
+        threading.Thread(target=self._preload, name="rcon-history", daemon=True).start()
+
+    def _preload(self):
+        with self._lock:
+            self._refresh()
+
+    def _start_writer(self):
+        if self._writer is not None:
+            return
+        with self._pending_lock:
+            if self._writer is None:
+                self._writer = threading.Thread(target=self._write_log, name="rcon-history-log", daemon=True)
+                self._writer.start()
+                atexit.register(self.flush)
+
+    def _write_log(self):
+        while True:
+            batch = [self._unwritten.get()]
+            while True:
+                try:
+                    batch.append(self._unwritten.get_nowait())
+                except queue.Empty:
+                    break
+            commands = [item for item in batch if isinstance(item, tuple)]
+            if commands:
+                with self._file_lock:
+                    directory = os.path.dirname(self.path)
+                    try:
+                        if directory:
+                            os.makedirs(directory, exist_ok=True)
+                        with open(self.path, 'a', encoding='utf-8') as f:
+                            f.write("".join(command + "\n" for _, command in commands))
+                    except OSError:
+                        # Recall still works for this session
+                        pass
+                    self._written = commands[-1][0]
+            for item in batch:
+                if not isinstance(item, tuple):
+                    item.set()
+
+    def tail(self, limit=None):
+        """The last limit entries, oldest first"""
+        with self._lock:
+            self._refresh()
+            return list(self._entries[-limit:] if limit else self._entries)
+
+    def prefix(self, prefix, limit=SEARCH_LIMIT):
+        """Distinct commands starting with prefix, most recently used first"""
+        with self._lock:
+            self._refresh()
+            lo = bisect_left(self._sorted, prefix)
+            hi = bisect_right(self._sorted, prefix + "\U0010ffff", lo)
+            if hi - lo <= RANK_LIMIT:
+                return heapq.nlargest(limit, self._sorted[lo:hi], key=self._recent.__getitem__)
+            matches = []
+            for command in reversed(self._recent):
+                if command.startswith(prefix):
+                    matches.append(command)
+                    if len(matches) >= limit:
+                        break
+            return matches
+
+    def search(self, text, limit=SEARCH_LIMIT):
+        """Distinct commands containing text (any case), most recently used first
+
+        When none do, returns commands containing text's characters in
+        order, e.g. "tpa" finds "tp @a".
+        """
+        text = " ".join(text.lower().splitlines())
+        with self._lock:
+            self._refresh()
+            blob, commands, starts = self._search_index()
+            if not text:
+                return commands[:limit]
+            matches = _find_lines(lambda pos: blob.find(text, pos), commands, starts, limit)
+            if not matches:
+                pattern = re.compile("[^\n]*?".join(re.escape(c) for c in text))
+                matches = _find_lines(lambda pos: _regex_find(pattern, blob, pos), commands, starts, limit)
+            return matches
+
+    def __len__(self):
+        with self._lock:
+            self._refresh()
+            return len(self._entries)
+
+    def _search_index(self):
+        if self._blob is None:
+            commands = list(reversed(self._recent))
+            starts = []
+            offset = 0
+            for command in commands:
+                starts.append(offset)
+                offset += len(command) + 1
+            self._blob = "\n".join(commands).lower()
+            self._blob_commands = commands
+            self._blob_starts = starts
+        return self._blob, self._blob_commands, self._blob_starts
+
+    def _append(self, command):
+        if self._entries and self._entries[-1] == command:
+            return
+        self._entries.append(command)
+        if self._recent.pop(command, None) is None:
+            insort(self._sorted, command)
+        self._recent[command] = self._position
+        self._position += 1
+        self._blob = None
+        if len(self._entries) > self.max_entries + self.max_entries // 4:
+            self._rebuild(self._entries[-self.max_entries:])
+
+    def _rebuild(self, entries):
+        self._entries = []
+        self._recent = {}
+        self._position = 0
+        for command in entries:
+            if self._entries and self._entries[-1] == command:
+                continue
+            self._entries.append(command)
+            self._recent.pop(command, None)
+            self._recent[command] = self._position
+            self._position += 1
+        self._sorted = sorted(self._recent)
+        self._blob = None
+
+    def _refresh(self):
+        """Load the log if needed and index the commands added since"""
+        self._ensure_loaded()
+        with self._pending_lock:
+            pending, self._pending = self._pending, []
+        for sequence, command in pending:
+            # Commands already written were read with the file
+            if sequence > self._loaded_through:
+                self._append(command)
+
+    def _ensure_loaded(self):
+        if self._loaded:
+            return
+        self._loaded = True
+        with self._file_lock:
+            self._loaded_through = self._written
+            try:
+                lines, truncated, size, tail_size = self._read_tail()
+            except OSError:
+                return
+            if truncated and size > 2 * tail_size:
+                self._compact(lines)
+        self._rebuild(lines)
+        if self._entries:
+            with self._pending_lock:
+                if self._last is None:
+                    self._last = self._entries[-1]
+
+    def _read_tail(self):
+        """Return (last max_entries lines, whether earlier lines exist, file size, bytes kept)"""
+        try:
+            f = open(self.path, 'rb')
+        except FileNotFoundError:
+            return [], False, 0, 0
+        with f:
+            size = f.seek(0, os.SEEK_END)
+            position = size
+            blocks = []
+            newlines = 0
+            while position > 0 and newlines <= self.max_entries:
+                step = min(TAIL_BLOCK, position)
+                position -= step
+                f.seek(position)
+                block = f.read(step)
+                blocks.append(block)
+                newlines += block.count(b"\n")
+        data = b"".join(reversed(blocks))
+        lines = data.decode('utf-8', errors='replace').splitlines()
+        if position > 0:
+            # The first line read is probably partial
+            lines = lines[1:]
+        truncated = position > 0 or len(lines) > self.max_entries
+        lines = [line for line in lines[-self.max_entries:] if line]
+        return lines, truncated, size, sum(len(line.encode('utf-8')) + 1 for line in lines)
+
+    def _compact(self, lines):
+        temp = self.path + ".tmp"
+        try:
+            with open(temp, 'w', encoding='utf-8') as f:
+                f.write("".join(line + "\n" for line in lines))
+            os.replace(temp, self.path)
+        except OSError:
+            pass
+
+
+def _find_lines(find, commands, starts, limit):
+    """Collect the lines holding successive matches of find(pos), one per line"""
+    matches = []
+    pos = find(0)
+    while pos >= 0 and len(matches) < limit:
+        line = bisect_right(starts, pos) - 1
+        matches.append(commands[line])
+        if line + 1 >= len(starts):
+            break
+        pos = find(starts[line + 1])
+    return matches
+
+
+def _regex_find(pattern, blob, pos):
+    match = pattern.search(blob, pos)
+    return match.start() if match else -1
+
+
+class HistoryCursor:
+    """Up/Down recall, restricted to commands starting with the text typed first
+
+    older(text) is called for Up with the current input and returns the
+    next older match, or None; newer() goes back down and finally returns
+    the original text.  Call reset() once the input is edited or sent.
+    """
+
+    def __init__(self, history):
+        self.history = history
+        self.reset()
+
+    def reset(self):
+        self._draft = None
+        self._matches = []
+        self._index = -1
+        self._limit = 0
+
+    @property
+    def active(self):
+        return self._draft is not None
+
+    def older(self, text):
+        if self._draft is None:
+            self._draft = text
+        if self._index + 1 >= len(self._matches) and len(self._matches) >= self._limit:
+            self._limit = max(CURSOR_PAGE, self._limit * 2)
+            self._matches = [m for m in self.history.prefix(self._draft, self._limit) if m != self._draft]
+        if self._index + 1 >= len(self._matches):
+            return None
+        self._index += 1
+        return self._matches[self._index]
+
+    def newer(self):
+        if self._draft is None or self._index < 0:
+            return None
+        self._index -= 1
+        return self._draft if self._index < 0 else self._matches[self._index]
+
+
+_histories = {}
+_histories_lock = threading.Lock()
+
+
+def get_history(host, port, directory=DEFAULT_HISTORY_DIR):
+    """Return the shared history for a server"""
+    path = history_path(host, port, directory)
+    with _histories_lock:
+        history = _histories.get(path)
+        if history is None:
+            history = _histories[path] = CommandHistory(path)
+        return history
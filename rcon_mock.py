@@ -0,0 +1,303 @@
+"""Local mock RCON server for tests and benchmarks
+
+Speaks the same Source RCON protocol as a Minecraft server: password
+login, request IDs echoed back, responses split into 4096-character
+packets, and "Unknown request" replies to other packet types (which the
+client relies on as its end-of-response sentinel).  On top of that it can
+misbehave on purpose: per-command latency, padded response sizes, TCP
+writes split into small chunks, dropped connections and failed logins.
+
+In-process, from synchronous code:
+
+    with MockRCONServer(password="pw", latency=0.005) as server:
+        client = RCONClient("127.0.0.1", server.port, "pw")
+
+or from asyncio code with "async with MockRCONServer(...)".
+
+From a shell:
+
+    python rcon_mock.py --port 25575 --password pw --latency 5 --drop-rate 0.01
+"""
+import argparse
+import asyncio
+import random
+import struct
+import threading
+
+SERVERDATA_AUTH = 3
+SERVERDATA_AUTH_RESPONSE = 2
+SERVERDATA_EXECCOMMAND = 2
+SERVERDATA_RESPONSE_VALUE = 0
+
+# Vanilla servers split responses into packets of this many characters
+FRAGMENT_SIZE = 4096
+
+# Vanilla servers refuse packets larger than this
+MAX_REQUEST_SIZE = 1460
+
+DEFAULT_PASSWORD = "password"
+DEFAULT_PLAYERS = ("Steve", "Alex")
+
+_HEADER = struct.Struct("<iii")
+
+
+class MockRCONServer:
+    """Asyncio RCON server with configurable latency and faults"""
+
+    def __init__(self, host="127.0.0.1", port=0, password=DEFAULT_PASSWORD,
+                 players=DEFAULT_PLAYERS, max_players=20, responses=None,
+                 latency=0.0, command_latency=None, response_size=None,
+                 chunk_size=None, chunk_delay=0.0, drop_rate=0.0, drop_after=None,
+                 auth_fail_rate=0.0, seed=None):
+        self.host = host
+        self.port = port
+        self.password = password
+        self.players = list(players)
+        self.max_players = max_players
+        # Fixed replies by verb; a callable receives the full command
+        self.responses = dict(responses or {})
+        # Seconds before answering, by default and per verb
+        self.latency = latency
+        self.command_latency = dict(command_latency or {})
+        # Pad (or cut) every reply to this many characters
+        self.response_size = response_size
+        # Write each packet in pieces of chunk_size bytes, chunk_delay apart
+        self.chunk_size = chunk_size
+        self.chunk_delay = chunk_delay
+        # Close the connection instead of answering a command
+        self.drop_rate = drop_rate
+        self.drop_after = drop_after
+        # Refuse a correct password with this probability
+        self.auth_fail_rate = auth_fail_rate
+        self.random = random.Random(seed)
+
+        self.stats = {"connections": 0, "logins": 0, "auth_failures": 0, "commands": 0, "drops": 0}
+        self.commands = []
+        self._server = None
+        self._handlers = set()
+        self._loop = None
+        self._thread = None
+
+    # asyncio use
+
+    async def start(self):
+        """Start listening; self.port holds the bound port afterwards"""
+        self._server = await asyncio.start_server(self._handle, self.host, self.port)
+        self.port = self._server.sockets[0].getsockname()[1]
+        return self
+
+    async def stop(self):
+        if self._server is not None:
+            self._server.close()
+            # wait_closed() also waits for open connections on newer Pythons
+            handlers = list(self._handlers)
+            for handler in handlers:
+                handler.cancel()
+            await asyncio.gather(*handlers, return_exceptions=True)
+            await self._server.wait_closed()
+            self._server = None
+
+    async def serve_forever(self):
+        if self._server is None:
+            await self.start()
+        await self._server.serve_forever()
+
+    async def __aenter__(self):
+        return await self.start()
+
+    async def __aexit__(self, *exc):
+        await self.stop()
+
+    # Synchronous use: run the server's loop on a daemon thread
+
+    def start_in_thread(self):
+        """Start the server on a background event loop and return its port
+
+        Errors starting the server, such as a port already in use, are
+        raised here.
+        """
+        ready = threading.Event()
+        failure = []
+
+        def run():
+            self._loop = asyncio.new_event_loop()
+            asyncio.set_event_loop(self._loop)
+            try:
+                self._loop.run_until_complete(self.start())
+            except BaseException as e:
+                failure.append(e)
+                self._loop.close()
+                self._loop = None
+                return
+            finally:
+                ready.set()
+            self._loop.run_forever()
+            self._loop.run_until_complete(self.stop())
+            self._loop.close()
+
+        self._thread = threading.Thread(target=run, name="rcon-mock", daemon=True)
+        self._thread.start()
+        ready.wait()
+        if failure:
+            self._thread.join()
+            self._thread = None
+            raise failure[0]
+        return self.port
+
+    def stop_thread(self):
+        if self._loop is not None:
+            self._loop.call_soon_threadsafe(self._loop.stop)
+            self._thread.join()
+            self._loop = None
+            self._thread = None
+
+    def __enter__(self):
+        self.start_in_thread()
+        return self
+
+    def __exit__(self, *exc):
+        self.stop_thread()
+
+    # Protocol
+
+    def respond(self, command):
+        """Return the reply text for a command"""
+        verb = command.strip().lstrip("/").split(" ", 1)[0].lower()
+        reply = self.responses.get(verb)
+        if callable(reply):
+            reply = reply(command)
+        elif reply is None:
+            reply = self._builtin(verb, command)
+        if self.response_size is not None:
+            reply = (reply + "." * self.response_size)[:self.response_size]
+        return reply
+
+    def _builtin(self, verb, command):
+        if verb == "list":
+            names = ", ".join(self.players)
+            return f"There are {len(self.players)} of a max of {self.max_players} players online: {names}"
+        if verb == "seed":
+            return "Seed: [-4172144997902289642]"
+        if verb in ("say", "me", "tellraw"):
+            return ""
+        if verb == "echo":
+            return command.split(" ", 1)[1] if " " in command else ""
+        return f"Executed: {command}"
+
+    async def _handle(self, reader, writer):
+        self.stats["connections"] += 1
+        self._handlers.add(asyncio.current_task())
+        authed = False
+        handled = 0
+        try:
+            while True:
+                try:
+                    header = await reader.readexactly(4)
+                except asyncio.IncompleteReadError:
+                    return
+                (length,) = struct.unpack("<i", header)
+                if length < 10 or length > MAX_REQUEST_SIZE:
+                    return
+                data = await reader.readexactly(length)
+                request_id, packet_type = struct.unpack_from("<ii", data)
+                body = data[8:-2].decode("utf-8", errors="replace")
+
+                if packet_type == SERVERDATA_AUTH:
+                    if body == self.password and self.random.random() >= self.auth_fail_rate:
+                        authed = True
+                        self.stats["logins"] += 1
+                        await self._send(writer, request_id, SERVERDATA_AUTH_RESPONSE, "")
+                    else:
+                        authed = False
+                        self.stats["auth_failures"] += 1
+                        await self._send(writer, -1, SERVERDATA_AUTH_RESPONSE, "")
+                elif packet_type == SERVERDATA_EXECCOMMAND:
+                    if not authed:
+                        await self._send(writer, -1, SERVERDATA_AUTH_RESPONSE, "")
+                        continue
+                    handled += 1
+                    if (self.drop_after is not None and handled > self.drop_after) or \
+                            self.random.random() < self.drop_rate:
+                        self.stats["drops"] += 1
+                        return
+                    self.stats["commands"] += 1
+                    self.commands.append(body)
+                    delay = self.command_latency.get(body.split(" ", 1)[0].lower(), self.latency)
+                    if delay:
+                        await asyncio.sleep(delay)
+                    reply = self.respond(body)
+                    # Always at least one packet, even for an empty reply
+                    for start in range(0, max(len(reply), 1), FRAGMENT_SIZE):
+                        await self._send(writer, request_id, SERVERDATA_RESPONSE_VALUE,
+                                         reply[start:start + FRAGMENT_SIZE])
+                else:
+                    await self._send(writer, request_id, SERVERDATA_RESPONSE_VALUE,
+                                     f"Unknown request {packet_type:x}")
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        except asyncio.CancelledError:
+            # Server shutting down
+            pass
+        finally:
+            self._handlers.discard(asyncio.current_task())
+            writer.close()
+
+    async def _send(self, writer, request_id, packet_type, text):
+        body = text.encode("utf-8")
+        packet = _HEADER.pack(len(body) + 10, request_id, packet_type) + body + b"\x00\x00"
+        if not self.chunk_size:
+            writer.write(packet)
+            await writer.drain()
+            return
+        for start in range(0, len(packet), self.chunk_size):
+            writer.write(packet[start:start + self.chunk_size])
+            await writer.drain()
+            if self.chunk_delay:
+                await asyncio.sleep(self.chunk_delay)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Mock Minecraft RCON server for tests and benchmarks")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=25575)
+    parser.add_argument("--password", default=DEFAULT_PASSWORD)
+    parser.add_argument("--players", default=",".join(DEFAULT_PLAYERS),
+                        help="comma-separated player names reported by 'list'")
+    parser.add_argument("--latency", type=float, default=0.0, help="delay before each reply, in ms")
+    parser.add_argument("--size", type=int, default=None, help="pad every reply to this many characters")
+    parser.add_argument("--chunk-size", type=int, default=None, help="split TCP writes into chunks of this many bytes")
+    parser.add_argument("--chunk-delay", type=float, default=0.0, help="delay between chunks, in ms")
+    parser.add_argument("--drop-rate", type=float, default=0.0, help="probability of dropping the connection per command")
+    parser.add_argument("--drop-after", type=int, default=None, help="drop each connection after this many commands")
+    parser.add_argument("--auth-fail-rate", type=float, default=0.0, help="probability of refusing a correct password")
+    parser.add_argument("--seed", type=int, default=None, help="random seed for reproducible faults")
+    args = parser.parse_args()
+
+    server = MockRCONServer(
+        host=args.host,
+        port=args.port,
+        password=args.password,
+        players=[p for p in args.players.split(",") if p],
+        latency=args.latency / 1000,
+        response_size=args.size,
+        chunk_size=args.chunk_size,
+        chunk_delay=args.chunk_delay / 1000,
+        drop_rate=args.drop_rate,
+        drop_after=args.drop_after,
+        auth_fail_rate=args.auth_fail_rate,
+        seed=args.seed
+    )
+
+    async def run():
+        await server.start()
+        print(f"Mock RCON server listening on {args.host}:{server.port} (password: {args.password})")
+        await server.serve_forever()
+
+    try:
+        asyncio.run(run())
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,193 @@
+"""Client for the Minecraft UDP Query protocol
+
+With enable-query=true in server.properties the server answers a full stat
+request (MOTD, version, map, player counts and every player name) in a
+single UDP datagram.  That makes it much cheaper than running "list" over
+RCON, and it needs no password.
+
+Each request must carry a challenge token obtained with a handshake.  The
+server rotates tokens every 30 seconds, so the token is cached and reused
+until it is close to expiring; a request that goes unanswered with a cached
+token is retried once with a fresh one.
+"""
+import random
+import socket
+import struct
+import threading
+import time
+
+DEFAULT_QUERY_PORT = 25565
+DEFAULT_TIMEOUT = 2.0
+
+# The server regenerates tokens every 30 s; renew a little before that
+TOKEN_TTL = 25.0
+
+_MAGIC = b"\xfe\xfd"
+_TYPE_HANDSHAKE = 9
+_TYPE_STAT = 0
+
+# Full stat responses start with this constant padding before the key/values
+_FULL_STAT_PADDING = b"splitnum\x00\x80\x00"
+_PLAYER_SECTION = b"\x01player_\x00\x00"
+
+_MAX_DATAGRAM = 65535
+
+
+class QueryError(OSError):
+    """Query request failed or returned a malformed reply"""
+
+
+class QueryTimeoutError(QueryError):
+    """No reply before the timeout (query may be disabled on the server)"""
+
+
+class QueryClient:
+    """Query client for one server, caching its challenge token"""
+
+    def __init__(self, host, port=DEFAULT_QUERY_PORT, timeout=DEFAULT_TIMEOUT):
+        self.host = host
+        self.port = int(port)
+        self.timeout = timeout
+        self._lock = threading.Lock()
+        self._sock = None
+        self._token = None
+        self._token_time = 0.0
+        # Servers only look at the low 4 bits of each byte
+        self._session_id = random.getrandbits(32) & 0x0F0F0F0F
+
+    def close(self):
+        with self._lock:
+            if self._sock is not None:
+                self._sock.close()
+                self._sock = None
+            self._token = None
+
+    def full_stat(self):
+        """Return the full stat: key/values, player names and round-trip time"""
+        with self._lock:
+            started = time.perf_counter()
+            data = self._request(_TYPE_STAT, b"\x00\x00\x00\x00")
+            rtt = time.perf_counter() - started
+        return self._parse_full_stat(data, rtt)
+
+    def basic_stat(self):
+        """Return the basic stat: MOTD, game type, map and player counts"""
+        with self._lock:
+            started = time.perf_counter()
+            data = self._request(_TYPE_STAT, b"")
+            rtt = time.perf_counter() - started
+        fields = data.split(b"\x00", 5)
+        if len(fields) < 6 or len(fields[5]) < 2:
+            raise QueryError("Malformed basic stat reply")
+        host_port = struct.unpack("<H", fields[5][:2])[0]
+        return {
+            "motd": fields[0].decode("utf-8", "replace"),
+            "gametype": fields[1].decode("utf-8", "replace"),
+            "map": fields[2].decode("utf-8", "replace"),
+            "players_online": int(fields[3] or 0),
+            "players_max": int(fields[4] or 0),
+            "host_port": host_port,
+            "host_ip": fields[5][2:].split(b"\x00", 1)[0].decode("utf-8", "replace"),
+            "rtt_ms": round(rtt * 1000, 1)
+        }
+
+    def _socket(self):
+        if self._sock is None:
+            self._sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+            self._sock.connect((self.host, self.port))
+        self._sock.settimeout(self.timeout)
+        return self._sock
+
+    def _exchange(self, packet_type, payload):
+        sock = self._socket()
+        sock.send(_MAGIC + struct.pack(">BI", packet_type, self._session_id) + payload)
+        while True:
+            try:
+                data = sock.recv(_MAX_DATAGRAM)
+            except socket.timeout:
+                raise QueryTimeoutError("Query timeout (is enable-query on?)")
+            except OSError as e:
+                raise QueryError(f"Query failed: {e}")
+            # Ignore late replies to an earlier request
+            if len(data) >= 5 and data[0] == packet_type and struct.unpack(">I", data[1:5])[0] == self._session_id:
+                return data[5:]
+
+    def _challenge(self, renew=False):
+        if renew or self._token is None or time.monotonic() - self._token_time > TOKEN_TTL:
+            reply = self._exchange(_TYPE_HANDSHAKE, b"")
+            try:
+                self._token = int(reply.split(b"\x00", 1)[0])
+            except ValueError:
+                raise QueryError("Malformed handshake reply")
+            self._token_time = time.monotonic()
+        return self._token
+
+    def _request(self, packet_type, padding):
+        cached = self._token is not None
+        try:
+            token = self._challenge()
+            return self._exchange(packet_type, struct.pack(">i", token) + padding)
+        except QueryTimeoutError:
+            # The server drops requests with a stale token; retry once with a new one
+            if not cached:
+                raise
+            token = self._challenge(renew=True)
+            return self._exchange(packet_type, struct.pack(">i", token) + padding)
+
+    def _parse_full_stat(self, data, rtt):
+        if not data.startswith(_FULL_STAT_PADDING):
+            raise QueryError("Malformed full stat reply")
+        body = data[len(_FULL_STAT_PADDING):]
+        info_part, _, player_part = body.partition(_PLAYER_SECTION)
+
+        info = {}
+        fields = info_part.split(b"\x00")
+        for i in range(0, len(fields) - 1, 2):
+            if not fields[i]:
+                break
+            info[fields[i].decode("utf-8", "replace")] = fields[i + 1].decode("utf-8", "replace")
+
+        players = [name.decode("utf-8", "replace") for name in player_part.split(b"\x00") if name]
+
+        return {
+            "motd": info.get('hostname', ''),
+            "gametype": info.get('gametype', ''),
+            "version": info.get('version', ''),
+            "plugins": info.get('plugins', ''),
+            "map": info.get('map', ''),
+            "players_online": int(info.get('numplayers') or 0),
+            "players_max": int(info.get('maxplayers') or 0),
+            "host_port": int(info.get('hostport') or 0),
+            "host_ip": info.get('hostip', ''),
+            "players": players,
+            "rtt_ms": round(rtt * 1000, 1)
+        }
+
+
+_clients = {}
+_clients_lock = threading.Lock()
+
+
+def get_query_client(host, port=DEFAULT_QUERY_PORT):
+    """Return the shared QueryClient for a server, creating it on first use"""
+    key = (host, int(port))
+    with _clients_lock:
+        client = _clients.get(key)
+        if client is None:
+            client = QueryClient(host, port)
+            _clients[key] = client
+        return client
+
+
+def query_status(host, port=DEFAULT_QUERY_PORT, timeout=DEFAULT_TIMEOUT):
+    """Full stat in the same shape as rcon_health.server_list_ping()
+
+    Raises QueryError (an OSError), so HealthMonitor can use this as a
+    drop-in probe.
+    """
+    client = get_query_client(host, port)
+    client.timeout = timeout
+    stat = client.full_stat()
+    stat['online'] = True
+    stat['players_sample'] = stat['players']
+    return stat
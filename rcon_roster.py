@@ -0,0 +1,267 @@
+"""Structured player rosters built from "list" output and Query results
+
+Roster keeps the players online on one server and when each of them was
+first seen, so the GUIs can show session durations and apply join/leave
+diffs to their player panels instead of redrawing every row.  A roster is
+fed from three places:
+
+    "list" responses   parsed by parse_list() whenever the shared client
+                       runs "list" or "list uuids", however it was sent
+    UDP Query          the health monitor's full player list
+    Server List Ping   only when its sample covers everyone online
+
+Every update produces a diff dict: "joined" entries with their join time
+("since") and whether the join itself was observed ("exact"), "left"
+entries with their session length, the counts and the data "source"
+("list", "query", "ping", or "offline" once the server stops answering).
+
+Join times live in a flat array of doubles indexed by a per-name slot, with
+freed slots reused, so a server with hundreds of players costs a few
+kilobytes and a refresh is one set difference.
+"""
+import re
+import threading
+import time
+from array import array
+
+# Same formatting codes as rcon_client.strip_colors
+_COLOR_CODE = re.compile("§[0-9a-fk-orA-FK-OR]")
+
+# "There are 3 of a max of 20 players online: a, b, c" (1.13+),
+# "There are 3/20 players online:" (older and Bukkit),
+# "There are 3 out of maximum 20 players online." (Essentials)
+_LIST_HEADER = re.compile(
+    r"There are (\d+)\s*(?:of a max(?:imum)?(?: of)?|/|out of maximum)\s*(\d+) players online[:.]?",
+    re.IGNORECASE
+)
+
+# "Steve (069a79f4-44e9-4726-a5be-fca90e38aaf5)" in "list uuids"
+_UUID_SUFFIX = re.compile(r"\s*\([0-9a-fA-F-]{32,36}\)$")
+
+# Essentials "[AFK]" and similar tags in front of a name
+_NAME_TAGS = re.compile(r"^(?:\[[^\]]*\]\s*)+")
+
+
+def is_list_command(command):
+    parts = command.strip().lstrip("/").lower().split()
+    return parts in (["list"], ["list", "uuids"])
+
+
+def _clean_name(name):
+    name = _UUID_SUFFIX.sub("", _NAME_TAGS.sub("", name.strip()))
+    # Essentials marks nicknames with "~"
+    return name.lstrip("~")
+
+
+def parse_list(text):
+    """Parse the response to "list" into {players_online, players_max, players}
+
+    Returns None when the text is not a player list.  Names are listed on
+    the header line (vanilla), on the following line (older servers) or
+    per permission group as "group: a, b" (Essentials).
+    """
+    text = _COLOR_CODE.sub("", text)
+    match = _LIST_HEADER.search(text)
+    if match is None:
+        return None
+    players = []
+    for line in text[match.end():].splitlines():
+        line = line.strip()
+        if not line:
+            continue
+        group, sep, rest = line.partition(": ")
+        if sep and "," not in group:
+            line = rest
+        for name in line.split(","):
+            name = _clean_name(name)
+            if name:
+                players.append(name)
+    return {
+        "players_online": int(match.group(1)),
+        "players_max": int(match.group(2)),
+        "players": players
+    }
+
+
+class Roster:
+    """Players online on one server, with compact per-player join times"""
+
+    def __init__(self, server=None):
+        self.server = server
+        self.players_online = 0
+        self.players_max = 0
+        self.source = None
+        self.updated = None
+        # False until names are known; the first names are not joins
+        self._listed = False
+        self._lock = threading.Lock()
+        self._listeners = []
+        # name -> slot; slot -> join time and whether the join was seen
+        self._slots = {}
+        self._joined = array('d')
+        self._exact = bytearray()
+        self._free = []
+
+    def subscribe(self, listener):
+        """Call listener(diff) from the updating thread after every update"""
+        with self._lock:
+            self._listeners.append(listener)
+
+    def unsubscribe(self, listener):
+        with self._lock:
+            if listener in self._listeners:
+                self._listeners.remove(listener)
+
+    def update(self, names, players_online=None, players_max=None, source="list", now=None):
+        """Replace the player list and return the join/leave diff
+
+        The first list after the roster is created or cleared marks its
+        diff "initial": those players were already online, so their
+        session durations are lower bounds.
+        """
+        now = time.time() if now is None else now
+        with self._lock:
+            initial = not self._listed
+            self._listed = True
+            current = set(names)
+            joined = sorted((name for name in current if name not in self._slots), key=str.lower)
+            left = sorted((name for name in self._slots if name not in current), key=str.lower)
+            left_sessions = [(name, round(now - self._joined[self._slots[name]])) for name in left]
+            for name in left:
+                self._free.append(self._slots.pop(name))
+            for name in joined:
+                if self._free:
+                    slot = self._free.pop()
+                    self._joined[slot] = now
+                    self._exact[slot] = not initial
+                else:
+                    slot = len(self._joined)
+                    self._joined.append(now)
+                    self._exact.append(not initial)
+                self._slots[name] = slot
+            self.players_online = len(current) if players_online is None else players_online
+            if players_max is not None:
+                self.players_max = players_max
+            self.source = source
+            self.updated = now
+            diff = self._diff(joined, left_sessions, initial, now)
+            listeners = list(self._listeners)
+        for listener in listeners:
+            listener(diff)
+        return diff
+
+    def update_counts(self, players_online, players_max, source, now=None):
+        """Record new counts when the names are not known"""
+        now = time.time() if now is None else now
+        with self._lock:
+            self.players_online = players_online
+            self.players_max = players_max
+            self.source = source
+            self.updated = now
+            diff = self._diff([], [], False, now)
+            listeners = list(self._listeners)
+        for listener in listeners:
+            listener(diff)
+        return diff
+
+    def observe(self, command, text):
+        """Update from a command's response if it was a player list"""
+        if not is_list_command(command):
+            return None
+        parsed = parse_list(text)
+        if parsed is None:
+            return None
+        if len(parsed['players']) < parsed['players_online']:
+            # Some plugins hide names; keep the old ones
+            return self.update_counts(parsed['players_online'], parsed['players_max'], "list")
+        return self.update(parsed['players'], parsed['players_online'], parsed['players_max'], "list")
+
+    def apply_status(self, result):
+        """Update from a health check result (Query or Server List Ping)"""
+        if not result.get('online'):
+            return self.clear()
+        if 'players' in result:
+            return self.update(result['players'], result['players_online'], result['players_max'], "query")
+        sample = result.get('players_sample', [])
+        if len(sample) >= result['players_online']:
+            return self.update(sample, result['players_online'], result['players_max'], "ping")
+        return self.update_counts(result['players_online'], result['players_max'], "ping")
+
+    def clear(self, now=None):
+        """Everyone left because the server went offline
+
+        The next update is treated as the first one again.
+        """
+        diff = self.update([], 0, source="offline", now=now)
+        with self._lock:
+            self._listed = False
+        return diff
+
+    def names(self):
+        """Names of the players online, sorted"""
+        with self._lock:
+            return sorted(self._slots, key=str.lower)
+
+    def session_seconds(self, name, now=None):
+        now = time.time() if now is None else now
+        with self._lock:
+            slot = self._slots.get(name)
+            return None if slot is None else now - self._joined[slot]
+
+    def snapshot(self, now=None):
+        """The whole roster, sorted by name, for a full redraw"""
+        now = time.time() if now is None else now
+        with self._lock:
+            names = sorted(self._slots, key=str.lower)
+            diff = self._diff(names, [], True, now)
+            diff['initial'] = True
+            return diff
+
+    def _diff(self, joined, left_sessions, initial, now):
+        return {
+            "server": self.server,
+            "joined": [self._entry(name) for name in joined],
+            "left": [{"name": name, "seconds": seconds} for name, seconds in left_sessions],
+            "initial": initial,
+            "players_online": self.players_online,
+            "players_max": self.players_max,
+            "source": self.source,
+            "updated": self.updated,
+            "time": now
+        }
+
+    def _entry(self, name):
+        slot = self._slots[name]
+        return {"name": name, "since": self._joined[slot], "exact": bool(self._exact[slot])}
+
+    def __len__(self):
+        return len(self._slots)
+
+
+def format_duration(seconds):
+    """Compact session length: "45s", "12m", "3h 05m", "2d 4h" """
+    seconds = max(0, int(seconds))
+    if seconds < 60:
+        return f"{seconds}s"
+    minutes = seconds // 60
+    if minutes < 60:
+        return f"{minutes}m"
+    hours, minutes = divmod(minutes, 60)
+    if hours < 24:
+        return f"{hours}h {minutes:02d}m"
+    days, hours = divmod(hours, 24)
+    return f"{days}d {hours}h"
+
+
+_rosters = {}
+_rosters_lock = threading.Lock()
+
+
+def get_roster(host, port):
+    """Return the shared roster for a server, keyed like its RCON client"""
+    key = f"{host}:{port}"
+    with _rosters_lock:
+        roster = _rosters.get(key)
+        if roster is None:
+            roster = _rosters[key] = Roster(key)
+        return roster
@@ -0,0 +1,212 @@
+"""Priority scheduling in front of each server's RCON connection
+
+Every command and every pipelined batch window takes a slot on its server
+before it touches the connection.  Slots are limited per server (one by
+default, matching the single persistent connection), and when one frees
+up it goes to the most urgent waiter:
+
+    interactive   an operator's command from the GUI or the CLI
+    scheduled     timed and background work
+    bulk          scripts, batches and other large jobs
+
+A higher class always goes first, so a "kick" typed during a 50k-command
+script waits for at most the window in flight.  Within a class, slots go
+round-robin between the threads asking for them, so two bulk jobs on one
+server progress side by side instead of one after the other.
+
+Slots are re-entrant: a thread that already holds a slot on a server and
+asks again (a command sent from inside a streaming callback, say) nests
+inside the slot it has instead of waiting behind itself.
+
+The class comes from the calling thread's context:
+
+    with priority(BULK):
+        client.batch(commands)
+"""
+import threading
+import time
+from collections import OrderedDict, deque
+from contextlib import contextmanager
+
+INTERACTIVE = 0
+SCHEDULED = 1
+BULK = 2
+
+PRIORITY_NAMES = ("interactive", "scheduled", "bulk")
+
+DEFAULT_SERVER_LIMIT = 1
+
+_context = threading.local()
+
+
+def priority_level(value):
+    """Accept a class number or name ("interactive", "scheduled", "bulk")"""
+    if isinstance(value, str):
+        try:
+            return PRIORITY_NAMES.index(value.lower())
+        except ValueError:
+            raise ValueError(f"Unknown priority: {value}")
+    if value not in (INTERACTIVE, SCHEDULED, BULK):
+        raise ValueError(f"Unknown priority: {value}")
+    return value
+
+
+@contextmanager
+def priority(value):
+    """Run the enclosed commands on this thread in a priority class"""
+    previous = getattr(_context, 'level', None)
+    _context.level = priority_level(value)
+    try:
+        yield
+    finally:
+        _context.level = previous
+
+
+def current_priority():
+    """The calling thread's priority class; interactive by default"""
+    level = getattr(_context, 'level', None)
+    return INTERACTIVE if level is None else level
+
+
+class _Waiter:
+    __slots__ = ("event", "level", "owner")
+
+    def __init__(self, level, owner):
+        self.event = threading.Event()
+        self.level = level
+        self.owner = owner
+
+
+class _ServerQueue:
+    """Slots in use and waiters by class, each class round-robin by owner"""
+
+    def __init__(self, limit):
+        self.limit = limit
+        self.active = 0
+        # One OrderedDict per class: owner -> deque of waiters; the first
+        # owner is served next and then moves to the back
+        self.classes = [OrderedDict() for _ in PRIORITY_NAMES]
+        self.granted = [0] * len(PRIORITY_NAMES)
+        # Thread ident -> nesting depth for threads holding a slot
+        self.holders = {}
+
+    def waiting(self):
+        return [sum(len(waiters) for waiters in owners.values()) for owners in self.classes]
+
+    def add(self, waiter):
+        owners = self.classes[waiter.level]
+        if waiter.owner not in owners:
+            owners[waiter.owner] = deque()
+        owners[waiter.owner].append(waiter)
+
+    def pop_next(self):
+        for owners in self.classes:
+            if owners:
+                owner, waiters = next(iter(owners.items()))
+                waiter = waiters.popleft()
+                del owners[owner]
+                if waiters:
+                    owners[owner] = waiters
+                return waiter
+        return None
+
+
+class Scheduler:
+    """Per-server slots handed out by priority class, round-robin within one"""
+
+    def __init__(self, server_limit=DEFAULT_SERVER_LIMIT):
+        self.server_limit = server_limit
+        self._lock = threading.Lock()
+        self._servers = {}
+
+    def set_limit(self, server, limit):
+        """Allow up to limit concurrent slots on a server"""
+        with self._lock:
+            queue = self._queue(server)
+            queue.limit = max(1, int(limit))
+            # A raised limit can admit waiters straight away
+            while queue.active < queue.limit:
+                waiter = queue.pop_next()
+                if waiter is None:
+                    break
+                self._grant(queue, waiter)
+
+    def acquire(self, server, level=None):
+        """Block until a slot on server is free; returns the seconds waited"""
+        level = current_priority() if level is None else priority_level(level)
+        owner = threading.get_ident()
+        started = time.perf_counter()
+        with self._lock:
+            queue = self._queue(server)
+            if owner in queue.holders:
+                queue.holders[owner] += 1
+                return 0.0
+            if queue.active < queue.limit and not any(queue.classes):
+                queue.active += 1
+                queue.granted[level] += 1
+                queue.holders[owner] = 1
+                return 0.0
+            waiter = _Waiter(level, owner)
+            queue.add(waiter)
+        waiter.event.wait()
+        return time.perf_counter() - started
+
+    def release(self, server):
+        """Give back the calling thread's slot on server"""
+        owner = threading.get_ident()
+        with self._lock:
+            queue = self._servers[server]
+            depth = queue.holders.get(owner)
+            if depth is None:
+                raise RuntimeError(f"Releasing a slot on {server} this thread does not hold")
+            if depth > 1:
+                queue.holders[owner] = depth - 1
+                return
+            del queue.holders[owner]
+            queue.active -= 1
+            waiter = queue.pop_next()
+            if waiter is not None:
+                self._grant(queue, waiter)
+
+    @contextmanager
+    def slot(self, server, level=None):
+        """Hold a slot on server for the enclosed block; yields the seconds waited"""
+        waited = self.acquire(server, level)
+        try:
+            yield waited
+        finally:
+            self.release(server)
+
+    def snapshot(self):
+        """Per-server slots in use, waiters and grants by class"""
+        with self._lock:
+            return [
+                {
+                    "server": server,
+                    "limit": queue.limit,
+                    "active": queue.active,
+                    "waiting": dict(zip(PRIORITY_NAMES, queue.waiting())),
+                    "granted": dict(zip(PRIORITY_NAMES, queue.granted))
+                }
+                for server, queue in self._servers.items()
+            ]
+
+    def _queue(self, server):
+        queue = self._servers.get(server)
+        if queue is None:
+            queue = self._servers[server] = _ServerQueue(self.server_limit)
+        return queue
+
+    def _grant(self, queue, waiter):
+        queue.active += 1
+        queue.holders[waiter.owner] = 1
+        queue.granted[waiter.level] += 1
+        waiter.event.set()
+
+
+_scheduler = Scheduler()
+
+
+def get_scheduler():
+    """Return the process-wide scheduler shared by every client"""
+    return _scheduler
@@ -0,0 +1,332 @@
+"""Run command scripts at a controlled rate
+
+A script is a text file with one command per line:
+
+    # Reset the arena
+    @set arena = -120 64 300
+    @set team = red
+    tp @a[team=${team}] ${arena}
+    scoreboard players reset @a[team=${team}]
+
+Blank lines and lines starting with "#" are skipped.  "@set name = value"
+defines a variable for the lines after it, "${name}" substitutes one and
+"$$" is a literal "$".  Variables can also be passed in by the caller.
+
+ScriptRunner sends the commands on a background thread, pipelined in
+windows over the shared connection and paced by a token bucket.  The
+server runs every RCON command on its main thread, so the default rate
+(1000 commands/s, 50 per window) spreads a large script over many
+ticks: a 10k-line script takes about ten seconds without freezing the
+server.  Runs can be paused, resumed and aborted, and report progress,
+throughput and ETA.  Since RCON has no error status, a reply that looks
+like a command error (see ERROR_MARKERS) counts as a failure, and the
+failure policy decides whether the run continues, pauses or aborts.
+Windows go out in the bulk rcon_scheduler class, so commands typed by an
+operator meanwhile are sent between two windows.
+"""
+import re
+import threading
+import time
+
+from rcon_client import RCONError, strip_colors
+from rcon_scheduler import BULK, priority, priority_level
+
+DEFAULT_RATE = 1000.0
+MAX_BURST = 50
+
+# Windows hold about one server tick's worth of commands at the chosen rate,
+# so a fast rate sends full windows rather than many tiny ones
+WINDOW_SECONDS = 0.05
+
+FAILURE_POLICIES = ("continue", "pause", "abort")
+
+# Seconds between progress callbacks while running
+PROGRESS_INTERVAL = 0.2
+
+# Failures kept for the summary; later ones are only counted
+MAX_FAILURES_KEPT = 1000
+
+# Replies Minecraft sends for commands it rejected
+ERROR_MARKERS = (
+    "Unknown or incomplete command",
+    "Unknown command",
+    "Incorrect argument",
+    "<--[HERE]",
+    "No player was found",
+    "No entity was found",
+    "No targets matched",
+    "Invalid ",
+    "Expected "
+)
+
+# Run states
+READY = "ready"
+RUNNING = "running"
+PAUSED = "paused"
+DONE = "done"
+ABORTED = "aborted"
+
+_SET_LINE = re.compile(r"@set\s+(\w+)\s*(?:=\s*|\s)(.*)$")
+_VARIABLE = re.compile(r"\$\$|\$\{(\w+)\}")
+
+
+class ScriptError(ValueError):
+    """A script line could not be parsed"""
+
+    def __init__(self, line, message):
+        super().__init__(f"Line {line}: {message}")
+        self.line = line
+
+
+def parse_variables(text):
+    """Parse "name=value, name2=value2" (or one per line) into a dict"""
+    variables = {}
+    for part in re.split(r"[,\n]", text or ""):
+        if not part.strip():
+            continue
+        name, sep, value = part.partition("=")
+        name = name.strip()
+        if not sep or not re.fullmatch(r"\w+", name):
+            raise ValueError(f"Invalid variable: {part.strip()}")
+        variables[name] = value.strip()
+    return variables
+
+
+def parse_script(text, variables=None):
+    """Return [(line number, command)] with variables substituted
+
+    Raises ScriptError for malformed @set lines and undefined variables.
+    """
+    variables = dict(variables or {})
+    commands = []
+
+    for number, line in enumerate(text.splitlines(), 1):
+        line = line.strip()
+        if not line or line.startswith("#"):
+            continue
+
+        def substitute(match):
+            if match.group(0) == "$$":
+                return "$"
+            name = match.group(1)
+            if name not in variables:
+                raise ScriptError(number, f"undefined variable ${{{name}}}")
+            return variables[name]
+
+        if line.startswith("@set"):
+            match = _SET_LINE.match(line)
+            if match is None:
+                raise ScriptError(number, "expected @set name = value")
+            variables[match.group(1)] = _VARIABLE.sub(substitute, match.group(2).strip())
+            continue
+        if line.startswith("@"):
+            raise ScriptError(number, f"unknown directive {line.split()[0]}")
+        commands.append((number, _VARIABLE.sub(substitute, line)))
+    return commands
+
+
+def looks_failed(text):
+    """True when a reply reads like Minecraft rejecting the command"""
+    text = strip_colors(text)
+    return any(marker in text for marker in ERROR_MARKERS)
+
+
+class TokenBucket:
+    """Refills at rate tokens per second up to burst tokens"""
+
+    def __init__(self, rate, burst):
+        self.rate = float(rate)
+        self.burst = max(1, int(burst))
+        self.tokens = float(self.burst)
+        self._last = time.monotonic()
+
+    def take(self, wanted, minimum=1):
+        """Take up to wanted tokens once at least minimum are available
+
+        Returns (granted, wait): the number of tokens taken, or 0 and the
+        seconds until minimum tokens will be available.
+        """
+        now = time.monotonic()
+        self.tokens = min(self.burst, self.tokens + (now - self._last) * self.rate)
+        self._last = now
+        minimum = min(minimum, wanted, self.burst)
+        if self.tokens < minimum:
+            return 0, (minimum - self.tokens) / self.rate
+        granted = min(wanted, int(self.tokens))
+        self.tokens -= granted
+        return granted, 0.0
+
+
+class ScriptRunner:
+    """Background run of parsed script commands over one RCON client
+
+    on_progress(progress) is called from the runner thread a few times
+    per second and once at the end; on_failure(failure) for every failed
+    command, with its line number, command and reply.  The failure policy
+    takes effect after the window in flight has been answered.
+    """
+
+    def __init__(self, client, commands, rate=DEFAULT_RATE, burst=None,
+                 failure_policy="continue", on_progress=None, on_failure=None, level=BULK):
+        if failure_policy not in FAILURE_POLICIES:
+            raise ValueError(f"Unknown failure policy: {failure_policy}")
+        if rate <= 0:
+            raise ValueError("Rate must be positive")
+        self.client = client
+        self.commands = commands
+        if burst is None:
+            burst = min(MAX_BURST, int(rate * WINDOW_SECONDS))
+        self.bucket = TokenBucket(rate, burst)
+        self.failure_policy = failure_policy
+        self.level = priority_level(level)
+        self.on_progress = on_progress
+        self.on_failure = on_failure
+
+        self.state = READY
+        self.done = 0
+        self.failed = 0
+        self.failures = []
+        self.line = None
+        self._started = None
+        self._finished = None
+        self._paused_at = None
+        self._paused_total = 0.0
+        self._lock = threading.Lock()
+        # Set while the runner may proceed; cleared by pause()
+        self._resume = threading.Event()
+        self._resume.set()
+        self._abort = threading.Event()
+        self._thread = None
+
+    def start(self):
+        self.state = RUNNING
+        self._started = time.monotonic()
+        self._thread = threading.Thread(target=self._run, name="rcon-script", daemon=True)
+        self._thread.start()
+
+    def pause(self):
+        with self._lock:
+            if self.state == RUNNING:
+                self.state = PAUSED
+                self._paused_at = time.monotonic()
+                self._resume.clear()
+        self._report()
+
+    def resume(self):
+        with self._lock:
+            if self.state == PAUSED:
+                self.state = RUNNING
+                self._paused_total += time.monotonic() - self._paused_at
+                self._paused_at = None
+                self._resume.set()
+        self._report()
+
+    def abort(self):
+        self._abort.set()
+        self._resume.set()
+
+    def join(self, timeout=None):
+        if self._thread is not None:
+            self._thread.join(timeout)
+
+    @property
+    def finished(self):
+        return self.state in (DONE, ABORTED)
+
+    def progress(self):
+        """Counts, throughput and ETA as a dict"""
+        with self._lock:
+            total = len(self.commands)
+            elapsed = self._active_seconds()
+            rate = self.done / elapsed if elapsed > 0 else 0.0
+            remaining = total - self.done
+            return {
+                "state": self.state,
+                "total": total,
+                "done": self.done,
+                "failed": self.failed,
+                "line": self.line,
+                "elapsed_s": round(elapsed, 2),
+                "commands_per_s": round(rate, 1),
+                "eta_s": round(remaining / rate, 1) if rate > 0 and not self.finished else None,
+                "percent": round(100.0 * self.done / total, 1) if total else 100.0
+            }
+
+    def _active_seconds(self):
+        if self._started is None:
+            return 0.0
+        end = self._finished or self._paused_at or time.monotonic()
+        return end - self._started - self._paused_total
+
+    def _run(self):
+        total = len(self.commands)
+        minimum = max(1, int(self.bucket.rate * WINDOW_SECONDS))
+        last_report = 0.0
+        try:
+            with priority(self.level):
+                while self.done < total and not self._abort.is_set():
+                    self._resume.wait()
+                    if self._abort.is_set():
+                        break
+                    granted, wait = self.bucket.take(total - self.done, minimum)
+                    if not granted:
+                        self._abort.wait(wait)
+                        continue
+
+                    window = self.commands[self.done:self.done + granted]
+                    self._send(window)
+                    if time.monotonic() - last_report >= PROGRESS_INTERVAL:
+                        last_report = time.monotonic()
+                        self._report()
+        finally:
+            with self._lock:
+                if self._paused_at is not None:
+                    self._paused_total += time.monotonic() - self._paused_at
+                    self._paused_at = None
+                self.state = DONE if self.done == total else ABORTED
+                self._finished = time.monotonic()
+            self._report()
+
+    def _send(self, window):
+        if len(window) == 1:
+            try:
+                results = [(True, self.client.command(window[0][1]), 0.0)]
+            except RCONError as e:
+                results = [(False, str(e) or "Unknown error", 0.0)]
+        else:
+            results = self.client.batch([command for _, command in window])
+
+        for (number, command), (ok, text, _) in zip(window, results):
+            with self._lock:
+                self.done += 1
+                self.line = number
+            if ok and not looks_failed(text):
+                continue
+            failure = {"line": number, "command": command, "message": strip_colors(text).strip()}
+            with self._lock:
+                self.failed += 1
+                if len(self.failures) < MAX_FAILURES_KEPT:
+                    self.failures.append(failure)
+            if self.on_failure:
+                self.on_failure(failure)
+            if self.failure_policy == "abort":
+                self._abort.set()
+            elif self.failure_policy == "pause":
+                self.pause()
+
+    def _report(self):
+        if self.on_progress:
+            self.on_progress(self.progress())
+
+
+def format_progress(progress):
+    """One-line summary, e.g. "1200/10000 (12.0%) · 985 cmd/s · ETA 9s · 2 failed" """
+    text = f"{progress['done']}/{progress['total']} ({progress['percent']:.1f}%)"
+    text += f" · {progress['commands_per_s']:.0f} cmd/s"
+    if progress['eta_s'] is not None and progress['state'] == RUNNING:
+        text += f" · ETA {progress['eta_s']:.0f}s"
+    if progress['failed']:
+        text += f" · {progress['failed']} failed"
+    if progress['state'] != RUNNING:
+        text += f" · {progress['state']}"
+    return text
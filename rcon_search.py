@@ -0,0 +1,469 @@
+"""Indexed search over the session transcripts
+
+TranscriptIndex keeps an SQLite database next to the segments
+(transcripts/index.sqlite3) with one row per transcript record and an FTS5
+full-text index over each command and response.  Row IDs are the record's
+time in milliseconds times ID_SPREAD, so both tables can be read newest
+first straight from their rowid order and a page stops after its last row
+instead of sorting every match.
+
+update() is incremental: every segment remembers how many bytes of it are
+indexed, so only lines appended since the last update are read, a segment
+is read once more when it is compressed, and records of segments the
+writer has pruned are dropped.  Several processes can share the index;
+each update runs in one write transaction per segment.  search() only
+reads the index, on its own connection, so it never waits for the disk or
+for an update in progress: the GUIs keep the index current with start(),
+which updates it in the background every UPDATE_INTERVAL seconds, and the
+CLI updates it once before searching.
+
+Queries are words to match plus optional filters:
+
+    whitelist remove Steve                 every word, in command or response
+    "whitelist remove Steve"               the exact phrase
+    command:whitelist                      a word in the command only
+    whitel*                                a word prefix
+    server:survival                        servers whose address contains it
+    is:error  is:ok                        failed or successful commands
+    on:yesterday  on:2026-10-16            one local day
+    since:2h  since:today  until:2026-10-01
+
+Results come newest first, a page at a time.  Each page carries a cursor
+(the last row ID) for the next, so paging stays cheap however deep it
+goes, and a query takes milliseconds even over months of records.
+"""
+import datetime
+import gzip
+import json
+import os
+import re
+import sqlite3
+import threading
+import time
+
+from rcon_transcript import DEFAULT_TRANSCRIPT_DIR, get_transcript, list_segments
+
+INDEX_NAME = "index.sqlite3"
+
+PAGE_SIZE = 50
+MAX_PAGE_SIZE = 1000
+
+# Seconds between background updates after start()
+UPDATE_INTERVAL = 5.0
+
+# Row IDs per millisecond; records in the same millisecond take the next free
+# one.  IDs stay below 2**53, so the WebView page keeps cursors exact.
+ID_SPREAD = 1000
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS segments (
+    id INTEGER PRIMARY KEY,
+    name TEXT UNIQUE NOT NULL,
+    offset INTEGER NOT NULL DEFAULT 0,
+    done INTEGER NOT NULL DEFAULT 0
+);
+CREATE TABLE IF NOT EXISTS entries (
+    id INTEGER PRIMARY KEY,
+    segment INTEGER NOT NULL,
+    server TEXT NOT NULL,
+    ok INTEGER NOT NULL,
+    ms REAL
+);
+CREATE INDEX IF NOT EXISTS entries_segment ON entries (segment);
+CREATE VIRTUAL TABLE IF NOT EXISTS entries_text USING fts5 (command, response);
+"""
+
+# One query term: filter:value, "a phrase" or a word
+_TERM = re.compile(r'(\w+):("[^"]*"?|\S+)|"([^"]*)"?|(\S+)')
+_RELATIVE = re.compile(r"^(\d+)([smhdw])$")
+_UNITS = {"s": 1, "m": 60, "h": 3600, "d": 86400, "w": 604800}
+
+
+class SearchError(Exception):
+    """Raised for a query that cannot be understood or an unusable index"""
+
+
+def _parse_day(value, now):
+    today = datetime.date.fromtimestamp(now)
+    if value == "today":
+        return today
+    if value == "yesterday":
+        return today - datetime.timedelta(days=1)
+    return datetime.date.fromisoformat(value)
+
+
+def _day_start(day):
+    return time.mktime(day.timetuple())
+
+
+def _parse_time(value, now):
+    """Seconds since the epoch for "2h", "today", "2026-10-16" or "2026-10-16T14:30" """
+    value = value.lower()
+    match = _RELATIVE.match(value)
+    if match:
+        return now - int(match.group(1)) * _UNITS[match.group(2)]
+    try:
+        return _day_start(_parse_day(value, now))
+    except ValueError:
+        pass
+    try:
+        return datetime.datetime.fromisoformat(value.upper()).timestamp()
+    except ValueError:
+        raise SearchError(f"Unrecognized time: {value} (try 2h, 3d, today, yesterday or 2026-10-16)")
+
+
+def parse_query(text, now=None):
+    """Split a query into FTS terms and filters
+
+    Returns {"terms": [(column or None, phrase, prefix)], "server", "ok",
+    "since", "until"}.
+    """
+    now = time.time() if now is None else now
+    query = {"terms": [], "server": None, "ok": None, "since": None, "until": None}
+    for match in _TERM.finditer(text):
+        key, value, phrase, word = match.groups()
+        key = key.lower() if key else None
+        if key is not None:
+            value = value.strip('"')
+        if key == "server":
+            query['server'] = value
+        elif key == "is":
+            if value.lower() in ("error", "failed"):
+                query['ok'] = False
+            elif value.lower() in ("ok", "success"):
+                query['ok'] = True
+            else:
+                raise SearchError(f"Unknown is:{value} (use is:error or is:ok)")
+        elif key == "since":
+            query['since'] = _parse_time(value, now)
+        elif key == "until":
+            query['until'] = _parse_time(value, now)
+        elif key == "on":
+            try:
+                day = _parse_day(value.lower(), now)
+            except ValueError:
+                raise SearchError(f"Unrecognized day: {value} (try today, yesterday or 2026-10-16)")
+            query['since'] = _day_start(day)
+            query['until'] = _day_start(day + datetime.timedelta(days=1))
+        elif key == "command":
+            query['terms'].append(("command", value.rstrip("*"), value.endswith("*")))
+        elif phrase is not None:
+            query['terms'].append((None, phrase, False))
+        else:
+            # Includes unknown "key:value" words such as minecraft:stone
+            word = word if word is not None else match.group(0)
+            query['terms'].append((None, word.rstrip("*"), word.endswith("*")))
+    return query
+
+
+def _match_expression(terms):
+    """FTS5 MATCH expression for the terms, every one required"""
+    parts = []
+    for column, phrase, prefix in terms:
+        # Punctuation is not indexed, so a term of nothing else matches anything
+        if not re.search(r"\w", phrase):
+            continue
+        part = '"' + phrase.replace('"', '""') + '"' + (" *" if prefix else "")
+        parts.append(f"{column} : {part}" if column else part)
+    return " AND ".join(parts)
+
+
+def format_record(record):
+    """One-line summary of a search result for the Tk GUI and the CLI"""
+    when = time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(record['time']))
+    status = "✓" if record['ok'] else "✗"
+    latency = f"{record['ms']:.1f} ms" if record['ms'] is not None else "-"
+    response = " ".join(record['response'].split())
+    return f"{when}  {record['server']}  {status} {latency:>9}  {record['command']}  →  {response}"
+
+
+class TranscriptIndex:
+    """Full-text index over the transcript segments in one directory"""
+
+    def __init__(self, directory=DEFAULT_TRANSCRIPT_DIR, path=None, transcript=None):
+        self.directory = directory
+        self.path = path or os.path.join(directory, INDEX_NAME)
+        # Flushed before each update so the newest records are searchable
+        self.transcript = transcript
+        # Updates write on one connection and searches read on another
+        self._lock = threading.Lock()
+        self._db = None
+        self._read_lock = threading.Lock()
+        self._reader = None
+        # Guards the two below without waiting for an update in progress
+        self._state_lock = threading.Lock()
+        self._updating = False
+        self._updater = None
+
+    def _open(self):
+        os.makedirs(self.directory, exist_ok=True)
+        db = sqlite3.connect(self.path, timeout=10.0, check_same_thread=False, isolation_level=None)
+        try:
+            db.execute("PRAGMA journal_mode=WAL")
+            db.executescript(_SCHEMA)
+        except sqlite3.Error as e:
+            db.close()
+            raise SearchError(f"Cannot open the transcript index: {e}")
+        return db
+
+    def _connect(self):
+        if self._db is None:
+            self._db = self._open()
+        return self._db
+
+    def _connect_reader(self):
+        if self._reader is None:
+            self._reader = self._open()
+        return self._reader
+
+    def start(self, interval=UPDATE_INTERVAL):
+        """Update the index now and then every interval seconds on a background thread"""
+        with self._state_lock:
+            if self._updater is not None:
+                return
+            self._updater = threading.Thread(target=self._update_periodically, args=(interval,),
+                                             name="rcon-search", daemon=True)
+            self._updater.start()
+
+    def _update_periodically(self, interval):
+        while True:
+            try:
+                self.update()
+            except SearchError:
+                # Reported by the next search
+                pass
+            time.sleep(interval)
+
+    def update(self):
+        """Index what was appended to the transcripts since the last update
+
+        Returns the number of records added.
+        """
+        if self.transcript is not None:
+            self.transcript.flush()
+        files = {}
+        for path in list_segments(self.directory):
+            name = os.path.basename(path)
+            name = name[:-3] if name.endswith(".gz") else name
+            # The compressed copy wins: the plain file is about to go
+            if path.endswith(".gz") or name not in files:
+                files[name] = path
+
+        with self._lock:
+            db = self._connect()
+            try:
+                known = {name: (segment_id, offset, done) for segment_id, name, offset, done
+                         in db.execute("SELECT id, name, offset, done FROM segments")}
+                for name, (segment_id, _, _) in known.items():
+                    if name not in files:
+                        self._drop_segment(db, segment_id)
+                added = 0
+                for name, path in files.items():
+                    state = known.get(name)
+                    if state is not None and (state[2] or (not path.endswith(".gz") and _size(path) <= state[1])):
+                        continue
+                    added += self._index_segment(db, name, path)
+                return added
+            except sqlite3.Error as e:
+                raise SearchError(f"Transcript index error: {e}")
+
+    def update_async(self):
+        """Update on a background thread, so the first search is quick"""
+        with self._state_lock:
+            if self._updating:
+                return
+            self._updating = True
+        threading.Thread(target=self._update_in_background, name="rcon-search", daemon=True).start()
+
+    def _update_in_background(self):
+        try:
+            self.update()
+        except SearchError:
+            # Reported by the next search
+            pass
+        finally:
+            with self._state_lock:
+                self._updating = False
+
+    def _drop_segment(self, db, segment_id):
+        db.execute("BEGIN IMMEDIATE")
+        try:
+            db.execute("DELETE FROM entries_text WHERE rowid IN (SELECT id FROM entries WHERE segment = ?)",
+                       (segment_id,))
+            db.execute("DELETE FROM entries WHERE segment = ?", (segment_id,))
+            db.execute("DELETE FROM segments WHERE id = ?", (segment_id,))
+            db.execute("COMMIT")
+        except BaseException:
+            db.execute("ROLLBACK")
+            raise
+
+    def _index_segment(self, db, name, path):
+        compressed = path.endswith(".gz")
+        db.execute("BEGIN IMMEDIATE")
+        try:
+            # Another process may have got here first
+            row = db.execute("SELECT id, offset, done FROM segments WHERE name = ?", (name,)).fetchone()
+            if row is None:
+                segment_id, offset = db.execute("INSERT INTO segments (name) VALUES (?)", (name,)).lastrowid, 0
+            elif row[2]:
+                db.execute("COMMIT")
+                return 0
+            else:
+                segment_id, offset, _ = row
+            records = []
+            try:
+                with (gzip.open if compressed else open)(path, 'rb') as f:
+                    # Seeking a gzip file decompresses up to the offset
+                    f.seek(offset)
+                    for line in f:
+                        if not line.endswith(b"\n"):
+                            # Still being written
+                            break
+                        offset += len(line)
+                        try:
+                            record = json.loads(line)
+                            records.append((_time_id(record['time']), str(record['server']),
+                                            int(bool(record['ok'])), record.get('ms'),
+                                            str(record['command']), str(record['response'])))
+                        except (ValueError, KeyError, TypeError):
+                            continue
+            except (OSError, EOFError):
+                # Vanished or truncated mid-read: keep what was read
+                compressed = False
+
+            entries = []
+            texts = []
+            if records:
+                # Other segments may hold records from the same milliseconds
+                low = min(record[0] for record in records)
+                high = max(record[0] for record in records) + ID_SPREAD + len(records)
+                taken = {row[0] for row in db.execute("SELECT id FROM entries WHERE id BETWEEN ? AND ?",
+                                                      (low, high))}
+                for row_id, server, ok, ms, command, response in records:
+                    while row_id in taken:
+                        row_id += 1
+                    taken.add(row_id)
+                    entries.append((row_id, segment_id, server, ok, ms))
+                    texts.append((row_id, command, response))
+            db.executemany("INSERT INTO entries (id, segment, server, ok, ms) VALUES (?, ?, ?, ?, ?)", entries)
+            db.executemany("INSERT INTO entries_text (rowid, command, response) VALUES (?, ?, ?)", texts)
+            db.execute("UPDATE segments SET offset = ?, done = ? WHERE id = ?", (offset, int(compressed), segment_id))
+            db.execute("COMMIT")
+            return len(entries)
+        except BaseException:
+            db.execute("ROLLBACK")
+            raise
+
+    def search(self, query, cursor=None, limit=PAGE_SIZE, update=False):
+        """Return one page of records matching a query, newest first
+
+        Returns {"success", "message", "results", "cursor", "elapsed_ms"};
+        pass cursor back for the next page, None when there is no more.
+        Only what is already indexed is searched unless update is True.
+        Raises SearchError for a malformed query or an unusable index.
+        """
+        started = time.perf_counter()
+        query = parse_query(query) if isinstance(query, str) else query
+        limit = max(1, min(int(limit), MAX_PAGE_SIZE))
+        if update:
+            self.update()
+
+        clauses = []
+        params = []
+        match = _match_expression(query['terms'])
+        # With words, FTS5 walks its matches newest first; without, the entries do
+        key = "t.rowid" if match else "e.id"
+        if match:
+            clauses.append("entries_text MATCH ?")
+            params.append(match)
+        if query['server']:
+            clauses.append("e.server LIKE ? ESCAPE '\\'")
+            params.append("%" + re.sub(r"([%_\\])", r"\\\1", query['server']) + "%")
+        if query['ok'] is not None:
+            clauses.append("e.ok = ?")
+            params.append(int(query['ok']))
+        if query['since'] is not None:
+            clauses.append(f"{key} >= ?")
+            params.append(_time_id(query['since']))
+        if query['until'] is not None:
+            clauses.append(f"{key} < ?")
+            params.append(_time_id(query['until']))
+        if cursor:
+            clauses.append(f"{key} < ?")
+            params.append(int(cursor))
+        tables = ("entries_text t CROSS JOIN entries e ON e.id = t.rowid" if match
+                  else "entries e CROSS JOIN entries_text t ON t.rowid = e.id")
+        sql = (f"SELECT e.id, e.server, e.ok, e.ms, t.command, t.response FROM {tables}"
+               f"{' WHERE ' + ' AND '.join(clauses) if clauses else ''}"
+               f" ORDER BY {key} DESC LIMIT ?")
+        params.append(limit + 1)
+
+        with self._read_lock:
+            try:
+                rows = self._connect_reader().execute(sql, params).fetchall()
+            except sqlite3.Error as e:
+                raise SearchError(f"Transcript search failed: {e}")
+        more = len(rows) > limit
+        rows = rows[:limit]
+        results = [{"id": row[0], "time": row[0] // ID_SPREAD / 1000, "server": row[1], "ok": bool(row[2]),
+                    "ms": row[3], "command": row[4], "response": row[5]} for row in rows]
+        return {
+            "success": True,
+            "message": f"{len(results)}{'+' if more else ''} results",
+            "results": results,
+            "cursor": rows[-1][0] if more else None,
+            "elapsed_ms": round((time.perf_counter() - started) * 1000, 2)
+        }
+
+    def iter_results(self, query, limit=None, page_size=PAGE_SIZE, update=False):
+        """Yield matching records page by page, newest first
+
+        With update=True the index is brought up to date first.
+        """
+        query = parse_query(query) if isinstance(query, str) else query
+        cursor = None
+        count = 0
+        while True:
+            page = self.search(query, cursor, page_size if limit is None else min(page_size, limit - count),
+                               update=update)
+            update = False
+            for record in page['results']:
+                yield record
+            count += len(page['results'])
+            cursor = page['cursor']
+            if cursor is None or (limit is not None and count >= limit):
+                return
+
+    def close(self):
+        with self._lock:
+            if self._db is not None:
+                self._db.close()
+                self._db = None
+        with self._read_lock:
+            if self._reader is not None:
+                self._reader.close()
+                self._reader = None
+
+
+def _time_id(seconds):
+    return int(round(float(seconds) * 1000)) * ID_SPREAD
+
+
+def _size(path):
+    try:
+        return os.path.getsize(path)
+    except OSError:
+        return 0
+
+
+_index = None
+_index_lock = threading.Lock()
+
+
+def get_index():
+    """Return the shared index over the default transcript directory"""
+    global _index
+    with _index_lock:
+        if _index is None:
+            _index = TranscriptIndex(transcript=get_transcript())
+        return _index
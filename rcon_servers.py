@@ -0,0 +1,131 @@
+"""Multi-server profiles and concurrent command fan-out
+
+config.json keeps its original single-server keys, which describe the
+primary server.  A network of servers can be listed under "servers":
+
+    {
+        "server_ip": "localhost",
+        "port": "25575",
+        "password": "secret",
+        "servers": [
+            {"name": "lobby", "server_ip": "10.0.0.2", "port": "25575", "password": "a"},
+            {"name": "survival", "server_ip": "10.0.0.3", "port": "25575", "password": "b"}
+        ]
+    }
+
+fan_out() sends one command to every server over a bounded worker pool
+and collects results as they complete, so the total latency tracks the
+slowest server rather than the sum of all of them.  Each server's command
+runs in the caller's rcon_scheduler priority class.
+"""
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+from rcon_client import RCONError, get_client, strip_colors
+from rcon_scheduler import INTERACTIVE, current_priority, priority
+
+# Upper bound on servers contacted at the same time
+MAX_WORKERS = 8
+
+_executor = None
+_executor_lock = threading.Lock()
+
+
+def load_servers(config_data):
+    """Return the server profiles described by a config dict"""
+    servers = []
+    if config_data.get('server_ip'):
+        servers.append({
+            "name": config_data.get('name') or "primary",
+            "server_ip": config_data.get('server_ip', ''),
+            "port": str(config_data.get('port', '')),
+            "password": config_data.get('password', '')
+        })
+
+    for entry in config_data.get('servers') or []:
+        if not isinstance(entry, dict) or not entry.get('server_ip'):
+            continue
+        address = f"{entry['server_ip']}:{entry.get('port', '')}"
+        servers.append({
+            "name": entry.get('name') or address,
+            "server_ip": entry['server_ip'],
+            "port": str(entry.get('port', '')),
+            "password": entry.get('password', '')
+        })
+
+    # The primary server is often listed again under "servers"
+    unique = []
+    seen = set()
+    for server in servers:
+        key = (server['server_ip'], server['port'])
+        if key not in seen:
+            seen.add(key)
+            unique.append(server)
+    return unique
+
+
+def _get_executor():
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(max_workers=MAX_WORKERS, thread_name_prefix="rcon-fanout")
+        return _executor
+
+
+def _run_on_server(server, command, level=INTERACTIVE):
+    started = time.perf_counter()
+    cached = False
+    try:
+        client = get_client(server['server_ip'], server['port'], server['password'])
+        response = client.cached_response(command)
+        cached = response is not None
+        if not cached:
+            with priority(level):
+                response = client.command(command)
+        response = strip_colors(response).strip()
+        success = True
+        message = response if response else "Command executed"
+    except RCONError as e:
+        success = False
+        message = str(e) or "Unknown error"
+    except Exception as e:
+        success = False
+        message = f"Error: {str(e)}"
+    return {
+        "server": server['name'],
+        "address": f"{server['server_ip']}:{server['port']}",
+        "success": success,
+        "message": message,
+        "latency_ms": round((time.perf_counter() - started) * 1000, 2),
+        "cached": cached
+    }
+
+
+def fan_out(servers, command, on_result=None):
+    """Send a command to every server concurrently
+
+    on_result, if given, is called with each server's result as soon as it
+    completes.  Returns the aggregated result with per-server success and
+    latency, in completion order.
+    """
+    started = time.perf_counter()
+    executor = _get_executor()
+    level = current_priority()
+    futures = [executor.submit(_run_on_server, server, command, level) for server in servers]
+
+    results = []
+    for future in as_completed(futures):
+        result = future.result()
+        results.append(result)
+        if on_result:
+            on_result(result)
+
+    succeeded = sum(1 for r in results if r['success'])
+    elapsed_ms = (time.perf_counter() - started) * 1000
+    return {
+        "success": bool(results) and succeeded == len(results),
+        "message": f"Fan-out finished: {succeeded}/{len(results)} servers succeeded in {elapsed_ms:.1f} ms",
+        "results": results,
+        "elapsed_ms": round(elapsed_ms, 2)
+    }
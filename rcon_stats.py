@@ -0,0 +1,176 @@
+"""Per-server, per-command latency histograms
+
+Every RCON command is timed across its phases:
+
+    queue        waiting for a slot on the server (see rcon_scheduler)
+    connect      TCP connect (only when a new connection was opened)
+    auth         login round trip (only when a new connection was opened)
+    send         writing the request to the socket
+    first_byte   from sending the request to the first response packet
+    complete     from the start of the command to its last response packet
+
+Durations go into log-bucketed histograms (eight buckets per power of two,
+so percentiles are accurate to about 9%) with a fixed number of counters,
+so memory stays constant however many commands are timed.  Commands are
+grouped by server and verb (the first word), with a cap on the number of
+groups.
+"""
+import json
+import math
+import threading
+import time
+
+PHASES = ("queue", "connect", "auth", "send", "first_byte", "complete")
+
+# Buckets per power of two; bucket i >= 1 covers up to 2 ** (i / 8) µs
+SUB_BUCKETS = 8
+
+# 1 µs up to 2 ** 28 µs (about 4.5 minutes); slower samples share the last bucket
+BUCKET_COUNT = 28 * SUB_BUCKETS + 2
+
+# Verbs beyond this many groups are counted under OTHER_VERB
+MAX_GROUPS = 512
+OTHER_VERB = "(other)"
+
+PERCENTILES = (50, 95, 99)
+
+
+class LatencyHistogram:
+    """Constant-memory histogram of durations"""
+    __slots__ = ("counts", "count", "total", "min", "max")
+
+    def __init__(self):
+        self.counts = [0] * BUCKET_COUNT
+        self.count = 0
+        self.total = 0.0
+        self.min = None
+        self.max = 0.0
+
+    def record(self, seconds):
+        micros = seconds * 1e6
+        if micros < 1:
+            index = 0
+        else:
+            index = min(BUCKET_COUNT - 1, math.ceil(math.log2(micros) * SUB_BUCKETS) + 1)
+        self.counts[index] += 1
+        self.count += 1
+        self.total += seconds
+        self.max = max(self.max, seconds)
+        self.min = seconds if self.min is None else min(self.min, seconds)
+
+    def percentile(self, percent):
+        """Return the given percentile in seconds (bucket upper bound)"""
+        if not self.count:
+            return 0.0
+        rank = max(1, math.ceil(self.count * percent / 100))
+        seen = 0
+        for index, count in enumerate(self.counts):
+            seen += count
+            if seen >= rank:
+                upper = 2 ** ((index - 1) / SUB_BUCKETS) / 1e6 if index else 1e-6
+                # The true value never exceeds the largest sample
+                return min(upper, self.max)
+        return self.max
+
+    def summary(self):
+        """Return count, mean, min, max and percentiles in milliseconds"""
+        result = {
+            "count": self.count,
+            "mean_ms": round(self.total / self.count * 1000, 3) if self.count else 0.0,
+            "min_ms": round((self.min or 0.0) * 1000, 3),
+            "max_ms": round(self.max * 1000, 3)
+        }
+        for percent in PERCENTILES:
+            result[f"p{percent}_ms"] = round(self.percentile(percent) * 1000, 3)
+        return result
+
+
+def command_verb(command):
+    """Return the verb used to group a command, e.g. "whitelist" """
+    parts = command.strip().lstrip("/").split(None, 1)
+    return parts[0].lower() if parts else ""
+
+
+class LatencyStats:
+    """Thread-safe collection of latency histograms keyed by server and verb"""
+
+    def __init__(self, max_groups=MAX_GROUPS):
+        self.max_groups = max_groups
+        self._lock = threading.Lock()
+        self._groups = {}
+        self._errors = {}
+        self._coalesced = {}
+        self.started = time.time()
+
+    def record(self, server, command, phases):
+        """Record one command; phases maps phase name to seconds"""
+        with self._lock:
+            group = self._group(server, command)
+            for phase, seconds in phases.items():
+                histogram = group.get(phase)
+                if histogram is None:
+                    histogram = group[phase] = LatencyHistogram()
+                histogram.record(seconds)
+
+    def record_error(self, server, command):
+        with self._lock:
+            key = (server, self._verb(server, command))
+            self._groups.setdefault(key, {})
+            self._errors[key] = self._errors.get(key, 0) + 1
+
+    def record_coalesced(self, server, command):
+        """Count a caller that shared an identical in-flight request"""
+        with self._lock:
+            key = (server, self._verb(server, command))
+            self._groups.setdefault(key, {})
+            self._coalesced[key] = self._coalesced.get(key, 0) + 1
+
+    def reset(self):
+        with self._lock:
+            self._groups.clear()
+            self._errors.clear()
+            self._coalesced.clear()
+            self.started = time.time()
+
+    def snapshot(self):
+        """Return a JSON-ready list of groups with per-phase summaries"""
+        with self._lock:
+            rows = []
+            for (server, verb), group in sorted(self._groups.items()):
+                rows.append({
+                    "server": server,
+                    "command": verb,
+                    "errors": self._errors.get((server, verb), 0),
+                    "coalesced": self._coalesced.get((server, verb), 0),
+                    "phases": {phase: group[phase].summary() for phase in PHASES if phase in group}
+                })
+            return rows
+
+    def to_json(self, indent=2):
+        return json.dumps({
+            "started": self.started,
+            "exported": time.time(),
+            "stats": self.snapshot()
+        }, indent=indent)
+
+    def export(self, path):
+        """Write the stats as JSON to path"""
+        with open(path, 'w') as f:
+            f.write(self.to_json())
+
+    def _verb(self, server, command):
+        verb = command_verb(command) or OTHER_VERB
+        if (server, verb) not in self._groups and len(self._groups) >= self.max_groups:
+            return OTHER_VERB
+        return verb
+
+    def _group(self, server, command):
+        return self._groups.setdefault((server, self._verb(server, command)), {})
+
+
+_stats = LatencyStats()
+
+
+def get_stats():
+    """Return the process-wide latency stats shared by every client"""
+    return _stats
@@ -0,0 +1,420 @@
+"""Session transcripts written to disk in the background
+
+Every command sent through a shared RCON client is recorded with its
+response, server, time, latency and whether it succeeded, as one JSON
+line in transcripts/:
+
+    {"time": 1760690000.123, "server": "10.0.0.2:25575", "command": "list",
+     "ok": true, "ms": 3.2, "response": "There are 2 of a max of 20 ..."}
+
+Commands answered from the response cache or by an identical command
+already in flight carry "cached": true or "coalesced": true.  Responses
+are cut to MAX_RESPONSE_CHARS, ending in "…".
+
+record() only appends to an in-memory queue, so callers (including the
+UI threads) never wait for the disk.  A writer thread drains the queue in
+batches, writes them to the current segment and fsyncs at most once per
+FSYNC_INTERVAL.  If the disk stalls and the queue fills, new records are
+counted as dropped rather than blocking anyone.
+
+Segments rotate when they reach SEGMENT_BYTES or the local date changes.
+Closed segments are gzip-compressed, which shrinks the repetitive JSON
+about tenfold, and the oldest compressed segments are deleted once the
+directory exceeds MAX_TOTAL_BYTES.  Segment names carry the process ID,
+so the GUIs and the CLI can record into the same directory.  A segment
+left uncompressed by a process that exited without closing is compressed
+by the next writer to start, once it has been idle for STALE_SECONDS;
+close() (run at exit) compresses the writer's own segment.
+
+Short-lived processes such as a CLI run from cron leave one small
+compressed segment each.  Once MERGE_COUNT of a day's compressed segments
+are smaller than MERGE_BYTES, the writer that just compressed one merges
+them: gzip members can be concatenated, so the merged file is their bytes
+back to back under a new name, and the search index picks it up like any
+other new segment.  A lock file keeps two processes from merging at once.
+"""
+import atexit
+import gzip
+import json
+import os
+import queue
+import re
+import shutil
+import threading
+import time
+
+DEFAULT_TRANSCRIPT_DIR = "transcripts"
+
+SEGMENT_BYTES = 4 * 1024 * 1024
+MAX_TOTAL_BYTES = 8 * 1024 * 1024
+FSYNC_INTERVAL = 1.0
+
+# Records waiting for the writer before new ones are dropped
+MAX_PENDING = 20000
+
+# Records written per batch
+BATCH_SIZE = 1000
+
+# Longer responses are cut to this many characters
+MAX_RESPONSE_CHARS = 16384
+
+# Uncompressed segments untouched this long belong to an exited process
+STALE_SECONDS = 3600
+
+# Compressed segments under MERGE_BYTES are merged once a day has MERGE_COUNT
+MERGE_BYTES = 512 * 1024
+MERGE_COUNT = 16
+
+# A merge lock older than this was left by a process that died mid-merge
+LOCK_STALE_SECONDS = 60
+
+_MERGE_LOCK = ".merge.lock"
+
+# transcript-<date>-<time>-<pid>-<sequence>.jsonl[.gz]
+_SEGMENT_NAME = re.compile(r"^transcript-(\d{8})-(\d{6})-(\d+)-(\d+)\.jsonl(\.gz)?$")
+
+_FLUSH = object()
+_CLOSE = object()
+
+
+def list_segments(directory=DEFAULT_TRANSCRIPT_DIR):
+    """Segment paths in the directory, oldest first"""
+    try:
+        names = os.listdir(directory)
+    except OSError:
+        return []
+    return [os.path.join(directory, name) for name in sorted(names, key=_segment_order)
+            if _SEGMENT_NAME.match(name)]
+
+
+def _segment_order(name):
+    match = _SEGMENT_NAME.match(name)
+    if not match:
+        return ("", "", 0, 0)
+    return (match.group(1), match.group(2), int(match.group(3)), int(match.group(4)))
+
+
+def read_segment(path):
+    """Yield the records of a segment, compressed or not
+
+    A line cut short by a crash is skipped.
+    """
+    opener = gzip.open if path.endswith(".gz") else open
+    with opener(path, 'rt', encoding='utf-8', errors='replace') as f:
+        for line in f:
+            try:
+                yield json.loads(line)
+            except ValueError:
+                continue
+
+
+class TranscriptWriter:
+    """Queue of transcript records drained to rotating segments by one thread"""
+
+    def __init__(self, directory=DEFAULT_TRANSCRIPT_DIR, segment_bytes=SEGMENT_BYTES,
+                 max_total_bytes=MAX_TOTAL_BYTES, fsync_interval=FSYNC_INTERVAL,
+                 merge_bytes=MERGE_BYTES, merge_count=MERGE_COUNT):
+        self.directory = directory
+        self.segment_bytes = segment_bytes
+        self.max_total_bytes = max_total_bytes
+        self.merge_bytes = merge_bytes
+        self.merge_count = merge_count
+        self.fsync_interval = fsync_interval
+        self.dropped = 0
+        self.error = None
+        self._queue = queue.Queue(MAX_PENDING)
+        self._lock = threading.Lock()
+        self._thread = None
+        self._closed = False
+        # Writer thread state
+        self._file = None
+        self._path = None
+        self._day = None
+        self._size = 0
+        self._sequence = 0
+        self._unsynced = False
+        self._synced_at = 0.0
+
+    def record(self, server, command, response, ok, seconds=None, cached=False, coalesced=False,
+               truncated=False):
+        """Queue one command's outcome; never blocks
+
+        Pass truncated when the caller already cut the response short.
+        """
+        if self._closed:
+            return
+        if truncated or len(response) > MAX_RESPONSE_CHARS:
+            response = response[:MAX_RESPONSE_CHARS] + "…"
+        entry = {
+            "time": round(time.time(), 3),
+            "server": server,
+            "command": command,
+            "ok": ok,
+            "ms": round(seconds * 1000, 2) if seconds is not None else None,
+            "response": response
+        }
+        if cached:
+            entry['cached'] = True
+        if coalesced:
+            entry['coalesced'] = True
+        self._start()
+        try:
+            self._queue.put_nowait(entry)
+        except queue.Full:
+            self.dropped += 1
+
+    def flush(self, timeout=5.0):
+        """Wait until everything queued so far is written and fsynced"""
+        if self._thread is None:
+            return True
+        done = threading.Event()
+        try:
+            self._queue.put((_FLUSH, done), timeout=timeout)
+        except queue.Full:
+            return False
+        return done.wait(timeout)
+
+    def close(self, timeout=5.0):
+        """Write what is queued, compress the segment and stop the writer thread"""
+        with self._lock:
+            if self._closed:
+                return
+            self._closed = True
+            thread = self._thread
+        if thread is not None:
+            try:
+                self._queue.put(_CLOSE, timeout=timeout)
+            except queue.Full:
+                return
+            thread.join(timeout)
+
+    def _start(self):
+        if self._thread is not None:
+            return
+        with self._lock:
+            if self._thread is not None or self._closed:
+                return
+            self._thread = threading.Thread(target=self._run, name="rcon-transcript", daemon=True)
+            self._thread.start()
+            atexit.register(self.close)
+
+    # Writer thread
+
+    def _run(self):
+        self._compress_stale()
+        while True:
+            try:
+                # Wake up in time for a pending fsync
+                timeout = max(0.0, self._synced_at + self.fsync_interval - time.monotonic()) if self._unsynced else None
+                item = self._queue.get(timeout=timeout)
+            except queue.Empty:
+                self._sync()
+                continue
+            batch = [item]
+            while len(batch) < BATCH_SIZE:
+                try:
+                    batch.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+
+            # A segment deleted under the writer would swallow the batch
+            if self._file is not None and not os.path.exists(self._path):
+                self._rotate()
+            for item in batch:
+                if item is _CLOSE:
+                    if self._file is not None:
+                        self._rotate()
+                    return
+                if isinstance(item, tuple):
+                    self._sync()
+                    item[1].set()
+                    continue
+                try:
+                    self._write(item)
+                except OSError as e:
+                    self.error = str(e)
+                    self.dropped += 1
+                    self._close_file()
+            if self._unsynced and time.monotonic() - self._synced_at >= self.fsync_interval:
+                self._sync()
+
+    def _write(self, entry):
+        day = time.strftime("%Y%m%d", time.localtime(entry['time']))
+        if self._file is not None and (day != self._day or self._size >= self.segment_bytes):
+            self._rotate()
+        if self._file is None:
+            self._open(day)
+        data = (json.dumps(entry, ensure_ascii=False) + "\n").encode("utf-8")
+        self._file.write(data)
+        self._size += len(data)
+        self._unsynced = True
+
+    def _open(self, day):
+        os.makedirs(self.directory, exist_ok=True)
+        self._path = self._segment_path(day, time.strftime('%H%M%S'))
+        self._file = open(self._path, 'ab')
+        self._day = day
+        self._size = self._file.tell()
+
+    def _sync(self):
+        if self._file is not None and self._unsynced:
+            try:
+                self._file.flush()
+                os.fsync(self._file.fileno())
+            except OSError as e:
+                self.error = str(e)
+        self._unsynced = False
+        self._synced_at = time.monotonic()
+
+    def _close_file(self):
+        if self._file is not None:
+            try:
+                self._file.close()
+            except OSError:
+                pass
+        self._file = None
+
+    def _rotate(self):
+        self._sync()
+        self._close_file()
+        path = self._path
+        if os.path.exists(path):
+            self._compress(path)
+            self._merge_small()
+        self._prune()
+
+    def _compress(self, path):
+        try:
+            with open(path, 'rb') as source, gzip.open(path + ".gz.tmp", 'wb', compresslevel=9) as target:
+                shutil.copyfileobj(source, target)
+            os.replace(path + ".gz.tmp", path + ".gz")
+            os.remove(path)
+        except OSError as e:
+            self.error = str(e)
+
+    def _segment_path(self, day, clock):
+        """A new segment path; skips names taken by an earlier process with this PID"""
+        while True:
+            name = f"transcript-{day}-{clock}-{os.getpid()}-{self._sequence}.jsonl"
+            self._sequence += 1
+            path = os.path.join(self.directory, name)
+            if not os.path.exists(path) and not os.path.exists(path + ".gz"):
+                return path
+
+    def _merge_small(self):
+        """Merge a day's small compressed segments once there are merge_count of them"""
+        days = {}
+        for path in list_segments(self.directory):
+            if not path.endswith(".gz"):
+                continue
+            try:
+                size = os.path.getsize(path)
+            except OSError:
+                continue
+            if size < self.merge_bytes:
+                day = _SEGMENT_NAME.match(os.path.basename(path)).group(1)
+                days.setdefault(day, []).append((path, size))
+        if not any(len(small) >= self.merge_count for small in days.values()):
+            return
+        lock = os.path.join(self.directory, _MERGE_LOCK)
+        if not self._acquire(lock):
+            return
+        try:
+            for small in days.values():
+                if len(small) < self.merge_count:
+                    continue
+                # Groups of consecutive segments up to merge_bytes each
+                group = []
+                total = 0
+                for path, size in small + [(None, 0)]:
+                    if path is None or (group and total + size > self.merge_bytes):
+                        if len(group) > 1:
+                            self._merge(group)
+                        group = []
+                        total = 0
+                    if path is not None:
+                        group.append(path)
+                        total += size
+        finally:
+            try:
+                os.remove(lock)
+            except OSError:
+                pass
+
+    def _acquire(self, lock):
+        try:
+            os.close(os.open(lock, os.O_CREAT | os.O_EXCL | os.O_WRONLY))
+            return True
+        except FileExistsError:
+            try:
+                if time.time() - os.path.getmtime(lock) >= LOCK_STALE_SECONDS:
+                    # Taken again at the next rotation
+                    os.remove(lock)
+            except OSError:
+                pass
+            return False
+        except OSError:
+            return False
+
+    def _merge(self, paths):
+        """Concatenate compressed segments into one named after the first"""
+        match = _SEGMENT_NAME.match(os.path.basename(paths[0]))
+        target = self._segment_path(match.group(1), match.group(2)) + ".gz"
+        try:
+            with open(target + ".tmp", 'wb') as out:
+                for path in paths:
+                    with open(path, 'rb') as source:
+                        shutil.copyfileobj(source, out)
+            os.replace(target + ".tmp", target)
+        except OSError as e:
+            self.error = str(e)
+            try:
+                os.remove(target + ".tmp")
+            except OSError:
+                pass
+            return
+        for path in paths:
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+
+    def _compress_stale(self):
+        now = time.time()
+        for path in list_segments(self.directory):
+            if path.endswith(".gz"):
+                continue
+            try:
+                if now - os.path.getmtime(path) >= STALE_SECONDS:
+                    self._compress(path)
+            except OSError:
+                continue
+        self._prune()
+
+    def _prune(self):
+        """Delete the oldest compressed segments beyond max_total_bytes"""
+        segments = []
+        for path in list_segments(self.directory):
+            try:
+                segments.append((path, os.path.getsize(path)))
+            except OSError:
+                continue
+        total = sum(size for _, size in segments)
+        for path, size in segments:
+            if total <= self.max_total_bytes:
+                break
+            if not path.endswith(".gz"):
+                continue
+            try:
+                os.remove(path)
+                total -= size
+            except OSError:
+                continue
+
+
+_transcript = TranscriptWriter()
+
+
+def get_transcript():
+    """Return the process-wide transcript shared by every client"""
+    return _transcript
@@ -0,0 +1,153 @@
+"""Watch config.json for external edits without polling on the UI thread
+
+On Linux the watcher blocks on inotify for the file's directory, which
+also catches editors that save by writing a temp file and renaming it.
+Elsewhere it falls back to a cheap stat() poll on a background thread.
+Either way a burst of save events is debounced, the file's content hash is
+compared with the last one seen, and on_change() is called once per real
+change, from the watcher thread.
+"""
+import ctypes
+import ctypes.util
+import hashlib
+import os
+import select
+import struct
+import sys
+import threading
+import time
+
+# inotify event bits
+IN_MODIFY = 0x002
+IN_CLOSE_WRITE = 0x008
+IN_MOVED_FROM = 0x040
+IN_MOVED_TO = 0x080
+IN_CREATE = 0x100
+IN_DELETE = 0x200
+_WATCH_MASK = IN_MODIFY | IN_CLOSE_WRITE | IN_MOVED_FROM | IN_MOVED_TO | IN_CREATE | IN_DELETE
+
+_EVENT_HEADER = struct.Struct("iIII")
+
+# Quiet time after the last event before the file is re-read
+DEFAULT_DEBOUNCE = 0.3
+
+# stat() interval for the polling fallback
+DEFAULT_POLL_INTERVAL = 1.0
+
+
+def _file_hash(path):
+    try:
+        with open(path, 'rb') as f:
+            return hashlib.sha256(f.read()).hexdigest()
+    except OSError:
+        return None
+
+
+def _file_signature(path):
+    try:
+        st = os.stat(path)
+        return (st.st_mtime_ns, st.st_size, st.st_ino)
+    except OSError:
+        return None
+
+
+def _open_inotify(directory):
+    """Return an inotify fd watching directory, or None if unavailable"""
+    if not sys.platform.startswith("linux"):
+        return None
+    try:
+        libc = ctypes.CDLL(ctypes.util.find_library("c") or "libc.so.6", use_errno=True)
+        fd = libc.inotify_init1(os.O_NONBLOCK | os.O_CLOEXEC)
+        if fd < 0:
+            return None
+        if libc.inotify_add_watch(fd, os.fsencode(directory), _WATCH_MASK) < 0:
+            os.close(fd)
+            return None
+        return fd
+    except (OSError, AttributeError):
+        return None
+
+
+class ConfigWatcher:
+    """Background watcher that reports content changes to one file"""
+
+    def __init__(self, path, on_change, debounce=DEFAULT_DEBOUNCE, poll_interval=DEFAULT_POLL_INTERVAL):
+        self.path = os.path.abspath(path)
+        self.on_change = on_change
+        self.debounce = debounce
+        self.poll_interval = poll_interval
+        self._last_hash = _file_hash(self.path)
+        self._stop = threading.Event()
+        self._thread = None
+
+    def start(self):
+        """Start watching on a daemon thread"""
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name="config-watcher", daemon=True)
+            self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+
+    def refresh(self):
+        """Accept the file's current content, e.g. after writing it ourselves"""
+        self._last_hash = _file_hash(self.path)
+
+    def _run(self):
+        fd = _open_inotify(os.path.dirname(self.path))
+        if fd is None:
+            self._poll()
+            return
+        try:
+            self._watch_inotify(fd)
+        finally:
+            os.close(fd)
+
+    def _watch_inotify(self, fd):
+        name = os.fsencode(os.path.basename(self.path))
+        deadline = None
+        while not self._stop.is_set():
+            # Wake periodically to notice stop(), or at the debounce deadline
+            timeout = 0.5 if deadline is None else max(0.0, deadline - time.monotonic())
+            readable, _, _ = select.select([fd], [], [], timeout)
+            if readable:
+                try:
+                    data = os.read(fd, 64 * 1024)
+                except BlockingIOError:
+                    continue
+                if name in self._event_names(data):
+                    deadline = time.monotonic() + self.debounce
+            elif deadline is not None and time.monotonic() >= deadline:
+                deadline = None
+                self._check()
+
+    def _event_names(self, data):
+        names = []
+        offset = 0
+        while offset + _EVENT_HEADER.size <= len(data):
+            _, _, _, length = _EVENT_HEADER.unpack_from(data, offset)
+            offset += _EVENT_HEADER.size
+            names.append(data[offset:offset + length].rstrip(b"\0"))
+            offset += length
+        return names
+
+    def _poll(self):
+        signature = _file_signature(self.path)
+        while not self._stop.wait(self.poll_interval):
+            current = _file_signature(self.path)
+            if current != signature:
+                signature = current
+                # Let the rest of a save burst land before reading
+                self._stop.wait(self.debounce)
+                signature = _file_signature(self.path)
+                self._check()
+
+    def _check(self):
+        current = _file_hash(self.path)
+        if current is None or current == self._last_hash:
+            return
+        self._last_hash = current
+        try:
+            self.on_change()
+        except Exception as e:
+            print(f"Error handling config change: {e}")
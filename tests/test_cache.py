@@ -0,0 +1,62 @@
+"""ResponseCache and the client's use of it, against the mock server"""
+import time
+import unittest
+
+from rcon_cache import ResponseCache
+from rcon_client import RCONClient
+from rcon_mock import MockRCONServer
+
+PASSWORD = "pw"
+SERVER = "127.0.0.1:25575"
+
+
+class ResponseCacheTest(unittest.TestCase):
+    def test_entries_expire_after_their_ttl(self):
+        cache = ResponseCache({"time query *": 0.05})
+        cache.put(SERVER, "time query daytime", "The time is 1000")
+        self.assertEqual(cache.get(SERVER, "/time  query daytime"), "The time is 1000")
+        time.sleep(0.06)
+        self.assertIsNone(cache.get(SERVER, "time query daytime"))
+
+    def test_least_recently_used_entry_is_evicted(self):
+        cache = ResponseCache(max_entries=2)
+        cache.put(SERVER, "list", "list")
+        cache.put(SERVER, "seed", "seed")
+        cache.get(SERVER, "list")
+        cache.put(SERVER, "difficulty", "difficulty")
+        self.assertIsNone(cache.get(SERVER, "seed"))
+        self.assertEqual(cache.get(SERVER, "list"), "list")
+        self.assertEqual(cache.get(SERVER, "difficulty"), "difficulty")
+
+    def test_commands_off_the_allowlist_are_not_cached(self):
+        cache = ResponseCache({"seed": 0})
+        cache.put(SERVER, "give Steve diamond", "Gave 1 [Diamond] to Steve")
+        cache.put(SERVER, "seed", "Seed: [1]")
+        self.assertEqual(len(cache), 0)
+
+    def test_mutating_command_invalidates_only_its_server(self):
+        cache = ResponseCache()
+        cache.put(SERVER, "list", "There are 0 of a max of 20 players online: ")
+        cache.put("other:25575", "list", "There are 1 of a max of 20 players online: Alex")
+        cache.note_command(SERVER, "say hi")
+        self.assertIsNotNone(cache.get(SERVER, "list"))
+        cache.note_command(SERVER, "kick Steve")
+        self.assertIsNone(cache.get(SERVER, "list"))
+        self.assertIsNotNone(cache.get("other:25575", "list"))
+
+
+class ClientCacheTest(unittest.TestCase):
+    def test_cached_read_skips_the_network_until_state_changes(self):
+        with MockRCONServer(password=PASSWORD, players=["Steve"]) as server:
+            client = RCONClient("127.0.0.1", server.port, PASSWORD, cache=ResponseCache())
+            first = client.command("list")
+            self.assertEqual(client.cached_response("list"), first)
+            client.command("kick Steve")
+            self.assertIsNone(client.cached_response("list"))
+            client.command("list")
+            client.close()
+        self.assertEqual(server.commands, ["list", "kick Steve", "list"])
+
+
+if __name__ == "__main__":
+    unittest.main()
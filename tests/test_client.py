@@ -0,0 +1,122 @@
+"""RCONClient against the mock server
+
+Run from the repository root with "python -m unittest discover tests" or
+"python -m pytest".
+"""
+import socket
+import struct
+import threading
+import unittest
+
+from rcon_cache import ResponseCache
+from rcon_client import RCONClient, RCONError, iter_lines
+from rcon_mock import MockRCONServer
+
+PASSWORD = "pw"
+
+
+class BatchDropTest(unittest.TestCase):
+    def test_drop_mid_window_keeps_answered_empty_replies(self):
+        # "say" has an empty reply: answered commands must not be resent
+        with MockRCONServer(password=PASSWORD, responses={"say": ""}, drop_after=2) as server:
+            client = RCONClient("127.0.0.1", server.port, PASSWORD)
+            client.connect()
+            results = client.batch([f"say {i}" for i in range(5)])
+            client.close()
+
+        self.assertEqual(server.commands, ["say 0", "say 1"])
+        self.assertEqual([ok for ok, _, _ in results], [True, True, False, False, False])
+        self.assertEqual(results[0][1], "")
+        self.assertTrue(all(text.startswith("Connection error") for _, text, _ in results[2:]))
+
+    def test_window_dropped_after_sending_is_not_resent(self):
+        with MockRCONServer(password=PASSWORD, drop_after=0) as server:
+            client = RCONClient("127.0.0.1", server.port, PASSWORD)
+            client.connect()
+            # The server may have run commands it received, so a window
+            # lost after sending fails instead of running twice
+            results = client.batch(["say a", "say b"])
+            client.close()
+
+        self.assertEqual(server.commands, [])
+        self.assertEqual([ok for ok, _, _ in results], [False, False])
+
+    def test_full_batch(self):
+        with MockRCONServer(password=PASSWORD) as server:
+            client = RCONClient("127.0.0.1", server.port, PASSWORD)
+            results = client.batch([f"say {i}" for i in range(10)], window=4)
+            client.close()
+
+        self.assertEqual(server.commands, [f"say {i}" for i in range(10)])
+        self.assertTrue(all(ok for ok, _, _ in results))
+
+
+class RetryTest(unittest.TestCase):
+    def test_mutating_command_lost_after_sending_is_not_resent(self):
+        with MockRCONServer(password=PASSWORD, drop_after=1) as server:
+            client = RCONClient("127.0.0.1", server.port, PASSWORD)
+            client.command("say a")
+            with self.assertRaises(RCONError):
+                client.command("give Steve diamond")
+            client.close()
+        self.assertEqual(server.commands, ["say a"])
+
+    def test_read_only_command_lost_after_sending_is_retried(self):
+        with MockRCONServer(password=PASSWORD, drop_after=1) as server:
+            client = RCONClient("127.0.0.1", server.port, PASSWORD, cache=ResponseCache())
+            client.command("say a")
+            client.command("seed")
+            client.close()
+        self.assertEqual(server.commands, ["say a", "seed"])
+
+    def test_idle_socket_closed_by_the_server_is_replaced_before_sending(self):
+        with MockRCONServer(password=PASSWORD) as server:
+            client = RCONClient("127.0.0.1", server.port, PASSWORD)
+            client.command("say a")
+            # As if the server had timed the idle connection out
+            client._sock.shutdown(socket.SHUT_RD)
+            client.command("give Steve diamond")
+            client.close()
+        self.assertEqual(server.commands, ["say a", "give Steve diamond"])
+
+
+class OversizedPacketTest(unittest.TestCase):
+    def test_length_beyond_any_fragment_is_rejected(self):
+        listener = socket.socket()
+        listener.bind(("127.0.0.1", 0))
+        listener.listen(1)
+
+        def serve():
+            with listener:
+                conn, _ = listener.accept()
+                with conn:
+                    request_id = struct.unpack("<iii", conn.recv(4096)[:12])[1]
+                    conn.sendall(struct.pack("<iii", 10, request_id, 2) + b"\0\0")
+                    conn.recv(4096)
+                    # Claims a 1 GiB packet
+                    conn.sendall(struct.pack("<i", 1 << 30))
+                    conn.recv(4096)
+
+        threading.Thread(target=serve, daemon=True).start()
+        client = RCONClient("127.0.0.1", listener.getsockname()[1], PASSWORD)
+        with self.assertRaises(RCONError) as raised:
+            client.command("list")
+        self.assertIn("Malformed", str(raised.exception))
+        client.close()
+
+
+class IterLinesTest(unittest.TestCase):
+    def test_lines_span_packets(self):
+        chunks = ["§aThere are 2", " players\r", "\nSteve, Alex\n", "\nend"]
+        self.assertEqual(list(iter_lines(chunks)), ["There are 2 players", "Steve, Alex", "", "end"])
+
+    def test_long_line_streams_in_pieces(self):
+        chunks = iter(["x" * 3000, "x" * 3000, "x" * 3000 + "\r", "\ny"])
+        lines = iter_lines(chunks, max_length=4096)
+        # The first piece comes out before the later packets are read
+        self.assertEqual(len(next(lines)), 6000)
+        self.assertEqual(list(lines), ["x" * 3000, "y"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,56 @@
+"""Coalescing of identical in-flight read-only commands"""
+import threading
+import time
+import unittest
+
+from rcon_cache import ResponseCache
+from rcon_client import RCONClient
+from rcon_mock import MockRCONServer
+from rcon_stats import LatencyStats
+
+PASSWORD = "pw"
+
+
+class CoalesceTest(unittest.TestCase):
+    def run_concurrently(self, client, commands):
+        results = [None] * len(commands)
+        leader_started = threading.Event()
+
+        def run(i, command):
+            if i:
+                # Arrive while the first request is in flight
+                leader_started.wait()
+                time.sleep(0.02)
+            else:
+                leader_started.set()
+            results[i] = client.command(command)
+
+        threads = [threading.Thread(target=run, args=(i, c)) for i, c in enumerate(commands)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        return results
+
+    def test_concurrent_identical_reads_share_one_round_trip(self):
+        stats = LatencyStats()
+        with MockRCONServer(password=PASSWORD, command_latency={"seed": 0.2}) as server:
+            client = RCONClient("127.0.0.1", server.port, PASSWORD, stats=stats, cache=ResponseCache())
+            results = self.run_concurrently(client, ["seed", "/seed", "seed "] + ["seed"] * 5)
+            client.close()
+
+        self.assertEqual(server.commands, ["seed"])
+        self.assertEqual(len(set(results)), 1)
+        [row] = stats.snapshot()
+        self.assertEqual(row['coalesced'], 7)
+
+    def test_mutating_commands_are_never_shared(self):
+        with MockRCONServer(password=PASSWORD, command_latency={"say": 0.1}) as server:
+            client = RCONClient("127.0.0.1", server.port, PASSWORD, cache=ResponseCache())
+            self.run_concurrently(client, ["say hi"] * 3)
+            client.close()
+        self.assertEqual(server.commands, ["say hi"] * 3)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,57 @@
+"""CompletionEngine loading"""
+import shutil
+import tempfile
+import time
+import unittest
+
+from rcon_client import RCONClient
+from rcon_complete import CompletionEngine
+from rcon_mock import MockRCONServer
+from rcon_stats import LatencyStats
+from rcon_transcript import TranscriptWriter
+
+PASSWORD = "pw"
+
+HELP = {"help": lambda command: "/time (add|set) <value>" if command == "help" else "/time set <time>"}
+
+
+class LazyLoadTest(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def wait_ready(self, engine):
+        deadline = time.monotonic() + 5
+        while not engine.ready and time.monotonic() < deadline:
+            time.sleep(0.01)
+        self.assertTrue(engine.ready, engine.error)
+
+    def test_help_is_fetched_on_first_completion_and_not_recorded(self):
+        with MockRCONServer(password=PASSWORD, responses=HELP) as server:
+            stats = LatencyStats()
+            transcript = TranscriptWriter(self.directory)
+            client = RCONClient("127.0.0.1", server.port, PASSWORD, stats=stats, transcript=transcript)
+            engine = CompletionEngine(client.server, client, directory=self.directory)
+
+            engine.set_version("1.21")
+            self.assertEqual(server.commands, [])
+            self.assertFalse(engine.complete("ti")['ready'])
+            self.wait_ready(engine)
+            self.assertEqual(engine.complete("ti")['matches'], ["time"])
+            fetched = len(server.commands)
+            self.assertGreater(fetched, 0)
+
+            # Further completions and health checks send nothing
+            engine.set_version("1.21")
+            engine.complete("time ")
+            self.assertEqual(len(server.commands), fetched)
+            client.close()
+
+        self.assertEqual(stats.snapshot(), [])
+        self.assertIsNone(transcript._thread)
+
+
+if __name__ == "__main__":
+    unittest.main()
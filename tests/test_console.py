@@ -0,0 +1,49 @@
+"""ConsoleView stream ordering"""
+import unittest
+
+from rcon_console import ConsoleView
+
+
+class FakeText:
+    """Just enough of a Text widget for queuing lines"""
+
+    def tag_config(self, *args, **kwargs):
+        pass
+
+    def after(self, ms, fn):
+        pass
+
+
+class StreamTest(unittest.TestCase):
+    def shown(self, console):
+        return [line[1] for line in console._pending]
+
+    def test_later_streams_wait_for_earlier_ones(self):
+        console = ConsoleView(FakeText())
+        first = console.open_stream(0)
+        second = console.open_stream(0)
+        other = console.open_stream(2)
+
+        console.write(second, "second 1")
+        console.write(first, "first 1")
+        console.write(other, "other 1")
+        self.assertEqual(self.shown(console), ["first 1", "other 1"])
+
+        console.write(first, "first 2")
+        console.close_stream(first)
+        console.write(second, "second 2")
+        self.assertEqual(self.shown(console), ["first 1", "other 1", "first 2", "second 1", "second 2"])
+
+    def test_stream_closed_early_is_released_in_turn(self):
+        console = ConsoleView(FakeText())
+        first = console.open_stream()
+        second = console.open_stream()
+        console.write(second, "second")
+        console.close_stream(second)
+        self.assertEqual(self.shown(console), [])
+        console.close_stream(first)
+        self.assertEqual(self.shown(console), ["second"])
+
+
+if __name__ == "__main__":
+    unittest.main()
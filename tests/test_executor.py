@@ -0,0 +1,52 @@
+"""CommandExecutor delivery"""
+import threading
+import time
+import unittest
+
+from rcon_executor import CommandExecutor
+
+
+class DeliveryTest(unittest.TestCase):
+    def test_slow_job_does_not_hold_back_later_results(self):
+        executor = CommandExecutor(workers=2)
+        release = threading.Event()
+        fast_done = threading.Event()
+        executor.submit(release.wait, 5)
+        executor.submit(lambda: None, on_done=lambda result, error: fast_done.set())
+        try:
+            self.assertTrue(fast_done.wait(2))
+        finally:
+            release.set()
+            executor.shutdown()
+
+    def test_callback_may_submit(self):
+        executor = CommandExecutor(workers=2)
+        done = threading.Event()
+
+        def resubmit(result, error):
+            executor.submit(lambda: None, on_done=lambda result, error: done.set())
+
+        executor.submit(lambda: None, on_done=resubmit)
+        self.assertTrue(done.wait(2))
+        executor.shutdown()
+
+    def test_ordered_delivery(self):
+        executor = CommandExecutor(workers=4, ordered=True)
+        delivered = []
+        all_done = threading.Event()
+
+        def on_done(result, error):
+            delivered.append(result)
+            if len(delivered) == 8:
+                all_done.set()
+
+        for i in range(8):
+            # Earlier jobs take longer, so they finish last
+            executor.submit(lambda i=i: time.sleep((8 - i) * 0.005) or i, on_done=on_done)
+        self.assertTrue(all_done.wait(5))
+        self.assertEqual(delivered, list(range(8)))
+        executor.shutdown()
+
+
+if __name__ == "__main__":
+    unittest.main()
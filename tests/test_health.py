@@ -0,0 +1,50 @@
+"""HealthMonitor against servers that send malformed status replies"""
+import socket
+import threading
+import unittest
+
+from rcon_health import HealthMonitor, _frame, _varint
+
+
+def serve_once(packet):
+    """Answer one status request with a raw packet; returns the port"""
+    listener = socket.socket()
+    listener.bind(("127.0.0.1", 0))
+    listener.listen(1)
+
+    def run():
+        with listener:
+            conn, _ = listener.accept()
+            with conn:
+                conn.recv(1024)
+                conn.sendall(_frame(packet))
+
+    threading.Thread(target=run, daemon=True).start()
+    return listener.getsockname()[1]
+
+
+class MalformedReplyTest(unittest.TestCase):
+    def check(self, packet):
+        monitor = HealthMonitor("127.0.0.1", serve_once(packet), on_update=None, min_interval=1.0)
+        monitor.interval = 10.0
+        result = monitor.check()
+        self.assertFalse(result['online'])
+        self.assertTrue(result['error'].startswith("Invalid status reply"))
+        self.assertEqual(monitor.interval, 1.0)
+        return result
+
+    def test_truncated_packet(self):
+        # The JSON length VarInt promises another byte the packet lacks
+        self.check(b"\x00\x80")
+
+    def test_status_json_not_an_object(self):
+        body = b"[]"
+        self.check(b"\x00" + _varint(len(body)) + body)
+
+    def test_players_of_the_wrong_type(self):
+        body = b'{"players": 5}'
+        self.check(b"\x00" + _varint(len(body)) + body)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,43 @@
+"""CommandHistory recording"""
+import os
+import shutil
+import tempfile
+import threading
+import unittest
+
+from rcon_history import CommandHistory
+
+
+class AddTest(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.path = os.path.join(self.directory, "server.log")
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def test_add_does_not_wait_for_a_load_in_progress(self):
+        history = CommandHistory(self.path)
+        added = threading.Event()
+        with history._lock:
+            threading.Thread(target=lambda: (history.add("list"), added.set()), daemon=True).start()
+            self.assertTrue(added.wait(2))
+        self.assertEqual(history.tail(), ["list"])
+
+    def test_commands_reach_the_log_once(self):
+        with open(self.path, 'w', encoding='utf-8') as f:
+            f.write("say old\n")
+        history = CommandHistory(self.path)
+        history.add("list")
+        self.assertTrue(history.flush())
+        # Loaded after the write: "list" comes from the file, not again from memory
+        history.add("time set day")
+        self.assertEqual(history.tail(), ["say old", "list", "time set day"])
+        history.add("time set day")
+        self.assertTrue(history.flush())
+        with open(self.path, encoding='utf-8') as f:
+            self.assertEqual(f.read().splitlines(), ["say old", "list", "time set day"])
+
+
+if __name__ == "__main__":
+    unittest.main()
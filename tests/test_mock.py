@@ -0,0 +1,21 @@
+"""MockRCONServer startup"""
+import socket
+import unittest
+
+from rcon_mock import MockRCONServer
+
+
+class StartTest(unittest.TestCase):
+    def test_bind_failure_is_raised_to_the_caller(self):
+        with socket.socket() as taken:
+            taken.bind(("127.0.0.1", 0))
+            taken.listen(1)
+            server = MockRCONServer(host="127.0.0.1", port=taken.getsockname()[1])
+            with self.assertRaises(OSError):
+                server.start_in_thread()
+            # Nothing left running for stop_thread() to wait on
+            server.stop_thread()
+
+
+if __name__ == "__main__":
+    unittest.main()
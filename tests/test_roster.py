@@ -0,0 +1,82 @@
+"""Player list parsing and roster diffs"""
+import unittest
+
+from rcon_client import RCONClient
+from rcon_mock import MockRCONServer
+from rcon_roster import Roster, parse_list
+
+PASSWORD = "pw"
+
+
+class ParseListTest(unittest.TestCase):
+    def test_vanilla(self):
+        parsed = parse_list("There are 2 of a max of 20 players online: Steve, Alex")
+        self.assertEqual(parsed, {"players_online": 2, "players_max": 20, "players": ["Steve", "Alex"]})
+
+    def test_vanilla_empty(self):
+        parsed = parse_list("There are 0 of a max of 20 players online: ")
+        self.assertEqual(parsed['players'], [])
+
+    def test_vanilla_uuids(self):
+        parsed = parse_list("There are 1 of a max of 20 players online: Steve (069a79f4-44e9-4726-a5be-fca90e38aaf5)")
+        self.assertEqual(parsed['players'], ["Steve"])
+
+    def test_bukkit(self):
+        parsed = parse_list("§6There are §c2§6/§c50§6 players online:\n§fSteve, Alex")
+        self.assertEqual(parsed, {"players_online": 2, "players_max": 50, "players": ["Steve", "Alex"]})
+
+    def test_essentials(self):
+        text = ("There are 3 out of maximum 40 players online.\n"
+                "admins: [AFK]Notch\n"
+                "default: ~Jeb, Steve")
+        parsed = parse_list(text)
+        self.assertEqual(parsed, {"players_online": 3, "players_max": 40, "players": ["Notch", "Jeb", "Steve"]})
+
+    def test_not_a_list(self):
+        self.assertIsNone(parse_list("Unknown command"))
+
+
+class RosterTest(unittest.TestCase):
+    def test_first_list_is_initial_and_later_ones_are_diffs(self):
+        roster = Roster("s")
+        first = roster.update(["Steve", "Alex"], now=100.0)
+        self.assertTrue(first['initial'])
+        self.assertEqual([p['name'] for p in first['joined']], ["Alex", "Steve"])
+        self.assertFalse(first['joined'][0]['exact'])
+
+        diff = roster.update(["Steve", "Notch"], now=160.0)
+        self.assertFalse(diff['initial'])
+        self.assertEqual(diff['joined'], [{"name": "Notch", "since": 160.0, "exact": True}])
+        self.assertEqual(diff['left'], [{"name": "Alex", "seconds": 60}])
+        self.assertEqual(roster.session_seconds("Steve", now=190.0), 90.0)
+
+    def test_hidden_names_keep_the_known_players(self):
+        roster = Roster("s")
+        roster.update(["Steve"])
+        roster.observe("list", "There are 2 of a max of 20 players online: Steve")
+        self.assertEqual(roster.names(), ["Steve"])
+        self.assertEqual(roster.players_online, 2)
+
+    def test_offline_empties_the_roster(self):
+        roster = Roster("s")
+        roster.update(["Steve"], now=0.0)
+        diff = roster.apply_status({"online": False})
+        self.assertEqual([p['name'] for p in diff['left']], ["Steve"])
+        self.assertTrue(roster.update(["Steve"])['initial'])
+
+    def test_client_list_feeds_the_roster(self):
+        roster = Roster("s")
+        diffs = []
+        roster.subscribe(diffs.append)
+        with MockRCONServer(password=PASSWORD, players=["Steve", "Alex"]) as server:
+            client = RCONClient("127.0.0.1", server.port, PASSWORD, roster=roster)
+            client.command("list")
+            server.players.remove("Alex")
+            client.batch(["list"])
+            client.close()
+        self.assertEqual(roster.names(), ["Steve"])
+        self.assertEqual(diffs[-1]['left'][0]['name'], "Alex")
+
+
+if __name__ == "__main__":
+    unittest.main()
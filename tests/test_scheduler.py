@@ -0,0 +1,122 @@
+"""Scheduler slot ordering and re-entrancy"""
+import threading
+import time
+import unittest
+
+from rcon_client import RCONClient
+from rcon_mock import MockRCONServer
+from rcon_scheduler import BULK, INTERACTIVE, SCHEDULED, Scheduler, priority
+
+PASSWORD = "pw"
+
+
+def wait_for_waiters(scheduler, count):
+    deadline = time.monotonic() + 5
+    while time.monotonic() < deadline:
+        [row] = scheduler.snapshot()
+        if sum(row['waiting'].values()) == count:
+            return
+        time.sleep(0.005)
+    raise AssertionError(f"expected {count} waiters")
+
+
+class PriorityOrderTest(unittest.TestCase):
+    def test_higher_class_goes_first_then_round_robin(self):
+        scheduler = Scheduler()
+        order = []
+        scheduler.acquire("s")
+
+        def take(name, level):
+            with scheduler.slot("s", level):
+                order.append(name)
+
+        threads = []
+        for name, level in [("bulk-a", BULK), ("bulk-b", BULK), ("scheduled", SCHEDULED),
+                            ("interactive", INTERACTIVE)]:
+            thread = threading.Thread(target=take, args=(name, level))
+            thread.start()
+            threads.append(thread)
+            wait_for_waiters(scheduler, len(threads))
+        scheduler.release("s")
+        for thread in threads:
+            thread.join(5)
+
+        self.assertEqual(order, ["interactive", "scheduled", "bulk-a", "bulk-b"])
+        [row] = scheduler.snapshot()
+        self.assertEqual(row['active'], 0)
+        self.assertEqual(row['granted'], {"interactive": 2, "scheduled": 1, "bulk": 2})
+
+    def test_interactive_command_overtakes_queued_bulk_commands(self):
+        scheduler = Scheduler()
+        with MockRCONServer(password=PASSWORD) as server:
+            client = RCONClient("127.0.0.1", server.port, PASSWORD, scheduler=scheduler)
+            client.command("echo warm")
+            scheduler.acquire(client.server)
+
+            def send(command, level):
+                with priority(level):
+                    client.command(command)
+
+            threads = []
+            for command, level in [("echo bulk 1", BULK), ("echo bulk 2", BULK),
+                                   ("kick Steve", INTERACTIVE)]:
+                thread = threading.Thread(target=send, args=(command, level))
+                thread.start()
+                threads.append(thread)
+                wait_for_waiters(scheduler, len(threads))
+            scheduler.release(client.server)
+            for thread in threads:
+                thread.join(5)
+            client.close()
+
+        self.assertEqual(server.commands[1], "kick Steve")
+        self.assertEqual(sorted(server.commands[2:]), ["echo bulk 1", "echo bulk 2"])
+
+
+class ReentrancyTest(unittest.TestCase):
+    def test_nested_slot_on_the_same_thread(self):
+        scheduler = Scheduler()
+        with scheduler.slot("s"):
+            with scheduler.slot("s", BULK) as waited:
+                self.assertEqual(waited, 0.0)
+            [row] = scheduler.snapshot()
+            self.assertEqual(row['active'], 1)
+        [row] = scheduler.snapshot()
+        self.assertEqual(row['active'], 0)
+
+    def test_command_sent_while_holding_the_slot(self):
+        scheduler = Scheduler()
+        with MockRCONServer(password=PASSWORD) as server:
+            client = RCONClient("127.0.0.1", server.port, PASSWORD, scheduler=scheduler)
+            done = threading.Event()
+
+            def run():
+                with scheduler.slot(client.server):
+                    client.command("echo inner")
+                done.set()
+
+            threading.Thread(target=run, daemon=True).start()
+            self.assertTrue(done.wait(5))
+            client.close()
+        self.assertEqual(server.commands, ["echo inner"])
+
+    def test_release_from_a_thread_without_a_slot(self):
+        scheduler = Scheduler()
+        scheduler.acquire("s")
+        errors = []
+
+        def release():
+            try:
+                scheduler.release("s")
+            except RuntimeError as e:
+                errors.append(e)
+
+        thread = threading.Thread(target=release)
+        thread.start()
+        thread.join(5)
+        self.assertEqual(len(errors), 1)
+        scheduler.release("s")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,100 @@
+"""ScriptRunner pacing and failure policies against the mock server"""
+import time
+import unittest
+
+from rcon_client import RCONClient
+from rcon_mock import MockRCONServer
+from rcon_script import ABORTED, DONE, ScriptError, ScriptRunner, TokenBucket, parse_script
+
+PASSWORD = "pw"
+
+
+class ParseScriptTest(unittest.TestCase):
+    def test_variables_and_comments(self):
+        text = "# comment\n\n@set team = red\ntp @a[team=${team}] ${spot}\nsay $$5\n"
+        commands = parse_script(text, {"spot": "0 64 0"})
+        self.assertEqual(commands, [(4, "tp @a[team=red] 0 64 0"), (5, "say $5")])
+
+    def test_undefined_variable_names_the_line(self):
+        with self.assertRaises(ScriptError) as caught:
+            parse_script("say one\nsay ${missing}")
+        self.assertEqual(caught.exception.line, 2)
+
+
+class TokenBucketTest(unittest.TestCase):
+    def test_grants_burst_then_waits_for_refill(self):
+        bucket = TokenBucket(100, 10)
+        self.assertEqual(bucket.take(50), (10, 0.0))
+        granted, wait = bucket.take(50, 5)
+        self.assertEqual(granted, 0)
+        self.assertGreater(wait, 0.03)
+        self.assertLessEqual(wait, 0.05)
+
+
+class ScriptRunnerTest(unittest.TestCase):
+    def run_script(self, server, commands, **kwargs):
+        client = RCONClient("127.0.0.1", server.port, PASSWORD)
+        runner = ScriptRunner(client, commands, **kwargs)
+        started = time.monotonic()
+        runner.start()
+        runner.join(10)
+        elapsed = time.monotonic() - started
+        client.close()
+        return runner, elapsed
+
+    def test_rate_limits_the_run(self):
+        commands = [(i, f"echo {i}") for i in range(1, 101)]
+        with MockRCONServer(password=PASSWORD) as server:
+            runner, elapsed = self.run_script(server, commands, rate=400)
+
+        self.assertEqual(runner.state, DONE)
+        self.assertEqual(runner.done, 100)
+        self.assertEqual(server.commands, [command for _, command in commands])
+        # The first window goes out at once from a full bucket, the other
+        # 80 commands wait for the refill at 400/s
+        self.assertGreaterEqual(elapsed, 0.18)
+        self.assertLess(elapsed, 2.0)
+
+    def test_windows_never_exceed_the_burst(self):
+        commands = [(i, f"echo {i}") for i in range(1, 31)]
+        with MockRCONServer(password=PASSWORD) as server:
+            client = RCONClient("127.0.0.1", server.port, PASSWORD)
+            windows = []
+            batch = client.batch
+            client.batch = lambda window: windows.append(len(window)) or batch(window)
+            runner = ScriptRunner(client, commands, rate=1000, burst=8)
+            runner.start()
+            runner.join(10)
+            client.close()
+
+        self.assertEqual(runner.state, DONE)
+        self.assertEqual(sum(windows), 30)
+        self.assertLessEqual(max(windows), 8)
+
+    def test_abort_policy_stops_after_the_failing_window(self):
+        commands = [(1, "echo ok"), (2, "nope")] + [(i, f"echo {i}") for i in range(3, 200)]
+        responses = {"nope": "Unknown or incomplete command, see below for error"}
+        failures = []
+        with MockRCONServer(password=PASSWORD, responses=responses) as server:
+            runner, _ = self.run_script(server, commands, rate=100, burst=5,
+                                        failure_policy="abort", on_failure=failures.append)
+
+        self.assertEqual(runner.state, ABORTED)
+        self.assertEqual(runner.failed, 1)
+        self.assertEqual(failures[0]['line'], 2)
+        self.assertEqual(failures[0]['command'], "nope")
+        self.assertEqual(len(server.commands), 5)
+
+    def test_continue_policy_counts_failures(self):
+        commands = [(i, "nope" if i % 3 == 0 else "echo x") for i in range(1, 10)]
+        responses = {"nope": "Unknown command"}
+        with MockRCONServer(password=PASSWORD, responses=responses) as server:
+            runner, _ = self.run_script(server, commands, rate=1000)
+
+        self.assertEqual(runner.state, DONE)
+        self.assertEqual(runner.failed, 3)
+        self.assertEqual([f['line'] for f in runner.failures], [3, 6, 9])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,66 @@
+"""TranscriptIndex over rotated, compressed transcript segments"""
+import shutil
+import tempfile
+import unittest
+
+from rcon_search import SearchError, TranscriptIndex, parse_query
+from rcon_transcript import TranscriptWriter, list_segments
+
+
+class SearchTest(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        # Small segments, so the records span several rotated .gz files
+        writer = TranscriptWriter(self.directory, segment_bytes=2000)
+        for i in range(60):
+            writer.record("10.0.0.1:25575", f"whitelist add Player{i}", f"Added Player{i} to the whitelist", True)
+        writer.record("10.0.0.2:25575", "ban Steve", "Connection timeout", False)
+        writer.record("10.0.0.2:25575", "say hello world", "", True)
+        writer.close()
+        self.index = TranscriptIndex(self.directory)
+
+    def tearDown(self):
+        self.index.close()
+        shutil.rmtree(self.directory)
+
+    def commands(self, query, **kwargs):
+        return [record['command'] for record in self.index.iter_results(query, **kwargs)]
+
+    def test_segments_were_rotated_and_compressed(self):
+        segments = list_segments(self.directory)
+        self.assertGreater(len(segments), 3)
+        self.assertTrue(all(path.endswith(".gz") for path in segments))
+        self.assertEqual(self.index.update(), 62)
+        self.assertEqual(self.index.update(), 0)
+
+    def test_queries(self):
+        self.index.update()
+        self.assertEqual(self.commands("Player7"), ["whitelist add Player7"])
+        self.assertEqual(len(self.commands("Player1*")), 11)
+        self.assertEqual(self.commands('"hello world"'), ["say hello world"])
+        self.assertEqual(self.commands("is:error"), ["ban Steve"])
+        self.assertEqual(self.commands("server:10.0.0.2"), ["say hello world", "ban Steve"])
+        self.assertEqual(self.commands("command:timeout"), [])
+        self.assertEqual(self.commands("timeout"), ["ban Steve"])
+
+    def test_paging_newest_first(self):
+        self.index.update()
+        first = self.index.search("whitelist", limit=25)
+        self.assertEqual(first['results'][0]['command'], "whitelist add Player59")
+        self.assertIsNotNone(first['cursor'])
+        rest = self.commands("whitelist")[25:]
+        second = self.index.search("whitelist", cursor=first['cursor'], limit=100)
+        self.assertEqual([record['command'] for record in second['results']], rest)
+        self.assertIsNone(second['cursor'])
+
+    def test_search_reads_only_what_is_indexed(self):
+        self.assertEqual(self.commands("Player7"), [])
+        self.assertEqual(self.commands("Player7", update=True), ["whitelist add Player7"])
+
+    def test_malformed_query(self):
+        with self.assertRaises(SearchError):
+            parse_query("since:yesterdayish")
+
+
+if __name__ == "__main__":
+    unittest.main()
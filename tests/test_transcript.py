@@ -0,0 +1,84 @@
+"""Transcript recording and segment housekeeping"""
+import os
+import shutil
+import tempfile
+import threading
+import time
+import unittest
+
+from rcon_cache import ResponseCache
+from rcon_client import RCONClient
+from rcon_mock import MockRCONServer
+from rcon_transcript import MAX_RESPONSE_CHARS, TranscriptWriter, list_segments, read_segment
+
+PASSWORD = "pw"
+
+
+class TranscriptTest(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def records(self):
+        return [record for path in list_segments(self.directory) for record in read_segment(path)]
+
+    def test_short_lived_writers_merge_their_segments(self):
+        for i in range(40):
+            writer = TranscriptWriter(self.directory, merge_count=8)
+            writer.record("host:25575", f"say {i}", "", True)
+            writer.close()
+
+        segments = list_segments(self.directory)
+        self.assertLess(len(segments), 8)
+        self.assertTrue(all(path.endswith(".gz") for path in segments))
+        # Same-second segments of different processes are ordered by PID, not time
+        self.assertEqual(sorted(record['command'] for record in self.records()),
+                         sorted(f"say {i}" for i in range(40)))
+        self.assertFalse(os.path.exists(os.path.join(self.directory, ".merge.lock")))
+
+    def test_long_response_is_recorded_truncated(self):
+        transcript = TranscriptWriter(self.directory)
+        with MockRCONServer(password=PASSWORD, response_size=100000) as server:
+            client = RCONClient("127.0.0.1", server.port, PASSWORD, transcript=transcript)
+            text = client.command("say hello")
+            client.close()
+        transcript.close()
+
+        self.assertEqual(len(text), 100000)
+        [record] = self.records()
+        self.assertEqual(len(record['response']), MAX_RESPONSE_CHARS + 1)
+        self.assertTrue(record['response'].endswith("…"))
+
+    def test_cached_and_coalesced_answers_are_recorded(self):
+        transcript = TranscriptWriter(self.directory)
+        with MockRCONServer(password=PASSWORD, command_latency={"seed": 0.2}) as server:
+            client = RCONClient("127.0.0.1", server.port, PASSWORD, cache=ResponseCache(), transcript=transcript)
+            leader = threading.Thread(target=client.command, args=("seed",))
+            leader.start()
+            time.sleep(0.05)
+            client.command("seed")
+            leader.join()
+            self.assertIsNotNone(client.cached_response("seed"))
+            client.close()
+        transcript.close()
+
+        self.assertEqual(server.commands, ["seed"])
+        flags = sorted((record.get('cached', False), record.get('coalesced', False)) for record in self.records())
+        self.assertEqual(flags, [(False, False), (False, True), (True, False)])
+
+    def test_deleted_segment_is_replaced_on_the_next_batch(self):
+        transcript = TranscriptWriter(self.directory)
+        transcript.record("host:25575", "say lost", "", True)
+        transcript.flush()
+        for path in list_segments(self.directory):
+            os.remove(path)
+        transcript.record("host:25575", "say kept", "", True)
+        transcript.close()
+
+        self.assertEqual([record['command'] for record in self.records()], ["say kept"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,21 +1,128 @@
-import webview
-import subprocess
-import sys
 import os
 import json
+import itertools
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import CancelledError
+
+from rcon_cache import get_cache
+from rcon_client import RCONError, RCONTimeoutError, get_client, iter_lines, strip_colors
+from rcon_complete import get_completer
+from rcon_events import EventStream
+from rcon_executor import CommandExecutor
+from rcon_health import DEFAULT_GAME_PORT, HealthMonitor, server_list_ping
+from rcon_history import CURSOR_PAGE, SEARCH_LIMIT, get_history
+from rcon_query import query_status
+from rcon_roster import get_roster
+from rcon_scheduler import BULK, INTERACTIVE
+from rcon_search import PAGE_SIZE, SearchError, get_index
+from rcon_script import DEFAULT_RATE, ScriptError, ScriptRunner, format_progress, parse_script, parse_variables
+from rcon_servers import fan_out, load_servers
+from rcon_stats import get_stats
+from rcon_watch import ConfigWatcher
+
+# Lines of console history kept in the page; override with "console_max_lines"
+DEFAULT_CONSOLE_MAX_LINES = 100000
+
+# Finished jobs kept around for poll_job()
+MAX_FINISHED_JOBS = 256
 
 class RCONApi:
-    def __init__(self):
+    def __init__(self, config_file="config.json"):
         self.config_loaded = False
+        self.console_max_lines = DEFAULT_CONSOLE_MAX_LINES
         self.connection_status = False
-        self.config_file = "config.json"
+        self.config_file = config_file
+        # Push channel to the page; attached once the window has loaded
+        self._events = EventStream()
+        # Bridge calls queue work here and return a job ID immediately
+        self._executor = CommandExecutor()
+        self._jobs = OrderedDict()
+        self._jobs_lock = threading.Lock()
+        self._job_ids = itertools.count(1)
+        self._config_watcher = None
+        self._health = None
+        self._roster = None
+        self._script = None
         self.load_config()
+        self._attach_roster()
+    
+    def _client(self):
+        """Return the persistent RCON client for the current configuration"""
+        return get_client(self.server_host, self.server_port, self.rcon_password)
+    
+    def submit_command(self, command):
+        """Queue an RCON command; returns a job ID without waiting"""
+        return self._submit(self.execute_command, command, True)
+    
+    def submit_message(self, message):
+        """Queue a broadcast message; returns a job ID without waiting"""
+        return self._submit(self.send_message, message)
+    
+    def submit_fan_out(self, command):
+        """Queue a command for every configured server; returns a job ID"""
+        return self._submit(self.execute_fan_out, command, True)
+    
+    def submit_batch(self, commands):
+        """Queue a pipelined batch of commands as a bulk job; returns a job ID"""
+        return self._submit(self.execute_batch, commands, level=BULK)
     
-    def _subprocess_no_window(self):
-        """Return kwargs to prevent console window on Windows"""
-        if sys.platform.startswith("win"):
-            return {"creationflags": subprocess.CREATE_NO_WINDOW}
-        return {}
+    def poll_job(self, job_id):
+        """Return a job's state and, once finished, its result"""
+        with self._jobs_lock:
+            record = self._jobs.get(job_id)
+            if record is None:
+                return {"job_id": job_id, "state": "unknown", "result": None}
+            return {key: value for key, value in record.items() if not key.startswith('_')}
+    
+    def cancel_job(self, job_id):
+        """Cancel a job that is still waiting in the queue"""
+        with self._jobs_lock:
+            record = self._jobs.get(job_id)
+        job = record.get('_job') if record else None
+        if job is None or not self._executor.cancel(job):
+            return {"success": False, "message": "Job already running or finished"}
+        return {"success": True, "message": "Job cancelled"}
+    
+    def _submit(self, fn, *args, level=INTERACTIVE):
+        job_id = next(self._job_ids)
+        record = {"job_id": job_id, "state": "queued", "result": None}
+        with self._jobs_lock:
+            self._jobs[job_id] = record
+        
+        job = self._executor.submit(
+            self._run_job, record, fn, args,
+            on_done=lambda result, error: self._job_done(record, result, error),
+            level=level
+        )
+        if job is None:
+            with self._jobs_lock:
+                self._jobs.pop(job_id, None)
+            return {"success": False, "message": f"Command queue is full ({self._executor.max_queue} pending), please wait"}
+        
+        record['_job'] = job
+        return {"success": True, "job_id": job_id}
+    
+    def _run_job(self, record, fn, args):
+        record['state'] = "running"
+        self._events.push("job", job_id=record['job_id'], state="running")
+        return fn(*args)
+    
+    def _job_done(self, record, result, error):
+        if isinstance(error, CancelledError):
+            record['state'] = "cancelled"
+            record['result'] = {"success": False, "message": "Cancelled"}
+        else:
+            record['state'] = "done"
+            record['result'] = result if error is None else {"success": False, "message": f"Error: {str(error)}"}
+        self._events.push("job", job_id=record['job_id'], state=record['state'], result=record['result'])
+        
+        # Forget the oldest finished jobs
+        with self._jobs_lock:
+            finished = [job_id for job_id, r in self._jobs.items() if r['state'] in ("done", "cancelled")]
+            for job_id in finished[:max(0, len(finished) - MAX_FINISHED_JOBS)]:
+                del self._jobs[job_id]
     
     def load_config(self):
         """Load configuration from config.json"""
@@ -27,89 +134,213 @@ class RCONApi:
                 self.server_host = config_data.get('server_ip', '')
                 self.server_port = config_data.get('port', '')
                 self.rcon_password = config_data.get('password', '')
+                self.game_port = str(config_data.get('game_port', DEFAULT_GAME_PORT))
+                self.use_query = bool(config_data.get('use_query', False))
+                self.query_port = str(config_data.get('query_port', self.game_port))
+                self.servers = load_servers(config_data)
+                get_cache().configure(config_data.get('cache_ttls'))
+                self.console_max_lines = int(config_data.get('console_max_lines', DEFAULT_CONSOLE_MAX_LINES))
                 self.config_loaded = True
                 return True
             else:
                 self.server_host = ""
                 self.server_port = ""
                 self.rcon_password = ""
+                self.game_port = str(DEFAULT_GAME_PORT)
+                self.use_query = False
+                self.query_port = self.game_port
+                self.servers = []
                 self.config_loaded = False
                 return False
         except Exception as e:
             print(f"Error loading config: {e}")
+            self.server_host = ""
+            self.server_port = ""
+            self.rcon_password = ""
+            self.game_port = str(DEFAULT_GAME_PORT)
+            self.use_query = False
+            self.query_port = self.game_port
+            self.servers = []
+            self.config_loaded = False
             return False
     
+    def _watch_config(self):
+        """Reload config.json after external edits and tell the page"""
+        self._config_watcher = ConfigWatcher(self.config_file, on_change=self._on_config_changed)
+        self._config_watcher.start()
+    
+    def _health_target(self):
+        """Return (port, probe): UDP Query when enabled, else Server List Ping"""
+        if self.use_query:
+            return self.query_port, query_status
+        return self.game_port, server_list_ping
+    
+    def _watch_health(self):
+        """Check liveness in the background and push results to the page"""
+        port, probe = self._health_target()
+        self._health = HealthMonitor(
+            self.server_host,
+            port,
+            on_update=self._on_health,
+            probe=probe
+        )
+        self._health.start()
+    
+    def _on_health(self, result):
+        if self._roster is not None:
+            self._roster.apply_status(result)
+        if result['online']:
+            completer = self._completer()
+            if completer is not None:
+                # The version names the cached command tree, fetched on first Tab
+                completer.set_version(result['version'])
+        self._events.push("health", health=result)
+    
+    def get_health(self):
+        """Return the latest health check, or None before the first one"""
+        return self._health.last if self._health else None
+    
+    def _attach_roster(self):
+        """Push the configured server's roster diffs to the page"""
+        roster = get_roster(self.server_host, self.server_port) if self.server_host else None
+        if roster is self._roster:
+            return
+        if self._roster is not None:
+            self._roster.unsubscribe(self._push_roster)
+        self._roster = roster
+        if roster is not None:
+            roster.subscribe(self._push_roster)
+        self._events.push("roster", roster=self.get_roster())
+    
+    def _push_roster(self, diff):
+        self._events.push("roster", roster=diff)
+    
+    def get_roster(self):
+        """Return the whole player roster as an initial diff, or None"""
+        return self._roster.snapshot() if self._roster is not None else None
+    
+    def _history(self):
+        return get_history(self.server_host, self.server_port) if self.server_host else None
+    
+    def _preload_history(self):
+        history = self._history()
+        if history is not None:
+            history.preload()
+    
+    def add_history(self, command):
+        """Record a command typed into the command box"""
+        history = self._history()
+        if history is None:
+            return {"success": False, "message": "Please configure RCON settings first"}
+        history.add(command)
+        return {"success": True, "message": "Added to history"}
+    
+    def get_history_matches(self, prefix="", limit=CURSOR_PAGE):
+        """Distinct past commands starting with prefix, most recent first"""
+        history = self._history()
+        return {"commands": history.prefix(prefix, int(limit)) if history is not None else []}
+    
+    def search_history(self, text, limit=SEARCH_LIMIT):
+        """Distinct past commands containing text, most recent first"""
+        history = self._history()
+        return {"commands": history.search(text, int(limit)) if history is not None else []}
+    
+    def _completer(self):
+        if not self.config_loaded:
+            return None
+        try:
+            return get_completer(self._client(), get_roster(self.server_host, self.server_port))
+        except RCONError:
+            return None
+    
+    def complete_command(self, text):
+        """Complete the last word of a command from the cached command tree"""
+        completer = self._completer()
+        if completer is None:
+            return {"start": len(text), "matches": [], "hints": [], "ready": False,
+                    "message": "Please configure RCON settings first"}
+        result = completer.complete(text)
+        if not result['ready']:
+            result['message'] = completer.error or "Loading the server's command list..."
+        return result
+    
+    def _on_config_changed(self):
+        old = (self.server_host, self.server_port, self.rcon_password)
+        if self.load_config():
+            changed = old != (self.server_host, self.server_port, self.rcon_password)
+            self._attach_roster()
+            if self._health:
+                self._health.set_target(self.server_host, *self._health_target())
+            self._events.push("config", config=self.get_config(), changed=changed)
+    
     def get_config(self):
         """Get current configuration"""
         return {
             'server_ip': self.server_host,
             'port': self.server_port,
             'password': self.rcon_password,
-            'config_loaded': self.config_loaded
+            'config_loaded': self.config_loaded,
+            'servers': [server['name'] for server in self.servers],
+            'use_query': self.use_query,
+            'console_max_lines': self.console_max_lines
         }
     
     def save_config(self, server_ip, port, password):
         """Save configuration to config.json"""
         try:
-            config_content = {
+            # Keep extra keys such as the server list
+            config_content = {}
+            if os.path.exists(self.config_file):
+                try:
+                    with open(self.config_file, 'r') as f:
+                        config_content = json.load(f)
+                except Exception:
+                    config_content = {}
+            
+            config_content.update({
                 "server_ip": server_ip,
                 "port": port,
                 "password": password
-            }
+            })
             
             with open(self.config_file, 'w') as f:
                 json.dump(config_content, f, indent=4)
             
+            # Our own write is not an external edit
+            if self._config_watcher:
+                self._config_watcher.refresh()
+            
             self.server_host = server_ip
             self.server_port = port
             self.rcon_password = password
+            self.servers = load_servers(config_content)
             self.config_loaded = True
+            self._attach_roster()
+            if self._health:
+                self._health.set_target(self.server_host, *self._health_target())
             
             return {"success": True, "message": "Configuration saved successfully"}
         except Exception as e:
             return {"success": False, "message": f"Failed to save configuration: {str(e)}"}
     
     def test_connection(self):
-        """Test connection to RCON server"""
+        """Check the RCON login; liveness itself comes from the health monitor"""
         if not self.config_loaded:
             return {"success": False, "message": "Configuration not set"}
         
+        if self._health:
+            self._health.check_now()
         try:
-            mcrcon_path = "./mcrcon.exe"
-            
-            if not os.path.exists(mcrcon_path):
-                return {
-                    "success": False,
-                    "message": "mcrcon.exe not found in application directory"
-                }
-            
-            full_command = [
-                mcrcon_path,
-                "-H", self.server_host,
-                "-P", self.server_port,
-                "-p", self.rcon_password,
-                "list"
-            ]
-            
-            result = subprocess.run(
-                full_command,
-                capture_output=True,
-                text=True,
-                timeout=5,
-                **self._subprocess_no_window()
-            )
-            
-            if result.returncode == 0:
-                self.connection_status = True
-                return {"success": True, "message": "Connected to server successfully"}
-            else:
-                self.connection_status = False
-                error_msg = result.stderr.strip() if result.stderr.strip() else "Connection failed"
-                return {"success": False, "message": error_msg}
+            self._client().reconnect()
+            self.connection_status = True
+            return {"success": True, "message": "Connected to server successfully"}
         
-        except subprocess.TimeoutExpired:
+        except RCONTimeoutError:
             self.connection_status = False
             return {"success": False, "message": "Connection timeout"}
+        except RCONError as e:
+            self.connection_status = False
+            return {"success": False, "message": str(e) or "Connection failed"}
         except Exception as e:
             self.connection_status = False
             return {"success": False, "message": f"Connection error: {str(e)}"}
@@ -122,51 +353,204 @@ class RCONApi:
         command = f"say {message}"
         return self.execute_command(command)
     
-    def execute_command(self, command):
-        """Execute RCON command"""
+    def execute_command(self, command, stream=False):
+        """Execute RCON command
+
+        With stream=True, response chunks are pushed to the page console as
+        they arrive and "streamed" is set in the result.
+        """
         if not self.config_loaded:
             return {"success": False, "message": "Please configure RCON settings first"}
         
         try:
-            mcrcon_path = "./mcrcon.exe"
+            client = self._client()
+            cached = client.cached_response(command)
+            if cached is not None:
+                response = strip_colors(cached).strip()
+                self.connection_status = True
+                return {"success": True, "message": response or "Command executed", "cached": True}
             
-            if not os.path.exists(mcrcon_path):
+            if stream:
+                # Whole lines only: packet boundaries fall mid-line
+                received = False
+                for line in iter_lines(client.command_iter(command)):
+                    if line.strip():
+                        self._events.console(f"{'  ' if received else '✓ '}{line}", "success")
+                        received = True
+                self.connection_status = True
                 return {
-                    "success": False,
-                    "message": "mcrcon.exe not found in application directory"
+                    "success": True,
+                    "message": "Command executed",
+                    "streamed": received
                 }
             
-            full_command = [
-                mcrcon_path,
-                "-H", self.server_host,
-                "-P", self.server_port,
-                "-p", self.rcon_password,
-                command
-            ]
-            
-            result = subprocess.run(
-                full_command,
-                capture_output=True,
-                text=True,
-                timeout=5,
-                **self._subprocess_no_window()
-            )
-            
-            if result.returncode == 0:
-                self.connection_status = True
-                output = result.stdout.strip() if result.stdout.strip() else "Command executed"
-                return {"success": True, "message": output}
-            else:
-                self.connection_status = False
-                error = result.stderr.strip() if result.stderr else "Unknown error"
-                return {"success": False, "message": error}
+            response = strip_colors(client.command(command)).strip()
+            self.connection_status = True
+            output = response if response else "Command executed"
+            return {"success": True, "message": output}
         
-        except subprocess.TimeoutExpired:
+        except RCONTimeoutError:
             self.connection_status = False
             return {"success": False, "message": "Connection timeout"}
+        except RCONError as e:
+            self.connection_status = False
+            return {"success": False, "message": str(e) or "Unknown error"}
         except Exception as e:
             self.connection_status = False
             return {"success": False, "message": f"Error: {str(e)}"}
+    
+    def execute_fan_out(self, command, stream=False):
+        """Send one RCON command to every configured server concurrently
+
+        With stream=True, each server's result is pushed to the page console
+        as soon as it completes.
+        """
+        if not self.config_loaded or not self.servers:
+            return {"success": False, "message": "Please configure RCON settings first", "results": []}
+        
+        if not command.strip():
+            return {"success": False, "message": "Please enter a command", "results": []}
+        
+        def push(result):
+            line = f"[{result['server']}] {result['message']} ({result['latency_ms']:.1f} ms)"
+            if result['success']:
+                self._events.console(f"✓ {line}", "success", "cached" if result['cached'] else None)
+            else:
+                self._events.console(f"✗ {line}", "error")
+        
+        on_result = push if stream else None
+        summary = fan_out(self.servers, command, on_result=on_result)
+        summary['streamed'] = stream
+        return summary
+    
+    def execute_batch(self, commands):
+        """Pipeline a list of RCON commands over one connection"""
+        if not self.config_loaded:
+            return {"success": False, "message": "Please configure RCON settings first", "results": []}
+        
+        commands = [c.strip() for c in commands if c and c.strip()]
+        if not commands:
+            return {"success": False, "message": "Please enter at least one command", "results": []}
+        
+        try:
+            started = time.perf_counter()
+            batch = self._client().batch(commands)
+            elapsed_ms = (time.perf_counter() - started) * 1000
+        except RCONError as e:
+            self.connection_status = False
+            return {"success": False, "message": str(e) or "Unknown error", "results": []}
+        except Exception as e:
+            self.connection_status = False
+            return {"success": False, "message": f"Error: {str(e)}", "results": []}
+        
+        results = []
+        for command, (ok, text, seconds) in zip(commands, batch):
+            text = strip_colors(text).strip()
+            results.append({
+                "command": command,
+                "success": ok,
+                "message": text if text or not ok else "Command executed",
+                "elapsed_ms": round(seconds * 1000, 2)
+            })
+        
+        failed = sum(1 for r in results if not r["success"])
+        self.connection_status = failed < len(results)
+        return {
+            "success": failed == 0,
+            "message": f"Batch finished: {len(results) - failed}/{len(results)} succeeded in {elapsed_ms:.1f} ms",
+            "results": results,
+            "elapsed_ms": round(elapsed_ms, 2)
+        }
+    
+    def start_script(self, text, variables="", rate=DEFAULT_RATE, failure_policy="continue"):
+        """Start running a command script in the background
+
+        Progress is pushed as "script" events and failed lines go to the
+        console; use get_script_status() to poll instead.
+        """
+        if not self.config_loaded:
+            return {"success": False, "message": "Please configure RCON settings first"}
+        if self._script is not None and not self._script.finished:
+            return {"success": False, "message": "A script is already running"}
+        
+        try:
+            commands = parse_script(text, parse_variables(variables))
+            rate = float(rate)
+        except (ScriptError, ValueError) as e:
+            return {"success": False, "message": str(e)}
+        if not commands:
+            return {"success": False, "message": "The script has no commands"}
+        
+        def on_failure(failure):
+            self._events.console(f"✗ [line {failure['line']}] {failure['command']} → {failure['message']}", "error")
+        
+        def on_progress(progress):
+            self._events.push("script", progress=progress)
+            if progress['state'] in ("done", "aborted"):
+                level = "success" if progress['state'] == "done" and not progress['failed'] else "warning"
+                self._events.console(f"🧾 Script: {format_progress(progress)}", level)
+        
+        try:
+            self._script = ScriptRunner(self._client(), commands, rate=rate, failure_policy=failure_policy,
+                                        on_progress=on_progress, on_failure=on_failure)
+        except (RCONError, ValueError) as e:
+            return {"success": False, "message": str(e)}
+        self._script.start()
+        return {"success": True, "message": f"Running {len(commands)} commands at up to {rate:g}/s",
+                "total": len(commands)}
+    
+    def pause_script(self):
+        if self._script is None or self._script.finished:
+            return {"success": False, "message": "No script is running"}
+        self._script.pause()
+        return {"success": True, "message": "Script paused"}
+    
+    def resume_script(self):
+        if self._script is None or self._script.finished:
+            return {"success": False, "message": "No script is running"}
+        self._script.resume()
+        return {"success": True, "message": "Script resumed"}
+    
+    def abort_script(self):
+        if self._script is None or self._script.finished:
+            return {"success": False, "message": "No script is running"}
+        self._script.abort()
+        return {"success": True, "message": "Aborting script"}
+    
+    def get_script_status(self):
+        """Progress of the current or last script, or None"""
+        return self._script.progress() if self._script is not None else None
+    
+    def get_latency_stats(self):
+        """Per-server, per-command latency percentiles for the stats panel"""
+        return get_stats().snapshot()
+    
+    def export_latency_stats(self):
+        """Write the latency stats to a timestamped JSON file"""
+        path = os.path.abspath(time.strftime("rcon_stats_%Y%m%d_%H%M%S.json"))
+        try:
+            get_stats().export(path)
+            return {"success": True, "message": f"Stats exported to {path}", "path": path}
+        except OSError as e:
+            return {"success": False, "message": f"Failed to export stats: {str(e)}"}
+    
+    def reset_latency_stats(self):
+        get_stats().reset()
+        return {"success": True, "message": "Latency stats reset"}
+    
+    def _update_search_index(self):
+        get_index().start()
+    
+    def search_transcripts(self, query="", cursor=None, limit=PAGE_SIZE):
+        """One page of recorded commands matching a query, newest first
+
+        Searches the index as the background updates left it, so the call
+        never waits for the disk.
+        """
+        try:
+            return get_index().search(query, cursor, int(limit))
+        except SearchError as e:
+            return {"success": False, "message": str(e), "results": [], "cursor": None}
 
 def get_html():
     """Return the HTML interface"""
@@ -266,6 +650,72 @@ def get_html():
             margin-left: 12px;
         }
         
+        .job-info {
+            cursor: pointer;
+        }
+        
+        .job-info:empty {
+            display: none;
+        }
+        
+        .player-list {
+            display: flex;
+            flex-wrap: wrap;
+            gap: 8px;
+            margin-top: 16px;
+            color: #94a3b8;
+            font-size: 14px;
+        }
+        
+        .player-chip {
+            background: rgba(15, 23, 42, 0.6);
+            border: 1px solid #334155;
+            border-radius: 8px;
+            padding: 6px 12px;
+            color: #e2e8f0;
+            font-family: 'Consolas', monospace;
+        }
+        
+        .player-duration {
+            color: #94a3b8;
+            margin-left: 8px;
+        }
+        
+        .stats-phase {
+            padding: 8px 12px;
+            font-size: 12px;
+        }
+        
+        .btn-small {
+            padding: 8px 16px;
+            font-size: 12px;
+        }
+        
+        .stats-table {
+            width: 100%;
+            border-collapse: collapse;
+            font-family: 'Consolas', monospace;
+            font-size: 13px;
+        }
+        
+        .stats-table th {
+            text-align: left;
+            color: #94a3b8;
+            font-weight: 600;
+            padding: 6px 8px;
+            border-bottom: 1px solid #334155;
+        }
+        
+        .stats-table td {
+            padding: 6px 8px;
+            color: #e2e8f0;
+            border-bottom: 1px solid rgba(51, 65, 85, 0.4);
+        }
+        
+        .stats-table td.num, .stats-table th.num {
+            text-align: right;
+        }
+        
         .main-grid {
             display: grid;
             grid-template-columns: 2fr 1fr;
@@ -316,6 +766,56 @@ def get_html():
             color: #64748b;
         }
         
+        .completion-hint {
+            display: none;
+            margin-top: 8px;
+            color: #94a3b8;
+            font-family: 'Consolas', monospace;
+            font-size: 13px;
+            white-space: pre-wrap;
+        }
+        
+        .history-search {
+            display: none;
+            margin-top: 12px;
+        }
+        
+        .history-search.open {
+            display: block;
+        }
+        
+        .history-search .input-field {
+            width: 100%;
+        }
+        
+        .history-results {
+            max-height: 220px;
+            overflow-y: auto;
+            margin-top: 8px;
+        }
+        
+        .history-result {
+            padding: 6px 12px;
+            border-radius: 6px;
+            color: #e2e8f0;
+            font-family: 'Consolas', monospace;
+            font-size: 13px;
+            cursor: pointer;
+            white-space: nowrap;
+            overflow: hidden;
+            text-overflow: ellipsis;
+        }
+        
+        .history-result.selected {
+            background: rgba(59, 130, 246, 0.25);
+        }
+        
+        .history-empty {
+            padding: 6px 12px;
+            color: #64748b;
+            font-size: 13px;
+        }
+        
         .btn {
             padding: 12px 24px;
             border: none;
@@ -398,16 +898,120 @@ def get_html():
             font-size: 24px;
         }
         
+        .fan-out-toggle {
+            display: flex;
+            align-items: center;
+            gap: 8px;
+            font-size: 13px;
+            font-weight: 600;
+            color: #cbd5e1;
+            cursor: pointer;
+        }
+        
+        .fan-out-toggle input:disabled + span {
+            color: #64748b;
+        }
+        
+        .batch-input {
+            width: 100%;
+            resize: vertical;
+            font-family: 'Courier New', monospace;
+        }
+        
+        .btn:disabled {
+            opacity: 0.5;
+            cursor: not-allowed;
+        }
+        
+        .script-options .input-field {
+            flex: 1;
+            min-width: 0;
+        }
+        
+        .script-progress {
+            height: 8px;
+            margin-top: 16px;
+            border-radius: 4px;
+            background: rgba(15, 23, 42, 0.8);
+            overflow: hidden;
+        }
+        
+        .script-progress-fill {
+            height: 100%;
+            width: 0;
+            background: linear-gradient(135deg, #059669 0%, #10b981 100%);
+            transition: width 0.2s;
+        }
+        
+        .script-status {
+            margin-top: 8px;
+            color: #94a3b8;
+            font-family: 'Consolas', monospace;
+            font-size: 13px;
+        }
+        
+        .transcript-results {
+            max-height: 360px;
+            overflow-y: auto;
+            margin-top: 12px;
+        }
+        
+        .transcript-result {
+            padding: 8px 12px;
+            border-bottom: 1px solid rgba(51, 65, 85, 0.4);
+            font-family: 'Consolas', monospace;
+            font-size: 13px;
+            cursor: pointer;
+        }
+        
+        .transcript-head {
+            color: #64748b;
+            font-size: 12px;
+        }
+        
+        .transcript-command {
+            color: #e2e8f0;
+        }
+        
+        .transcript-result.failed .transcript-command {
+            color: #f87171;
+        }
+        
+        .transcript-response {
+            color: #94a3b8;
+            white-space: nowrap;
+            overflow: hidden;
+            text-overflow: ellipsis;
+        }
+        
+        .transcript-result.expanded .transcript-response {
+            white-space: pre-wrap;
+        }
+        
         .console {
+            position: relative;
             background: rgba(15, 23, 42, 0.8);
             border-radius: 12px;
             padding: 16px;
-            max-height: 600px;
+            height: 600px;
             overflow-y: auto;
+            overflow-x: hidden;
             font-family: 'Courier New', monospace;
             font-size: 13px;
         }
         
+        .console-spacer {
+            position: relative;
+        }
+        
+        .console-rows {
+            position: absolute;
+            top: 0;
+            left: 0;
+            right: 0;
+            will-change: transform;
+        }
+        
         .console-header {
             display: flex;
             justify-content: space-between;
@@ -429,24 +1033,47 @@ def get_html():
         .console-line {
             display: flex;
             gap: 12px;
-            margin-bottom: 8px;
-            padding: 8px;
-            border-radius: 6px;
-            background: rgba(15, 23, 42, 0.3);
+            height: 22px;
+            line-height: 22px;
+            padding: 0 8px;
+            white-space: pre;
+            overflow: hidden;
+        }
+        
+        .console-line.first {
+            border-top: 1px solid rgba(51, 65, 85, 0.35);
         }
         
         .console-time {
             color: #64748b;
             font-size: 11px;
+            width: 64px;
+            flex-shrink: 0;
         }
         
         .console-icon {
             width: 16px;
+            flex-shrink: 0;
         }
         
         .console-text {
             flex: 1;
-            word-wrap: break-word;
+            overflow: hidden;
+        }
+        
+        .console-badge {
+            flex-shrink: 0;
+            font-size: 11px;
+            color: #94a3b8;
+        }
+        
+        .console-badge:not(:empty) {
+            background: rgba(51, 65, 85, 0.6);
+            border-radius: 6px;
+            padding: 0 6px;
+            height: 18px;
+            line-height: 18px;
+            margin-top: 2px;
         }
         
         .console-text.success {
@@ -617,6 +1244,8 @@ def get_html():
                     <div>
                         <div class="status-text" id="statusText">Checking...</div>
                         <div class="server-info" id="serverInfo"></div>
+                        <div class="server-info" id="healthInfo"></div>
+                        <div class="server-info job-info" id="jobInfo" onclick="cancelQueuedJobs()" title="Click to cancel queued commands"></div>
                     </div>
                 </div>
             </div>
@@ -647,13 +1276,33 @@ def get_html():
                             id="commandInput" 
                             placeholder="e.g., time set day, weather clear, gamemode creative"
                             onkeypress="if(event.key==='Enter') executeCommand()"
+                            onkeydown="commandKeyDown(event)"
+                            oninput="resetHistoryCursor(); showCompletions('')"
                         >
                         <button class="btn btn-success" onclick="executeCommand()">Execute Command</button>
                     </div>
+                    <div class="completion-hint" id="completionHint"></div>
+                    <div class="history-search" id="historySearch">
+                        <input 
+                            type="text" 
+                            class="input-field" 
+                            id="historyQuery" 
+                            placeholder="Search history (Enter recalls, Esc closes)"
+                            oninput="searchHistory()"
+                            onkeydown="historySearchKey(event)"
+                        >
+                        <div class="history-results" id="historyResults"></div>
+                    </div>
                 </div>
                 
                 <div class="card">
-                    <div class="card-title">⚡ Quick Commands</div>
+                    <div class="console-header" style="margin-bottom: 0;">
+                        <div class="card-title" style="margin-bottom: 0;">⚡ Quick Commands</div>
+                        <label class="fan-out-toggle" id="fanOutToggle" title="Send every command to all configured servers">
+                            <input type="checkbox" id="fanOutCheck" disabled>
+                            <span id="fanOutLabel">🌐 All servers</span>
+                        </label>
+                    </div>
                     <div class="quick-commands">
                         <button class="quick-btn day" onclick="quickCommand('time set day', 'Day')">
                             <span class="quick-icon">☀️</span>
@@ -677,6 +1326,103 @@ def get_html():
                         </button>
                     </div>
                 </div>
+                
+                <div class="card" style="margin-top: 24px;">
+                    <div class="console-header" style="margin-bottom: 0;">
+                        <div class="card-title" style="margin-bottom: 0;">👥 Players</div>
+                        <span class="server-info" id="playerSource"></span>
+                    </div>
+                    <div class="player-list" id="playerList">Waiting for first check...</div>
+                </div>
+                
+                <div class="card" style="margin-top: 24px;">
+                    <div class="console-header">
+                        <div class="card-title" style="margin-bottom: 0;">📊 Command Latency</div>
+                        <div class="input-group">
+                            <select class="input-field stats-phase" id="statsPhase" onchange="refreshStats()">
+                                <option value="complete">complete</option>
+                                <option value="first_byte">first_byte</option>
+                                <option value="send">send</option>
+                                <option value="auth">auth</option>
+                                <option value="connect">connect</option>
+                                <option value="queue">queue</option>
+                            </select>
+                            <button class="btn btn-primary btn-small" onclick="exportStats()">💾 Export JSON</button>
+                            <button class="btn btn-danger" onclick="resetStats()">Reset</button>
+                        </div>
+                    </div>
+                    <table class="stats-table">
+                        <thead>
+                            <tr><th>Server</th><th>Command</th><th class="num">Count</th><th class="num">Errors</th><th class="num" title="Requests answered by an identical command already in flight">Shared</th><th class="num">p50 ms</th><th class="num">p95 ms</th><th class="num">p99 ms</th><th class="num">Max ms</th></tr>
+                        </thead>
+                        <tbody id="statsBody"></tbody>
+                    </table>
+                </div>
+                
+                <div class="card" style="margin-top: 24px;">
+                    <div class="card-title">📜 Run Batch</div>
+                    <textarea 
+                        class="input-field batch-input" 
+                        id="batchInput" 
+                        rows="6"
+                        placeholder="One command per line, e.g.&#10;scoreboard players set Steve kills 0&#10;scoreboard players set Alex kills 0"
+                    ></textarea>
+                    <div class="input-group" style="margin-top: 12px; justify-content: flex-end;">
+                        <button class="btn btn-primary" id="batchButton" onclick="runBatch()">Run Batch</button>
+                    </div>
+                </div>
+                
+                <div class="card" style="margin-top: 24px;">
+                    <div class="console-header">
+                        <div class="card-title" style="margin-bottom: 0;">🧾 Script Runner</div>
+                        <label class="btn btn-secondary btn-small">
+                            📂 Open File
+                            <input type="file" id="scriptFile" accept=".txt,.mcfunction,.rcon" style="display: none;" onchange="loadScriptFile(this)">
+                        </label>
+                    </div>
+                    <textarea 
+                        class="input-field batch-input" 
+                        id="scriptInput" 
+                        rows="8"
+                        placeholder="# Lines starting with # are comments&#10;@set team = red&#10;scoreboard players reset @a[team=${team}]"
+                    ></textarea>
+                    <div class="input-group script-options" style="margin-top: 12px;">
+                        <input type="text" class="input-field" id="scriptVariables" placeholder="Variables, e.g. team=red, x=100">
+                        <input type="number" class="input-field" id="scriptRate" value="1000" min="1" title="Commands per second">
+                        <select class="input-field" id="scriptPolicy" title="On a failed command">
+                            <option value="continue">On failure: continue</option>
+                            <option value="pause">On failure: pause</option>
+                            <option value="abort">On failure: abort</option>
+                        </select>
+                    </div>
+                    <div class="input-group" style="margin-top: 12px; justify-content: flex-end;">
+                        <button class="btn btn-primary" id="scriptStart" onclick="startScript()">▶ Run Script</button>
+                        <button class="btn btn-secondary" id="scriptPause" onclick="scriptControl('pause_script')" disabled>⏸ Pause</button>
+                        <button class="btn btn-secondary" id="scriptResume" onclick="scriptControl('resume_script')" disabled>▶ Resume</button>
+                        <button class="btn btn-danger" id="scriptAbort" onclick="scriptControl('abort_script')" disabled>⏹ Abort</button>
+                    </div>
+                    <div class="script-progress"><div class="script-progress-fill" id="scriptProgress"></div></div>
+                    <div class="script-status" id="scriptStatus"></div>
+                </div>
+                
+                <div class="card" style="margin-top: 24px;">
+                    <div class="card-title">🔎 Search Transcripts</div>
+                    <div class="input-group">
+                        <input 
+                            type="text" 
+                            class="input-field" 
+                            id="transcriptQuery" 
+                            placeholder='e.g. "whitelist remove Steve" or is:error server:survival on:yesterday'
+                            onkeydown="if (event.key === 'Enter') searchTranscripts(false)"
+                        >
+                        <button class="btn btn-primary" onclick="searchTranscripts(false)">Search</button>
+                    </div>
+                    <div class="transcript-results" id="transcriptResults" onscroll="transcriptScroll(this)"></div>
+                    <div class="input-group" style="margin-top: 12px; align-items: center;">
+                        <div class="script-status" id="transcriptStatus" style="flex: 1; margin-top: 0;"></div>
+                        <button class="btn btn-secondary btn-small" id="transcriptMore" onclick="searchTranscripts(true)" disabled>Load More</button>
+                    </div>
+                </div>
             </div>
             
             <div class="card">
@@ -684,7 +1430,11 @@ def get_html():
                     <div class="card-title">💻 Console Output</div>
                     <button class="btn btn-danger" onclick="clearConsole()">🗑️ Clear</button>
                 </div>
-                <div class="console" id="console"></div>
+                <div class="console" id="console">
+                    <div class="console-spacer" id="consoleSpacer">
+                        <div class="console-rows" id="consoleRows"></div>
+                    </div>
+                </div>
             </div>
         </div>
         
@@ -714,49 +1464,341 @@ def get_html():
     </div>
     
     <script>
+        // Console model: a capped ring of messages, each pre-wrapped into
+        // fixed-height rows. Only the rows in view exist in the DOM, so
+        // appending costs the same with 10 or 100k lines of history.
+        const CONSOLE_ROW_HEIGHT = 22;
+        const CONSOLE_OVERSCAN = 8;
+        let consoleMaxLines = 100000;
         let consoleMessages = [];
+        let consoleStart = 0;
+        let consoleTotalRows = 0;
+        let consoleCharsPerRow = 0;
+        let consoleFollow = true;
+        let consoleRenderPending = false;
+        let consoleRowPool = [];
+        
+        const consoleIcons = {
+            success: '✓',
+            error: '✗',
+            command: '>',
+            info: '•',
+            warning: '⚠'
+        };
+        
+        function wrapConsoleText(text, width) {
+            const rows = [];
+            for (const line of String(text).split('\\n')) {
+                if (line.length <= width) {
+                    rows.push(line);
+                    continue;
+                }
+                for (let i = 0; i < line.length; i += width) {
+                    rows.push(line.slice(i, i + width));
+                }
+            }
+            return rows;
+        }
         
-        function addConsoleMessage(text, type = 'info') {
+        function addConsoleMessage(text, type = 'info', badge = null) {
             const now = new Date();
             const time = now.toTimeString().split(' ')[0];
             
-            const icons = {
-                success: '✓',
-                error: '✗',
-                command: '>',
-                info: '•',
-                warning: '⚠'
-            };
-            
             const message = {
                 time: time,
                 type: type,
                 text: text,
-                icon: icons[type] || icons.info
+                icon: consoleIcons[type] || consoleIcons.info,
+                rows: wrapConsoleText(text, consoleCharsPerRow || 80),
+                rowStart: consoleTotalRows,
+                badge: badge
             };
             
             consoleMessages.push(message);
-            renderConsole();
+            consoleTotalRows += message.rows.length;
+            trimConsole();
+            scheduleConsoleRender();
+        }
+        
+        function trimConsole() {
+            const excess = consoleMessages.length - consoleStart - consoleMaxLines;
+            if (excess <= 0) {
+                return;
+            }
+            const droppedRows = consoleMessages[consoleStart + excess].rowStart - consoleMessages[consoleStart].rowStart;
+            consoleStart += excess;
+            
+            // Keep a scrolled-back view on the same lines
+            if (!consoleFollow) {
+                document.getElementById('console').scrollTop -= droppedRows * CONSOLE_ROW_HEIGHT;
+            }
+            // Compact the backing array once the dead prefix is large
+            if (consoleStart >= consoleMaxLines) {
+                consoleMessages = consoleMessages.slice(consoleStart);
+                consoleStart = 0;
+            }
+        }
+        
+        function scheduleConsoleRender() {
+            if (!consoleRenderPending) {
+                consoleRenderPending = true;
+                requestAnimationFrame(renderConsole);
+            }
+        }
+        
+        function createConsoleRow(rowsEl) {
+            const line = document.createElement('div');
+            line.className = 'console-line';
+            const time = document.createElement('span');
+            time.className = 'console-time';
+            const icon = document.createElement('span');
+            icon.className = 'console-icon';
+            const text = document.createElement('span');
+            text.className = 'console-text';
+            const badge = document.createElement('span');
+            badge.className = 'console-badge';
+            line.append(time, icon, text, badge);
+            rowsEl.appendChild(line);
+            return {line: line, time: time, icon: icon, text: text, badge: badge, message: null, index: -1};
+        }
+        
+        // Characters that fit in a row's text column at the current width
+        function measureConsole() {
+            const rowsEl = document.getElementById('consoleRows');
+            if (!consoleRowPool.length) {
+                consoleRowPool.push(createConsoleRow(rowsEl));
+            }
+            const probe = consoleRowPool[0].text;
+            const saved = probe.textContent;
+            probe.textContent = 'M'.repeat(10);
+            const range = document.createRange();
+            range.selectNodeContents(probe);
+            const charWidth = range.getBoundingClientRect().width / 10;
+            probe.textContent = saved;
+            return charWidth > 0 ? Math.max(20, Math.floor(probe.clientWidth / charWidth)) : 80;
+        }
+        
+        function rewrapConsole() {
+            const width = measureConsole();
+            if (width === consoleCharsPerRow) {
+                return;
+            }
+            consoleCharsPerRow = width;
+            consoleTotalRows = 0;
+            for (let i = consoleStart; i < consoleMessages.length; i++) {
+                const msg = consoleMessages[i];
+                msg.rows = wrapConsoleText(msg.text, width);
+                msg.rowStart = consoleTotalRows;
+                consoleTotalRows += msg.rows.length;
+            }
+            consoleRowPool.forEach(row => { row.message = null; });
+            scheduleConsoleRender();
+        }
+        
+        // Index of the live message containing an absolute row number
+        function findConsoleMessage(row) {
+            let lo = consoleStart;
+            let hi = consoleMessages.length - 1;
+            while (lo < hi) {
+                const mid = (lo + hi + 1) >> 1;
+                if (consoleMessages[mid].rowStart <= row) {
+                    lo = mid;
+                } else {
+                    hi = mid - 1;
+                }
+            }
+            return lo;
         }
         
         function renderConsole() {
+            consoleRenderPending = false;
             const consoleEl = document.getElementById('console');
-            consoleEl.innerHTML = consoleMessages.map(msg => `
-                <div class="console-line">
-                    <span class="console-time">[${msg.time}]</span>
-                    <span class="console-icon">${msg.icon}</span>
-                    <span class="console-text ${msg.type}">${msg.text}</span>
-                </div>
-            `).join('');
-            consoleEl.scrollTop = consoleEl.scrollHeight;
+            const spacer = document.getElementById('consoleSpacer');
+            const rowsEl = document.getElementById('consoleRows');
+            
+            const live = consoleMessages.length > consoleStart;
+            const baseRow = live ? consoleMessages[consoleStart].rowStart : 0;
+            const totalRows = live ? consoleTotalRows - baseRow : 0;
+            spacer.style.height = `${totalRows * CONSOLE_ROW_HEIGHT}px`;
+            
+            if (consoleFollow) {
+                consoleEl.scrollTop = consoleEl.scrollHeight;
+            }
+            
+            const scrolled = Math.max(0, consoleEl.scrollTop - spacer.offsetTop);
+            const firstRow = Math.max(0, Math.floor(scrolled / CONSOLE_ROW_HEIGHT) - CONSOLE_OVERSCAN);
+            const visible = Math.ceil(consoleEl.clientHeight / CONSOLE_ROW_HEIGHT) + 2 * CONSOLE_OVERSCAN;
+            const count = Math.max(0, Math.min(totalRows - firstRow, visible));
+            
+            while (consoleRowPool.length < count) {
+                consoleRowPool.push(createConsoleRow(rowsEl));
+            }
+            
+            let msgIndex = live ? findConsoleMessage(baseRow + firstRow) : 0;
+            for (let i = 0; i < consoleRowPool.length; i++) {
+                const row = consoleRowPool[i];
+                if (i >= count) {
+                    row.line.style.display = 'none';
+                    continue;
+                }
+                const absRow = baseRow + firstRow + i;
+                while (msgIndex + 1 < consoleMessages.length && consoleMessages[msgIndex + 1].rowStart <= absRow) {
+                    msgIndex++;
+                }
+                const msg = consoleMessages[msgIndex];
+                const offset = absRow - msg.rowStart;
+                row.line.style.display = '';
+                
+                // Rows already showing this line are left untouched
+                if (row.message === msg && row.index === offset) {
+                    continue;
+                }
+                row.message = msg;
+                row.index = offset;
+                row.line.className = offset === 0 ? 'console-line first' : 'console-line';
+                row.time.textContent = offset === 0 ? `[${msg.time}]` : '';
+                row.icon.textContent = offset === 0 ? msg.icon : '';
+                row.text.textContent = msg.rows[offset];
+                row.badge.textContent = offset === 0 && msg.badge ? msg.badge : '';
+                row.text.className = `console-text ${msg.type}`;
+            }
+            rowsEl.style.transform = `translateY(${firstRow * CONSOLE_ROW_HEIGHT}px)`;
         }
         
         function clearConsole() {
             consoleMessages = [];
+            consoleStart = 0;
+            consoleTotalRows = 0;
+            consoleFollow = true;
             renderConsole();
             addConsoleMessage('Console cleared', 'info');
         }
         
+        function initConsole() {
+            const consoleEl = document.getElementById('console');
+            consoleEl.addEventListener('scroll', () => {
+                consoleFollow = consoleEl.scrollTop + consoleEl.clientHeight >= consoleEl.scrollHeight - CONSOLE_ROW_HEIGHT;
+                scheduleConsoleRender();
+            });
+            new ResizeObserver(rewrapConsole).observe(consoleEl);
+            rewrapConsole();
+        }
+        
+        initConsole();
+        
+        // Events pushed from Python, delivered in per-frame batches
+        const eventHandlers = {
+            console: event => addConsoleMessage(event.text, event.level, event.badge),
+            status: event => updateStatus(event.connected),
+            dropped: event => addConsoleMessage(`⚠ ${event.count} events dropped (output too fast)`, 'warning'),
+            config: event => {
+                applyConfig(event.config);
+                addConsoleMessage('🔄 Configuration updated from config.json', 'success');
+                if (event.changed) {
+                    testConnection();
+                }
+            },
+            health: event => updateHealth(event.health),
+            roster: event => applyRoster(event.roster),
+            script: event => updateScriptProgress(event.progress)
+        };
+        
+        // Bridge calls return a job ID at once; results arrive as events
+        const jobWaiters = new Map();
+        const finishedJobs = new Map();
+        const inFlightJobs = new Set();
+        // Jobs a poll resolved before their push event arrived
+        const polledJobs = new Set();
+        
+        eventHandlers.job = event => {
+            if (event.state !== 'done' && event.state !== 'cancelled') {
+                return;
+            }
+            if (polledJobs.delete(event.job_id)) {
+                return;
+            }
+            const resolve = jobWaiters.get(event.job_id);
+            if (resolve) {
+                resolve(event);
+            } else {
+                finishedJobs.set(event.job_id, event);
+            }
+        };
+        
+        function updateJobInfo() {
+            const count = inFlightJobs.size;
+            document.getElementById('jobInfo').textContent = count ? `⏳ ${count} in flight · cancel` : '';
+        }
+        
+        function waitForJob(jobId) {
+            return new Promise(resolve => {
+                // Polling backs up the event stream if a push is ever lost
+                const poll = setInterval(async () => {
+                    const job = await pywebview.api.poll_job(jobId);
+                    if (jobWaiters.get(jobId) === done &&
+                            (job.state === 'done' || job.state === 'cancelled' || job.state === 'unknown')) {
+                        if (job.state !== 'unknown') {
+                            polledJobs.add(jobId);
+                        }
+                        done(job);
+                    }
+                }, 2000);
+                function done(job) {
+                    clearInterval(poll);
+                    jobWaiters.delete(jobId);
+                    finishedJobs.delete(jobId);
+                    resolve(job);
+                }
+                jobWaiters.set(jobId, done);
+            });
+        }
+        
+        async function runJob(method, ...args) {
+            const submitted = await pywebview.api[method](...args);
+            if (!submitted.success) {
+                return submitted;
+            }
+            
+            const jobId = submitted.job_id;
+            inFlightJobs.add(jobId);
+            updateJobInfo();
+            try {
+                let job = finishedJobs.get(jobId);
+                if (job) {
+                    finishedJobs.delete(jobId);
+                } else {
+                    job = await waitForJob(jobId);
+                }
+                if (job.state === 'cancelled') {
+                    return {success: false, cancelled: true, message: 'Cancelled'};
+                }
+                return job.result || {success: false, message: 'Job result unavailable'};
+            } finally {
+                inFlightJobs.delete(jobId);
+                updateJobInfo();
+            }
+        }
+        
+        async function cancelQueuedJobs() {
+            let cancelled = 0;
+            for (const jobId of Array.from(inFlightJobs)) {
+                const result = await pywebview.api.cancel_job(jobId);
+                if (result.success) {
+                    cancelled++;
+                }
+            }
+            addConsoleMessage(`⚠ Cancelled ${cancelled} queued command${cancelled === 1 ? '' : 's'}`, 'warning');
+        }
+        
+        window.rconEvents = function(events) {
+            for (const event of events) {
+                const handler = eventHandlers[event.type];
+                if (handler) {
+                    handler(event);
+                }
+            }
+        };
+        
         function updateStatus(connected) {
             const statusDot = document.getElementById('statusDot');
             const statusText = document.getElementById('statusText');
@@ -770,11 +1812,189 @@ def get_html():
             }
         }
         
+        function updateHealth(health) {
+            const info = document.getElementById('healthInfo');
+            if (!health) {
+                info.textContent = '';
+            } else if (health.online) {
+                const version = health.version ? ` · ${health.version}` : '';
+                info.textContent = `👥 ${health.players_online}/${health.players_max}${version} · ${Math.round(health.rtt_ms)} ms`;
+                info.title = health.motd || '';
+            } else {
+                info.textContent = '⚠ Server offline';
+                info.title = health.error || '';
+                updateStatus(false);
+            }
+        }
+        
+        // Player chips in name order, updated from roster diffs one row at a time
+        const PLAYER_REFRESH_MS = 15000;
+        const playerRows = new Map();
+        let playerKeys = [];
+        let rosterServer = null;
+        
+        function playerKey(name) {
+            return [name.toLowerCase(), name];
+        }
+        
+        function comparePlayerKeys(a, b) {
+            if (a[0] !== b[0]) return a[0] < b[0] ? -1 : 1;
+            if (a[1] !== b[1]) return a[1] < b[1] ? -1 : 1;
+            return 0;
+        }
+        
+        function playerIndex(key) {
+            let low = 0, high = playerKeys.length;
+            while (low < high) {
+                const mid = (low + high) >> 1;
+                if (comparePlayerKeys(playerKeys[mid], key) < 0) low = mid + 1;
+                else high = mid;
+            }
+            return low;
+        }
+        
+        function formatDuration(seconds) {
+            seconds = Math.max(0, Math.floor(seconds));
+            if (seconds < 60) return `${seconds}s`;
+            let minutes = Math.floor(seconds / 60);
+            if (minutes < 60) return `${minutes}m`;
+            let hours = Math.floor(minutes / 60);
+            minutes %= 60;
+            if (hours < 24) return `${hours}h ${String(minutes).padStart(2, '0')}m`;
+            return `${Math.floor(hours / 24)}d ${hours % 24}h`;
+        }
+        
+        function playerDuration(row, now) {
+            // Players online before the first poll: at least this long
+            const text = formatDuration(now - row.since);
+            return row.exact ? text : `${text}+`;
+        }
+        
+        function showPlayerMessage(text) {
+            playerRows.clear();
+            playerKeys = [];
+            document.getElementById('playerList').textContent = text;
+        }
+        
+        function applyRoster(diff) {
+            const list = document.getElementById('playerList');
+            const source = document.getElementById('playerSource');
+            if (!diff || diff.source === 'offline' || diff.updated === null) {
+                rosterServer = diff ? diff.server : null;
+                showPlayerMessage(diff && diff.source === 'offline' ? 'Server offline' : 'Waiting for first check...');
+                source.textContent = '';
+                return;
+            }
+            if (diff.initial || diff.server !== rosterServer) {
+                if (!diff.initial) return;
+                showPlayerMessage('');
+                rosterServer = diff.server;
+            }
+            if (!playerKeys.length && diff.joined.length) {
+                list.replaceChildren();
+            }
+            
+            for (const entry of diff.left) {
+                const key = playerKey(entry.name);
+                const index = playerIndex(key);
+                if (index < playerKeys.length && comparePlayerKeys(playerKeys[index], key) === 0) {
+                    playerRows.get(entry.name).chip.remove();
+                    playerRows.delete(entry.name);
+                    playerKeys.splice(index, 1);
+                }
+            }
+            for (const entry of diff.joined) {
+                if (playerRows.has(entry.name)) continue;
+                const key = playerKey(entry.name);
+                const index = playerIndex(key);
+                const row = {since: entry.since, exact: entry.exact};
+                row.chip = document.createElement('span');
+                row.chip.className = 'player-chip';
+                row.chip.textContent = entry.name;
+                row.duration = document.createElement('span');
+                row.duration.className = 'player-duration';
+                row.shown = playerDuration(row, diff.time);
+                row.duration.textContent = row.shown;
+                row.chip.appendChild(row.duration);
+                const next = index < playerKeys.length ? playerRows.get(playerKeys[index][1]).chip : null;
+                list.insertBefore(row.chip, next);
+                playerKeys.splice(index, 0, key);
+                playerRows.set(entry.name, row);
+            }
+            
+            if (!playerKeys.length) {
+                list.textContent = diff.players_online ?
+                    `${diff.players_online} online (run list for names)` : 'No players online';
+            }
+            const sources = {query: 'via Query', list: 'via list', ping: 'via ping'};
+            const shown = playerKeys.length;
+            let text = (diff.players_online > shown && shown) ?
+                `${shown} of ${diff.players_online} shown` : `${diff.players_online}/${diff.players_max}`;
+            if (sources[diff.source]) text += ` · ${sources[diff.source]}`;
+            source.textContent = text;
+        }
+        
+        function refreshPlayerDurations() {
+            const now = Date.now() / 1000;
+            for (const row of playerRows.values()) {
+                const text = playerDuration(row, now);
+                if (text !== row.shown) {
+                    row.duration.textContent = text;
+                    row.shown = text;
+                }
+            }
+        }
+        
+        setInterval(refreshPlayerDurations, PLAYER_REFRESH_MS);
+        
+        function updateFanOutToggle(servers) {
+            const check = document.getElementById('fanOutCheck');
+            document.getElementById('fanOutLabel').textContent = `🌐 All servers (${servers.length})`;
+            check.disabled = servers.length < 2;
+            if (check.disabled) {
+                check.checked = false;
+            }
+        }
+        
+        function fanOutEnabled() {
+            const check = document.getElementById('fanOutCheck');
+            return check.checked && !check.disabled;
+        }
+        
+        // Send to every server and report each one as its result arrives
+        async function runFanOut(command) {
+            try {
+                const summary = await runJob('submit_fan_out', command);
+                if (!summary.streamed) {
+                    (summary.results || []).forEach(r => {
+                        const line = `[${r.server}] ${r.message} (${r.latency_ms} ms)`;
+                        addConsoleMessage(`${r.success ? '✓' : '✗'} ${line}`, r.success ? 'success' : 'error', r.cached ? 'cached' : null);
+                    });
+                }
+                updateStatus((summary.results || []).some(r => r.success));
+                addConsoleMessage(`${summary.success ? '✓' : '✗'} ${summary.message}`, summary.success ? 'success' : 'error');
+                return summary;
+            } catch (error) {
+                addConsoleMessage(`✗ Error: ${error}`, 'error');
+                return null;
+            }
+        }
+        
+        function applyConfig(config) {
+            document.getElementById('serverInfo').textContent = 
+                config.server_ip && config.port ? `${config.server_ip}:${config.port}` : 'Not configured';
+            updateFanOutToggle(config.servers || []);
+            if (config.console_max_lines) {
+                consoleMaxLines = config.console_max_lines;
+            }
+        }
+        
         async function loadConfig() {
             try {
                 const config = await pywebview.api.get_config();
-                document.getElementById('serverInfo').textContent = 
-                    config.server_ip && config.port ? `${config.server_ip}:${config.port}` : 'Not configured';
+                applyConfig(config);
+                applyRoster(await pywebview.api.get_roster());
+                updateScriptProgress(await pywebview.api.get_script_status());
                 
                 if (config.config_loaded) {
                     addConsoleMessage('✓ RCON GUI initialized successfully', 'success');
@@ -818,12 +2038,22 @@ def get_html():
             
             addConsoleMessage(`→ Broadcasting: "${message}"`, 'command');
             
+            if (fanOutEnabled()) {
+                const summary = await runFanOut(`say ${message}`);
+                if (summary && summary.success) {
+                    input.value = '';
+                }
+                return;
+            }
+            
             try {
-                const result = await pywebview.api.send_message(message);
+                const result = await runJob('submit_message', message);
                 if (result.success) {
                     updateStatus(true);
                     addConsoleMessage(`✓ ${result.message}`, 'success');
                     input.value = '';
+                } else if (result.cancelled) {
+                    addConsoleMessage('⚠ Command cancelled', 'warning');
                 } else {
                     updateStatus(false);
                     addConsoleMessage(`✗ ${result.message}`, 'error');
@@ -843,13 +2073,28 @@ def get_html():
             }
             
             addConsoleMessage(`→ Command: ${command}`, 'command');
+            pywebview.api.add_history(command);
+            resetHistoryCursor();
+            showCompletions('');
+            
+            if (fanOutEnabled()) {
+                const summary = await runFanOut(command);
+                if (summary && summary.success) {
+                    input.value = '';
+                }
+                return;
+            }
             
             try {
-                const result = await pywebview.api.execute_command(command);
+                const result = await runJob('submit_command', command);
                 if (result.success) {
                     updateStatus(true);
-                    addConsoleMessage(`✓ ${result.message}`, 'success');
+                    if (!result.streamed) {
+                        addConsoleMessage(`✓ ${result.message}`, 'success', result.cached ? 'cached' : null);
+                    }
                     input.value = '';
+                } else if (result.cancelled) {
+                    addConsoleMessage('⚠ Command cancelled', 'warning');
                 } else {
                     updateStatus(false);
                     addConsoleMessage(`✗ ${result.message}`, 'error');
@@ -859,14 +2104,205 @@ def get_html():
             }
         }
         
+        // Up/Down recall over the server's history, matching what was typed first
+        const HISTORY_PAGE = 50;
+        const historyCursor = {draft: null, matches: [], index: -1, limit: 0, loading: false};
+        let historyMatches = [];
+        let historySelected = 0;
+        
+        function resetHistoryCursor() {
+            historyCursor.draft = null;
+            historyCursor.matches = [];
+            historyCursor.index = -1;
+            historyCursor.limit = 0;
+        }
+        
+        function setCommandInput(command) {
+            const input = document.getElementById('commandInput');
+            input.value = command;
+            input.setSelectionRange(command.length, command.length);
+        }
+        
+        async function recallOlder() {
+            const cursor = historyCursor;
+            if (cursor.loading) {
+                return;
+            }
+            if (cursor.draft === null) {
+                cursor.draft = document.getElementById('commandInput').value;
+            }
+            if (cursor.index + 1 >= cursor.matches.length && cursor.matches.length >= cursor.limit) {
+                cursor.loading = true;
+                try {
+                    cursor.limit = Math.max(HISTORY_PAGE, cursor.limit * 2);
+                    const result = await pywebview.api.get_history_matches(cursor.draft, cursor.limit);
+                    cursor.matches = result.commands.filter(command => command !== cursor.draft);
+                } finally {
+                    cursor.loading = false;
+                }
+            }
+            if (cursor.index + 1 < cursor.matches.length) {
+                cursor.index += 1;
+                setCommandInput(cursor.matches[cursor.index]);
+            }
+        }
+        
+        function recallNewer() {
+            const cursor = historyCursor;
+            if (cursor.draft === null || cursor.index < 0) {
+                return;
+            }
+            cursor.index -= 1;
+            setCommandInput(cursor.index < 0 ? cursor.draft : cursor.matches[cursor.index]);
+        }
+        
+        function commandKeyDown(event) {
+            if (event.key === 'ArrowUp') {
+                event.preventDefault();
+                recallOlder();
+            } else if (event.key === 'ArrowDown') {
+                event.preventDefault();
+                recallNewer();
+            } else if (event.ctrlKey && (event.key === 'r' || event.key === 'R')) {
+                event.preventDefault();
+                openHistorySearch();
+            } else if (event.key === 'Tab') {
+                event.preventDefault();
+                completeCommand();
+            }
+        }
+        
+        // Tab completion is answered from the cached command tree, not the server
+        async function completeCommand() {
+            const input = document.getElementById('commandInput');
+            const text = input.value;
+            const result = await pywebview.api.complete_command(text);
+            if (input.value !== text) {
+                return;
+            }
+            if (!result.ready) {
+                showCompletions(result.message || '');
+                return;
+            }
+            const matches = result.matches;
+            let completed = text;
+            if (matches.length === 1) {
+                completed = text.slice(0, result.start) + matches[0] + ' ';
+            } else if (matches.length) {
+                completed = text.slice(0, result.start) + commonPrefix(matches);
+            }
+            if (completed !== text) {
+                resetHistoryCursor();
+                setCommandInput(completed);
+            }
+            const shown = matches.length > 1 ? matches.slice(0, 20) : [];
+            showCompletions(shown.concat(result.hints).join('  '));
+        }
+        
+        function commonPrefix(words) {
+            let prefix = words[0];
+            for (const word of words) {
+                while (!word.startsWith(prefix)) {
+                    prefix = prefix.slice(0, -1);
+                }
+            }
+            return prefix;
+        }
+        
+        function showCompletions(text) {
+            const hint = document.getElementById('completionHint');
+            hint.textContent = text;
+            hint.style.display = text ? 'block' : 'none';
+        }
+        
+        function openHistorySearch() {
+            const query = document.getElementById('historyQuery');
+            document.getElementById('historySearch').classList.add('open');
+            query.value = document.getElementById('commandInput').value;
+            query.focus();
+            searchHistory();
+        }
+        
+        function closeHistorySearch() {
+            document.getElementById('historySearch').classList.remove('open');
+            document.getElementById('commandInput').focus();
+        }
+        
+        async function searchHistory() {
+            const text = document.getElementById('historyQuery').value;
+            const result = await pywebview.api.search_history(text, HISTORY_PAGE);
+            // A newer keystroke may have searched meanwhile
+            if (text !== document.getElementById('historyQuery').value) {
+                return;
+            }
+            historyMatches = result.commands;
+            historySelected = 0;
+            renderHistoryResults();
+        }
+        
+        function renderHistoryResults() {
+            const results = document.getElementById('historyResults');
+            results.replaceChildren();
+            if (!historyMatches.length) {
+                const empty = document.createElement('div');
+                empty.className = 'history-empty';
+                empty.textContent = 'No matching commands';
+                results.appendChild(empty);
+                return;
+            }
+            historyMatches.forEach((command, index) => {
+                const row = document.createElement('div');
+                row.className = index === historySelected ? 'history-result selected' : 'history-result';
+                row.textContent = command;
+                row.onclick = () => pickHistoryResult(index);
+                results.appendChild(row);
+            });
+            results.children[historySelected].scrollIntoView({block: 'nearest'});
+        }
+        
+        function pickHistoryResult(index) {
+            if (index < historyMatches.length) {
+                resetHistoryCursor();
+                setCommandInput(historyMatches[index]);
+            }
+            closeHistorySearch();
+        }
+        
+        function historySearchKey(event) {
+            if (event.key === 'Escape') {
+                event.preventDefault();
+                closeHistorySearch();
+            } else if (event.key === 'Enter') {
+                event.preventDefault();
+                pickHistoryResult(historySelected);
+            } else if (event.key === 'ArrowDown' || event.key === 'ArrowUp' || (event.ctrlKey && (event.key === 'r' || event.key === 'R'))) {
+                // Ctrl+R again steps to the next older match, as in a shell
+                event.preventDefault();
+                if (historyMatches.length) {
+                    const step = event.key === 'ArrowUp' ? -1 : 1;
+                    historySelected = Math.min(Math.max(historySelected + step, 0), historyMatches.length - 1);
+                    renderHistoryResults();
+                }
+            }
+        }
+        
         async function quickCommand(command, label) {
             addConsoleMessage(`→ ${label}: ${command}`, 'command');
             
+            if (fanOutEnabled()) {
+                await runFanOut(command);
+                return;
+            }
+            
             try {
-                const result = await pywebview.api.execute_command(command);
+                const result = await runJob('submit_command', command);
                 if (result.success) {
                     updateStatus(true);
-                    addConsoleMessage(`✓ ${result.message}`, 'success');
+                    if (!result.streamed) {
+                        addConsoleMessage(`✓ ${result.message}`, 'success', result.cached ? 'cached' : null);
+                    }
+                } else if (result.cancelled) {
+                    addConsoleMessage('⚠ Command cancelled', 'warning');
                 } else {
                     updateStatus(false);
                     addConsoleMessage(`✗ ${result.message}`, 'error');
@@ -876,6 +2312,215 @@ def get_html():
             }
         }
         
+        async function runBatch() {
+            const input = document.getElementById('batchInput');
+            const button = document.getElementById('batchButton');
+            const commands = input.value.split('\\n').map(c => c.trim()).filter(c => c);
+            
+            if (!commands.length) {
+                addConsoleMessage('⚠ Please enter at least one command', 'warning');
+                return;
+            }
+            
+            addConsoleMessage(`→ Batch: ${commands.length} commands`, 'command');
+            button.disabled = true;
+            
+            try {
+                const result = await runJob('submit_batch', commands);
+                (result.results || []).forEach((r, i) => {
+                    const line = `[${i + 1}] ${r.command} → ${r.message} (${r.elapsed_ms} ms)`;
+                    addConsoleMessage(`${r.success ? '✓' : '✗'} ${line}`, r.success ? 'success' : 'error');
+                });
+                updateStatus((result.results || []).some(r => r.success));
+                addConsoleMessage(`${result.success ? '✓' : '✗'} ${result.message}`, result.success ? 'success' : 'error');
+            } catch (error) {
+                addConsoleMessage(`✗ Error: ${error}`, 'error');
+            } finally {
+                button.disabled = false;
+            }
+        }
+        
+        async function loadScriptFile(input) {
+            const file = input.files[0];
+            if (!file) return;
+            document.getElementById('scriptInput').value = await file.text();
+            addConsoleMessage(`📂 Loaded script ${file.name}`, 'info');
+            input.value = '';
+        }
+        
+        async function startScript() {
+            const text = document.getElementById('scriptInput').value;
+            const variables = document.getElementById('scriptVariables').value;
+            const rate = parseFloat(document.getElementById('scriptRate').value) || 1000;
+            const policy = document.getElementById('scriptPolicy').value;
+            try {
+                const result = await pywebview.api.start_script(text, variables, rate, policy);
+                addConsoleMessage(`${result.success ? '→' : '✗'} ${result.message}`, result.success ? 'command' : 'error');
+            } catch (error) {
+                addConsoleMessage(`✗ Error: ${error}`, 'error');
+            }
+        }
+        
+        async function scriptControl(method) {
+            const result = await pywebview.api[method]();
+            if (!result.success) {
+                addConsoleMessage(`⚠ ${result.message}`, 'warning');
+            }
+        }
+        
+        function formatScriptProgress(p) {
+            let text = `${p.done}/${p.total} (${p.percent.toFixed(1)}%) · ${Math.round(p.commands_per_s)} cmd/s`;
+            if (p.eta_s !== null && p.state === 'running') text += ` · ETA ${Math.round(p.eta_s)}s`;
+            if (p.failed) text += ` · ${p.failed} failed`;
+            if (p.state !== 'running') text += ` · ${p.state}`;
+            return text;
+        }
+        
+        function updateScriptProgress(p) {
+            if (!p) return;
+            const active = p.state === 'running' || p.state === 'paused';
+            document.getElementById('scriptProgress').style.width = `${p.percent}%`;
+            document.getElementById('scriptStatus').textContent = formatScriptProgress(p);
+            document.getElementById('scriptStart').disabled = active;
+            document.getElementById('scriptPause').disabled = p.state !== 'running';
+            document.getElementById('scriptResume').disabled = p.state !== 'paused';
+            document.getElementById('scriptAbort').disabled = !active;
+        }
+        
+        // Latency panel, refreshed while the window is visible
+        const STATS_REFRESH_MS = 3000;
+        
+        async function refreshStats() {
+            const phase = document.getElementById('statsPhase').value;
+            const body = document.getElementById('statsBody');
+            let rows;
+            try {
+                rows = await pywebview.api.get_latency_stats();
+            } catch (error) {
+                return;
+            }
+            const fragment = document.createDocumentFragment();
+            for (const row of rows) {
+                const summary = row.phases[phase];
+                if (!summary && !row.errors && !row.coalesced) {
+                    continue;
+                }
+                const values = summary || {count: 0, p50_ms: 0, p95_ms: 0, p99_ms: 0, max_ms: 0};
+                const tr = document.createElement('tr');
+                const cells = [
+                    row.server, row.command, values.count, row.errors, row.coalesced,
+                    values.p50_ms.toFixed(2), values.p95_ms.toFixed(2), values.p99_ms.toFixed(2), values.max_ms.toFixed(2)
+                ];
+                cells.forEach((value, i) => {
+                    const td = document.createElement('td');
+                    td.textContent = value;
+                    if (i >= 2) {
+                        td.className = 'num';
+                    }
+                    tr.appendChild(td);
+                });
+                fragment.appendChild(tr);
+            }
+            if (!fragment.childNodes.length) {
+                const tr = document.createElement('tr');
+                const td = document.createElement('td');
+                td.colSpan = 9;
+                td.textContent = 'No commands timed yet';
+                tr.appendChild(td);
+                fragment.appendChild(tr);
+            }
+            body.replaceChildren(fragment);
+        }
+        
+        async function exportStats() {
+            const result = await pywebview.api.export_latency_stats();
+            addConsoleMessage(`${result.success ? '✓' : '✗'} ${result.message}`, result.success ? 'success' : 'error');
+        }
+        
+        async function resetStats() {
+            const result = await pywebview.api.reset_latency_stats();
+            addConsoleMessage(`✓ ${result.message}`, 'success');
+            refreshStats();
+        }
+        
+        setInterval(() => {
+            if (!document.hidden && window.pywebview && pywebview.api) {
+                refreshStats();
+            }
+        }, STATS_REFRESH_MS);
+        
+        let transcriptQuery = '';
+        let transcriptCursor = null;
+        let transcriptSearchId = 0;
+        
+        async function searchTranscripts(more) {
+            const status = document.getElementById('transcriptStatus');
+            const results = document.getElementById('transcriptResults');
+            const moreButton = document.getElementById('transcriptMore');
+            if (!more) {
+                transcriptQuery = document.getElementById('transcriptQuery').value;
+                transcriptCursor = null;
+            }
+            const searchId = ++transcriptSearchId;
+            status.textContent = 'Searching...';
+            moreButton.disabled = true;
+            let page;
+            try {
+                page = await pywebview.api.search_transcripts(transcriptQuery, transcriptCursor);
+            } catch (error) {
+                page = {success: false, message: String(error)};
+            }
+            // A newer search may have started meanwhile
+            if (searchId !== transcriptSearchId) {
+                return;
+            }
+            if (!more) {
+                results.replaceChildren();
+            }
+            if (!page.success) {
+                status.textContent = `✗ ${page.message}`;
+                return;
+            }
+            const fragment = document.createDocumentFragment();
+            for (const record of page.results) {
+                fragment.appendChild(transcriptRow(record));
+            }
+            results.appendChild(fragment);
+            transcriptCursor = page.cursor;
+            moreButton.disabled = transcriptCursor === null;
+            const count = results.children.length;
+            status.textContent = count
+                ? `${count}${transcriptCursor !== null ? '+' : ''} results · ${page.elapsed_ms.toFixed(1)} ms`
+                : 'No matching commands';
+        }
+        
+        function transcriptRow(record) {
+            const row = document.createElement('div');
+            row.className = record.ok ? 'transcript-result' : 'transcript-result failed';
+            const head = document.createElement('div');
+            head.className = 'transcript-head';
+            const latency = record.ms === null ? '' : ` · ${record.ms.toFixed(1)} ms`;
+            head.textContent = `${new Date(record.time * 1000).toLocaleString()} · ${record.server}${latency}`;
+            const command = document.createElement('div');
+            command.className = 'transcript-command';
+            command.textContent = `${record.ok ? '✓' : '✗'} ${record.command}`;
+            const response = document.createElement('div');
+            response.className = 'transcript-response';
+            response.textContent = record.response;
+            row.append(head, command, response);
+            // Click to show the whole response
+            row.onclick = () => row.classList.toggle('expanded');
+            return row;
+        }
+        
+        function transcriptScroll(results) {
+            // Fetch the next page as the list nears its end
+            const moreButton = document.getElementById('transcriptMore');
+            if (!moreButton.disabled && results.scrollTop + results.clientHeight >= results.scrollHeight - 40) {
+                searchTranscripts(true);
+            }
+        }
+        
         function openConfigModal() {
             pywebview.api.get_config().then(config => {
                 document.getElementById('configServerIp').value = config.server_ip || '';
@@ -922,6 +2567,9 @@ def get_html():
 """
 
 def main():
+    # Imported here so RCONApi and get_html() also work without pywebview
+    import webview
+    
     api = RCONApi()
     html_content = get_html()
     
@@ -941,6 +2589,11 @@ def main():
         footer_html = '<div style="position:fixed;bottom:0;width:100%;background:#222;color:#fff;text-align:center;padding:8px 0;font-size:14px;z-index:9999;">Design by <a href="https://h190k.com" target="_blank" style="color:#4fc3f7;text-decoration:underline;">h190k</a></div>'
         window.evaluate_js(f"document.body.insertAdjacentHTML('beforeend', `{footer_html}`);")
     window.events.loaded += add_footer
+    window.events.loaded += lambda: api._events.attach(window)
+    window.events.loaded += api._preload_history
+    window.events.loaded += api._update_search_index
+    api._watch_config()
+    api._watch_health()
 
     webview.start(gui='edgechromium',debug=False)
 